@@ -0,0 +1,55 @@
+"""Uruchamia tryb gry bez ekranu, np. do pomiaru wydajności lub testow wzorcowych.
+
+Przyklad (z katalogu glownego repozytorium):
+    python src/bench.py --mode challenge --replay sesja.jsonl --sink hash --output klatki.txt
+"""
+import argparse
+import os
+
+# Bez karty dzwiekowej (serwer, CI) pygame potrzebuje sterownika "dummy"
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from challenge import run_challenge
+from multiplayer import run_multiplayer
+from playground import run_playground
+from render_sink import SINK_HASH, SINK_NULL, SINK_VIDEO, SINK_WINDOW
+
+MODES = ["challenge", "multiplayer", "playground"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Uruchomienie trybu gry bez ekranu")
+    parser.add_argument("--mode", choices=MODES, required=True, help="tryb gry")
+    parser.add_argument("--replay", metavar="PLIK", help="nagrana sesja do odtworzenia")
+    parser.add_argument("--video", metavar="PLIK", help="plik wideo zamiast kamery (tryb reki)")
+    parser.add_argument("--sink", choices=[SINK_NULL, SINK_HASH, SINK_VIDEO, SINK_WINDOW], default=SINK_NULL,
+                        help="wyjście obrazu")
+    parser.add_argument("--output", metavar="PLIK", help="plik z hashami klatek lub plik wideo")
+    parser.add_argument("--players", default="Gracz1,Gracz2", help="gracze w trybie multiplayer (po przecinku)")
+    parser.add_argument("--level", type=int, default=2, help="poziom poczatkowy w trybie multiplayer")
+    parser.add_argument("--simultaneous", action="store_true",
+                        help="multiplayer: wszyscy gracze zgaduja naraz (wiele dloni)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.replay and not args.video:
+        raise SystemExit("Podaj --replay lub --video - bez ekranu nie ma kamery ani myszy.")
+
+    input_settings = {"replay": args.replay, "video": args.video}
+    render_settings = {"sink": args.sink, "output": args.output}
+
+    if args.mode == "challenge":
+        run_challenge("hand", input_settings=input_settings, render_settings=render_settings)
+    elif args.mode == "multiplayer":
+        run_multiplayer("hand", input_settings=input_settings, render_settings=render_settings,
+                        players=args.players.split(","), starting_level=args.level,
+                        multiplayer_settings={"simultaneous": args.simultaneous})
+    else:
+        # Pomiar nie dopisuje nut do logu gracza (played_instruments.csv)
+        run_playground("hand", input_settings=input_settings, render_settings=render_settings, csv_file=None)
+
+
+if __name__ == "__main__":
+    main()
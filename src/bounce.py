@@ -0,0 +1,197 @@
+import argparse
+import csv
+import os
+import time
+import wave
+
+import numpy as np
+
+# Renderowanie offline nie potrzebuje karty dzwiekowej
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from mixer import NoteCache, sound_samples
+from notes import CSV_FILE, NOTES
+from sound_bank import SOUND_BANK
+
+# Domyślne ustawienia zgrywania sesji do WAV
+BOUNCE_SETTINGS = {
+    "sample_rate": 44100,
+    "channels": 2,
+    "gain": 0.8,            # Jak przy graniu w trybie Wlasna Melodia
+    "max_gap": 5.0,         # Dluzsze przerwy (np. miedzy sesjami w jednym pliku) sa skracane (s)
+    "chunk_seconds": 10.0,  # Dlugośc fragmentu miksowanego naraz - ogranicza zuzycie pamieci
+    "note_cache_mb": 64,
+}
+
+NOTE_SEMITONES = dict(NOTES)
+
+
+def parse_timestamp(text):
+    """Sekundy od polnocy z zapisu HH:MM:SS.mmm"""
+    hours, minutes, seconds = text.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def read_session(path, max_gap):
+    """Zdarzenia z logu CSV jako (czasy w sekundach, instrumenty, poltony).
+
+    Czasy sa liczone od pierwszej nuty; przejście przez polnoc jest
+    uwzgledniane, a przerwy dluzsze niz max_gap skracane do max_gap.
+    Wiersze bez kolumny Note (starsze logi) to nuta bazowa.
+    """
+    times = []
+    names = []
+    semitones = []
+    previous = None
+    offset = 0.0
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            if len(row) < 2 or row[0] == "Timestamp":
+                continue
+            try:
+                absolute = parse_timestamp(row[0])
+            except ValueError:
+                print(f"Pomijam wiersz z blednym czasem: {row}")
+                continue
+            if previous is None:
+                previous = absolute
+            gap = absolute - previous
+            if gap < 0:
+                gap += 24 * 3600  # Sesja przez polnoc
+            offset += min(gap, max_gap)
+            previous = absolute
+            times.append(offset)
+            names.append(row[1])
+            semitones.append(NOTE_SEMITONES.get(row[2], 0) if len(row) > 2 else 0)
+    return np.asarray(times, dtype=np.float64), names, np.asarray(semitones, dtype=np.int32)
+
+
+class SessionBounce:
+    """Miksuje nagrana sesje do pliku WAV szybciej niz w czasie rzeczywistym.
+
+    Kazda nuta to przesuniecie w probkach i probka (instrument, polton)
+    z NoteCache. Wyjście powstaje fragmentami po chunk_seconds: dla
+    fragmentu wyszukiwanie binarne (searchsorted na posortowanych
+    poczatkach) wybiera tylko nuty, ktore go dotykaja, i dodaje ich
+    wycinki do jednego bufora. Pamiec zalezy wiec od dlugości fragmentu
+    i liczby roznych nut, a nie od dlugości sesji.
+    """
+
+    def __init__(self, settings=None, sound_bank=SOUND_BANK):
+        options = dict(BOUNCE_SETTINGS)
+        if settings:
+            options.update(settings)
+        self.options = options
+        self.sound_bank = sound_bank
+        self.sample_rate = options["sample_rate"]
+        self.channels = options["channels"]
+        self.chunk = max(1, int(options["chunk_seconds"] * self.sample_rate))
+        self.notes = NoteCache(int(options["note_cache_mb"] * 1024 * 1024))
+        self.samples = {}  # Instrument -> float32 (N, kanaly) lub None
+
+        # Format miksera decyduje o czestotliwości i kanalach dekodowanych probek
+        if pygame.mixer.get_init():
+            pygame.mixer.quit()
+        pygame.mixer.init(frequency=self.sample_rate, size=-16, channels=self.channels)
+        self.sample_rate, _, self.channels = pygame.mixer.get_init()
+
+    def _note(self, name, semitones):
+        if name not in self.samples:
+            sound = self.sound_bank.get(name)
+            self.samples[name] = sound_samples(sound) if sound is not None else None
+        base = self.samples[name]
+        if base is None or semitones == 0:
+            return base
+        return self.notes.get(name, semitones, base)
+
+    def render(self, csv_path, wav_path):
+        """Zgrywa log csv_path do wav_path; zwraca dlugośc nagrania w sekundach"""
+        times, names, semitones = read_session(csv_path, self.options["max_gap"])
+        if not len(times):
+            print(f"Brak nut w {csv_path}")
+            return 0.0
+
+        # Ta sama nuta (instrument, polton) ma jeden numer - dlugośc i probki liczone raz na numer
+        keys = list(zip(names, semitones.tolist()))
+        unique = sorted(set(keys))
+        key_index = {key: i for i, key in enumerate(unique)}
+        note_ids = np.fromiter((key_index[key] for key in keys), dtype=np.int32, count=len(keys))
+        lengths = np.array([len(s) if s is not None else 0 for s in (self._note(*key) for key in unique)],
+                           dtype=np.int64)
+
+        starts = np.rint(times * self.sample_rate).astype(np.int64)
+        # Nuty bez probki (brak pliku dzwieku) nie trafiaja do miksu
+        playable = lengths[note_ids] > 0
+        starts = starts[playable]
+        note_ids = note_ids[playable]
+        if not len(starts):
+            print(f"Brak probek dla nut z {csv_path}")
+            return 0.0
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        note_ids = note_ids[order]
+        ends = starts + lengths[note_ids]
+        longest = int(lengths.max())
+        total = int(ends.max())
+        gain = self.options["gain"]
+
+        mix = np.zeros((self.chunk, self.channels), dtype=np.float32)
+        output = np.empty((self.chunk, self.channels), dtype=np.int16)
+        with wave.open(wav_path, "wb") as wav:
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            for chunk_start in range(0, total, self.chunk):
+                chunk_end = min(chunk_start + self.chunk, total)
+                frames = chunk_end - chunk_start
+                mix[:frames] = 0.0
+                # Nuty zaczete najwyzej longest probek przed fragmentem i przed jego koncem
+                first = np.searchsorted(starts, chunk_start - longest, side="left")
+                last = np.searchsorted(starts, chunk_end, side="left")
+                for i in np.flatnonzero(ends[first:last] > chunk_start) + first:
+                    samples = self._note(*unique[note_ids[i]])
+                    start = starts[i]
+                    src_from = max(0, chunk_start - start)
+                    src_to = min(len(samples), chunk_end - start)
+                    dst_from = start + src_from - chunk_start
+                    mix[dst_from:dst_from + src_to - src_from] += samples[src_from:src_to]
+                block = mix[:frames]
+                block *= gain * 32767.0
+                np.clip(block, -32768.0, 32767.0, out=block)
+                output[:frames] = block
+                wav.writeframes(output[:frames].tobytes())
+        return total / self.sample_rate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Zgrywanie sesji z trybu Wlasna Melodia do pliku WAV")
+    parser.add_argument("csv", nargs="?", default=CSV_FILE,
+                        help="log zagranych instrumentów (domyślnie played_instruments.csv)")
+    parser.add_argument("-o", "--output", default="session.wav",
+                        help="plik wyjściowy WAV")
+    parser.add_argument("--gain", type=float, default=BOUNCE_SETTINGS["gain"],
+                        help="głośność miksu")
+    parser.add_argument("--max-gap", type=float, default=BOUNCE_SETTINGS["max_gap"],
+                        help="najdłuższa przerwa między nutami w sekundach (dłuższe są skracane)")
+    parser.add_argument("--chunk", type=float, default=BOUNCE_SETTINGS["chunk_seconds"],
+                        help="długość fragmentu miksowanego naraz w sekundach")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    bounce = SessionBounce({
+        "gain": args.gain,
+        "max_gap": max(0.0, args.max_gap),
+        "chunk_seconds": max(0.1, args.chunk),
+    })
+    started = time.perf_counter()
+    duration = bounce.render(args.csv, args.output)
+    elapsed = time.perf_counter() - started
+    if duration > 0:
+        speed = duration / elapsed if elapsed > 0 else float("inf")
+        print(f"Zapisano {args.output}: {duration:.1f} s nagrania w {elapsed:.2f} s ({speed:.0f}x czasu rzeczywistego)")
+        print(bounce.notes.stats_text())
+        print(SOUND_BANK.stats_text())
@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+_local = threading.local()
+
+
+class FramePool:
+    """Bufory klatek wielokrotnego uzytku, po jednym na (nazwa, ksztalt, typ).
+
+    Funkcje OpenCV z argumentem dst (cv2.flip, cv2.cvtColor, cv2.resize)
+    pisza wtedy w kazdej klatce do tego samego bufora zamiast alokowac nowy.
+    Pula nie jest zabezpieczona przed watkami - kazdy watek bierze wlasna
+    przez frame_pool(). Liczniki pokazuja, czy w stanie ustalonym petla
+    jeszcze cokolwiek alokuje.
+    """
+
+    def __init__(self, name="", max_buffers=64):
+        self.name = name
+        self.max_buffers = max_buffers  # Zabezpieczenie przed buforami o ciagle nowych rozmiarach
+        self.buffers = {}
+        self.allocations = 0
+        self.frames = 0
+        self.frame_allocations = 0       # Alokacje w biezacej klatce
+        self.frames_with_allocations = 0
+        self.last_allocation_frame = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        """Bufor o podanym ksztalcie - ten sam obiekt przy kazdym wywolaniu (zawartośc dowolna)"""
+        dtype = np.dtype(dtype)
+        key = (name, tuple(shape), dtype)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            if len(self.buffers) >= self.max_buffers:
+                self.buffers.clear()
+            buffer = np.empty(shape, dtype=dtype)
+            self.buffers[key] = buffer
+            self.allocations += 1
+            self.frame_allocations += 1
+        return buffer
+
+    def like(self, name, array):
+        return self.get(name, array.shape, array.dtype)
+
+    def end_frame(self):
+        """Zamyka klatke w statystykach (wywoluje petla watku wlaściciela)"""
+        self.frames += 1
+        if self.frame_allocations:
+            self.frames_with_allocations += 1
+            self.last_allocation_frame = self.frames
+        self.frame_allocations = 0
+
+    def stats_text(self):
+        size_mb = sum(buffer.nbytes for buffer in self.buffers.values()) / (1024 * 1024)
+        steady = self.frames - self.last_allocation_frame
+        return (f"Bufory {self.name}: {len(self.buffers)} ({size_mb:.1f} MB) | alokacje: {self.allocations} "
+                f"w {self.frames_with_allocations}/{self.frames} klatkach, ostatnie {steady} klatek bez alokacji")
+
+
+def frame_pool():
+    """Pula buforow biezacego watku (tworzona przy pierwszym uzyciu)"""
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = FramePool(threading.current_thread().name)
+        _local.pool = pool
+    return pool
@@ -0,0 +1,178 @@
+import collections
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from buffers import frame_pool
+
+
+class CameraCapture:
+    """Odczytuje klatki z kamery w osobnym watku.
+
+    Petla gry zawsze dostaje najnowsza klatke bez czekania na kamere.
+    Stare klatki sa nadpisywane w malym buforze pierścieniowym, a nie
+    kolejkowane - kazda nadpisana, nieodebrana klatka liczy sie jako zgubiona.
+    Miejsca bufora sa stale (z puli watku kamery), a odbiorcy dostaja kopie
+    we wlasnych buforach, wiec w stanie ustalonym nic nie jest alokowane.
+    """
+
+    def __init__(self, device=0, buffer_size=2, flip=True, first_frame_timeout=5.0):
+        self.device = device
+        self.flip = flip  # Odbicie poziome jak w lustrze (wykonywane w watku kamery)
+        self.first_frame_timeout = first_frame_timeout
+
+        self._cap = cv2.VideoCapture(device)
+        self._buffer = collections.deque(maxlen=buffer_size)
+        self._condition = threading.Condition()
+        self._running = False
+        self._failed = False
+        self._thread = None
+        self.pool = None  # Pula buforow watku kamery
+
+        # Statystyki
+        self.frame_id = 0  # Numer ostatniej klatki z kamery
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.capture_fps = 0.0
+        self._last_delivered_id = 0
+
+    def start(self):
+        """Uruchamia watek odczytu kamery"""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="CameraCapture", daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        self.pool = frame_pool()
+        last_time = time.perf_counter()
+        raw = None
+        slot = 0
+        while self._running:
+            # Odczyt do tego samego bufora i odbicie do kolejnego miejsca pierścienia.
+            # Czytelnicy kopiuja tylko ostatnia klatke (pod blokada), a zapisujemy inne miejsce
+            ret, raw = self._cap.read(raw)
+            if not ret:
+                with self._condition:
+                    self._failed = True
+                    self._running = False
+                    self._condition.notify_all()
+                break
+
+            # Co najmniej dwa miejsca - zapis nigdy nie trafia w ostatnia opublikowana klatke
+            slot = (slot + 1) % max(2, self._buffer.maxlen)
+            frame = self.pool.like(f"slot{slot}", raw)
+            if self.flip:
+                cv2.flip(raw, 1, dst=frame)
+            else:
+                np.copyto(frame, raw)
+
+            now = time.perf_counter()
+            dt = now - last_time
+            last_time = now
+
+            with self._condition:
+                # Najnowsza klatka nie zostala odebrana - zostanie nadpisana
+                if self.frame_id > self._last_delivered_id:
+                    self.frames_dropped += 1
+                self.frame_id += 1
+                self.frames_captured += 1
+                self._buffer.append((self.frame_id, now, frame))
+                if dt > 0:
+                    # Srednia kroczaca, zeby wynik nie skakal z klatki na klatke
+                    self.capture_fps = 0.9 * self.capture_fps + 0.1 * (1.0 / dt) if self.capture_fps else 1.0 / dt
+                self._condition.notify_all()
+            self.pool.end_frame()
+
+    def _wait_for_first_frame(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._buffer or self._failed or not self._running,
+                                     timeout=self.first_frame_timeout)
+
+    def read(self):
+        """Zwraca (ret, frame) z najnowsza klatka, bez blokowania petli gry.
+
+        Jeśli od ostatniego wywolania nie przyszla nowa klatka, zwracana jest
+        ponownie ostatnia. Zwracana klatka jest kopia w buforze z puli watku
+        wywolujacego - wazna do nastepnego read(), mozna po niej rysowac.
+        """
+        if not self._buffer:
+            self._wait_for_first_frame()
+
+        with self._condition:
+            if self._failed or not self._buffer:
+                return False, None
+            frame_id, _, frame = self._buffer[-1]
+            self._last_delivered_id = frame_id
+            out = frame_pool().like("camera", frame)
+            np.copyto(out, frame)
+            return True, out
+
+    def frame_size(self):
+        """(szerokośc, wysokośc) najnowszej klatki bez jej kopiowania; None, gdy kamera nie dziala.
+
+        Dla petli gry, ktora z klatki kamery bierze tylko rozmiar planszy.
+        """
+        if not self._buffer:
+            self._wait_for_first_frame()
+
+        with self._condition:
+            if self._failed or not self._buffer:
+                return None
+            frame_id, _, frame = self._buffer[-1]
+            self._last_delivered_id = frame_id
+            h, w = frame.shape[:2]
+            return w, h
+
+    def wait_for_frame(self, last_frame_id, timeout=0.1):
+        """Czeka na klatke nowsza niz last_frame_id.
+
+        Zwraca (frame_id, timestamp, frame) lub None po przekroczeniu czasu.
+        Klatka jest kopiowana do bufora z puli watku wywolujacego (wazna do
+        nastepnego wywolania), bo miejsca pierścienia sa nadpisywane.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: (self._buffer and self._buffer[-1][0] > last_frame_id) or self._failed or not self._running,
+                timeout=timeout)
+            if not self._buffer or self._buffer[-1][0] <= last_frame_id:
+                return None
+            frame_id, timestamp, frame = self._buffer[-1]
+            self._last_delivered_id = max(self._last_delivered_id, frame_id)
+            out = frame_pool().like("camera", frame)
+            np.copyto(out, frame)
+            return frame_id, timestamp, out
+
+    def is_failed(self):
+        return self._failed
+
+    def get_stats(self):
+        """Zwraca statystyki przechwytywania"""
+        with self._condition:
+            return {
+                "capture_fps": self.capture_fps,
+                "frames_captured": self.frames_captured,
+                "frames_dropped": self.frames_dropped,
+            }
+
+    def stats_text(self):
+        stats = self.get_stats()
+        text = (f"Kamera: {stats['capture_fps']:.1f} FPS | "
+                f"klatki: {stats['frames_captured']} | zgubione: {stats['frames_dropped']}")
+        if self.pool is not None:
+            text += f"\n{self.pool.stats_text()}"
+        return text
+
+    def release(self):
+        """Zatrzymuje watek i zwalnia kamere"""
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._cap.release()
@@ -1,10 +1,18 @@
 import cv2
-import mediapipe as mp
-import time
 import random
-import math
 import numpy as np
-import pygame
+
+import clock
+from governor import QualityGovernor
+from input_source import open_input_source
+from layout import Layout
+from loop import MENU_WAIT_MS, FrameLoop
+from overlay import OverlayCompositor
+from render_sink import open_render_sink
+from scheduler import PlaybackScheduler
+from sound_bank import SOUND_BANK
+from scene import StaticScene
+from text_cache import measure_text, put_text
 
 # Definicja instrumentów z pozycjami (powtórzone z main.py dla niezależności)
 INSTRUMENTS = [
@@ -16,16 +24,28 @@ INSTRUMENTS = [
     {"name": "Flet", "pos": (350, 250), "color": (100, 255, 255)},
 ]
 
-pygame.mixer.init()
-
-# Załaduj dźwięki instrumentów
-for instrument in INSTRUMENTS:
-    instrument_name = instrument["name"].lower()
-    instrument["sound"] = pygame.mixer.Sound(f"sound/{instrument_name}.mp3")
-
 INSTRUMENT_RADIUS = 40
 HIGHLIGHT_RADIUS = 60
 
+# Czasy pokazu sekwencji i przejścia na kolejny poziom (s)
+MIN_HIGHLIGHT_TIME = 0.5  # Krotkie dzwieki i tak sa podświetlane co najmniej tyle
+SEQUENCE_GAP = 0.5        # Przerwa miedzy instrumentami sekwencji
+LEVEL_PAUSE = 2.0         # Od ukonczenia sekwencji do nowego poziomu
+
+# Pozycje i promienie zaprojektowane dla klatki kamery 640x480 - uklad przelicza je
+# do rozmiaru klatki, a mapa trafien i rysowanie korzystaja z tego samego przeliczenia
+LAYOUT_SIZE = (640, 480)
+LAYOUT = Layout([instrument["pos"] for instrument in INSTRUMENTS], [INSTRUMENT_RADIUS] * len(INSTRUMENTS),
+                LAYOUT_SIZE)
+HIGHLIGHT_SCALE = HIGHLIGHT_RADIUS / INSTRUMENT_RADIUS
+
+# Tlo, instrumenty i podpisy rysowane raz - w petli tylko kopiowane do klatki
+SCENE = StaticScene(INSTRUMENTS, LAYOUT)
+GAME_AREA_MARGIN = 50
+
+# Polprzezroczyste elementy mieszane tylko w swoich prostokatach
+OVERLAY = OverlayCompositor()
+
 # Tryby sterowania
 CONTROL_HAND = "hand"
 CONTROL_MOUSE = "mouse"
@@ -58,6 +78,9 @@ class MusicalGame:
         self.hover_duration_needed = 1.0  # Czas potrzebny do aktywacji (1 sekunda)
         self.hover_progress = 0.0   # Postęp hover (0.0 - 1.0)
         
+        # Dźwięki i podświetlenia sekwencji zaplanowane w czasie - update() nigdy nie czeka
+        self.scheduler = PlaybackScheduler()
+        
         # Rozpocznij pierwszą sekwencję
         self.generate_new_sequence()
         
@@ -79,42 +102,52 @@ class MusicalGame:
         self.game_state = GAME_STATE_SHOWING
         self.sequence_display_index = 0
         self.highlight_instrument = -1
-        self.highlight_start_time = time.time()
+        self.highlight_start_time = clock.now()
         # Reset hover state
         self.hover_instrument = -1
         self.hover_start_time = 0
         self.hover_progress = 0.0
+        self.scheduler.clear()
+        self.schedule_sequence(clock.now())
+        
+    def schedule_sequence(self, start):
+        """Planuje pokaz sekwencji od czasu start: dźwięk i podświetlenie każdego instrumentu"""
+        step_time = start
+        for position, instrument_index in enumerate(self.sequence):
+            duration = max(SOUND_BANK.length(INSTRUMENTS[instrument_index]["name"]), MIN_HIGHLIGHT_TIME)
+            self.scheduler.schedule(step_time, self.show_sequence_step, position)
+            self.scheduler.schedule(step_time + duration, self.hide_highlight)
+            step_time += duration + SEQUENCE_GAP
+        self.scheduler.schedule(step_time, self.finish_showing)
+        
+    def show_sequence_step(self, position):
+        """Podświetla i odtwarza instrument z danej pozycji sekwencji"""
+        instrument_index = self.sequence[position]
+        self.sequence_display_index = position
+        self.highlight_instrument = instrument_index
+        self.highlight_start_time = clock.now()
+        SOUND_BANK.play(INSTRUMENTS[instrument_index]["name"])
+        
+    def hide_highlight(self):
+        self.highlight_instrument = -1
+        
+    def finish_showing(self):
+        """Koniec pokazywania sekwencji - kolej gracza"""
+        self.game_state = GAME_STATE_WAITING
+        self.highlight_instrument = -1
+        print("Twoja kolej! Powtorz sekwencje.")
+        
+    def next_level(self):
+        self.level += 1
+        self.waiting_for_next_level = False
+        self.generate_new_sequence()
         
     def update(self):
         """Aktualizuje stan gry"""
-        current_time = time.time()
+        current_time = clock.now()
         
-        if self.game_state == GAME_STATE_SHOWING:
-            if self.sequence_display_index < len(self.sequence):
-                instrument_index = self.sequence[self.sequence_display_index]
-                instrument = INSTRUMENTS[instrument_index]
-                
-                # Zagraj dźwięk instrumentu
-                instrument["sound"].play()
-                duration = instrument["sound"].get_length()
-                
-                # Poczekaj na zakończenie odtwarzania
-                time.sleep(duration+0.5)
-                
-                # Przejdź do następnego instrumentu
-                self.sequence_display_index += 1
-            else:
-                # Koniec pokazywania sekwencji
-                self.game_state = GAME_STATE_WAITING
-                self.highlight_instrument = -1
-                print("Twoja kolej! Powtorz sekwencje.")
-                
-        elif self.game_state == GAME_STATE_SUCCESS:
-            # Czekamy aż gracz ukończy całą sekwencję przed przejściem do następnego poziomu
-            if self.waiting_for_next_level and current_time - self.sequence_completed_time > 1.5:
-                self.level += 1
-                self.waiting_for_next_level = False
-                self.generate_new_sequence()
+        # Zaległe zdarzenia pokazu sekwencji i przejścia poziomu (bez czekania)
+        self.scheduler.update(current_time)
         
         # Aktualizuj stan hover (tylko dla trybu ręki)
         if self.control_mode == CONTROL_HAND and self.game_state == GAME_STATE_WAITING:
@@ -136,20 +169,16 @@ class MusicalGame:
         self.hover_start_time = 0
         self.hover_progress = 0.0
     
-    def update_hover(self, x, y):
+    def update_hover(self, x, y, frame_width, frame_height):
         """Aktualizuje stan hover na podstawie pozycji kursora (tylko dla trybu ręki)"""
         if self.control_mode != CONTROL_HAND or self.game_state != GAME_STATE_WAITING:
             return
         
-        current_time = time.time()
+        current_time = clock.now()
         
-        # Sprawdź czy kursor jest nad którymś instrumentem
-        hovered_instrument = -1
-        for i, instrument in enumerate(INSTRUMENTS):
-            dist = math.sqrt((x - instrument["pos"][0])**2 + (y - instrument["pos"][1])**2)
-            if dist <= INSTRUMENT_RADIUS:
-                hovered_instrument = i
-                break
+        # Sprawdź czy kursor jest nad którymś instrumentem (z histerezą na krawędzi)
+        hit_map = LAYOUT.transform(frame_width, frame_height).hit_map
+        hovered_instrument = hit_map.query_hover(x, y, self.hover_instrument)
         
         # Aktualizuj stan hover
         if hovered_instrument != self.hover_instrument:
@@ -163,21 +192,19 @@ class MusicalGame:
                 # Palec opuścił wszystkie instrumenty
                 self.reset_hover_state()
     
-    def check_touch(self, x, y):
+    def check_touch(self, x, y, frame_width, frame_height):
         """Sprawdza czy pozycja dotyka któregoś z instrumentów (tylko dla trybu myszy)"""
         if self.control_mode != CONTROL_MOUSE or self.game_state != GAME_STATE_WAITING:
             return
             
-        current_time = time.time()
+        current_time = clock.now()
         if current_time - self.last_touch_time < self.touch_cooldown:
             return
         
-        for i, instrument in enumerate(INSTRUMENTS):
-            dist = math.sqrt((x - instrument["pos"][0])**2 + (y - instrument["pos"][1])**2)
-            if dist <= INSTRUMENT_RADIUS:
-                self.activate_instrument(i)
-                self.last_touch_time = current_time
-                break
+        touched_instrument = LAYOUT.transform(frame_width, frame_height).hit_map.query(x, y)
+        if touched_instrument >= 0:
+            self.activate_instrument(touched_instrument)
+            self.last_touch_time = current_time
     
     def activate_instrument(self, instrument_index):
         """Aktywuje wybrany instrument"""
@@ -185,8 +212,7 @@ class MusicalGame:
         expected_instrument = self.sequence[self.current_sequence_index]
         
         print(f"Aktywowano: {INSTRUMENTS[instrument_index]['name']}")
-        INSTRUMENTS[instrument_index]["sound"].play()
-        INSTRUMENTS[instrument_index]["sound"].set_volume(0.8)  # 0.0 - 1.0
+        SOUND_BANK.play(INSTRUMENTS[instrument_index]["name"], 0.8)  # Głośność 0.0 - 1.0
         
         if instrument_index == expected_instrument:
             print("✓ Dobrze!")
@@ -196,9 +222,9 @@ class MusicalGame:
             if self.current_sequence_index >= len(self.sequence):
                 print(f"🎉 Poziom {self.level} ukonczony!")
                 self.game_state = GAME_STATE_SUCCESS
-                self.sequence_completed_time = time.time()
+                self.sequence_completed_time = clock.now()
                 self.waiting_for_next_level = True
-                time.sleep(2)
+                self.scheduler.schedule(self.sequence_completed_time + LEVEL_PAUSE, self.next_level)
         else:
             print(f"✗ Błąd! Oczekiwano: {INSTRUMENTS[expected_instrument]['name']}")
             self.game_state = GAME_STATE_GAME_OVER
@@ -206,7 +232,7 @@ class MusicalGame:
     
     def is_point_in_game_area(self, x, y, frame_width, frame_height):
         """Sprawdza czy punkt znajduje się w obszarze gry"""
-        margin = 50
+        margin = GAME_AREA_MARGIN
         return (margin <= x <= frame_width - margin and 
                 margin <= y <= frame_height - margin)
 
@@ -251,50 +277,38 @@ def show_game_over_screen():
     cv2.namedWindow("Koniec gry")
     cv2.setMouseCallback("Koniec gry", mouse_callback_game_over)
 
+    # Obraz jest statyczny - wyświetlamy go raz, a w pętli tylko czekamy na zdarzenia
+    cv2.imshow("Koniec gry", img)
     while True:
-        cv2.imshow("Koniec gry", img)
 
         if game_over_choice is not None:
             break
 
-        if cv2.waitKey(20) & 0xFF == 27:  # ESC
+        if cv2.waitKey(MENU_WAIT_MS) & 0xFF == 27:  # ESC
             game_over_choice = "quit"
             break
 
     cv2.destroyWindow("Koniec gry")
     return game_over_choice
 
-def run_challenge(control_mode):
+def run_challenge(control_mode, tracker_settings=None, cursor_settings=None, input_settings=None,
+                  render_settings=None, loop_settings=None):
     """Główna funkcja uruchamiająca tryb wyzwania dla jednego gracza"""
-    # Inicjalizacja MediaPipe (tylko gdy używamy trybu ręki)
-    mp_hands = None
-    hands = None
-    if control_mode == CONTROL_HAND:
-        mp_hands = mp.solutions.hands
-        hands = mp_hands.Hands(
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7,
-            max_num_hands=1
-        )
-
-    # Inicjalizacja gry i kamery
-    game = MusicalGame(control_mode)
-    cap = cv2.VideoCapture(0)
-    cv2.namedWindow('Edukacyjna Gra Muzyczna - Wyzwanie', cv2.WINDOW_NORMAL)
-
-    # Funkcja obsługi myszy
-    mouse_x, mouse_y = 0, 0
-    mouse_clicked = False
+    # Wyjście obrazu: okno albo bez ekranu (benchmark, hashe klatek, plik wideo)
+    sink = open_render_sink('Edukacyjna Gra Muzyczna - Wyzwanie', render_settings)
 
-    def mouse_callback(event, x, y, flags, param):
-        nonlocal mouse_x, mouse_y, mouse_clicked
-        mouse_x, mouse_y = x, y
-        if event == cv2.EVENT_LBUTTONDOWN:
-            mouse_clicked = True
+    # Źródło wejścia: kamera ze śledzeniem dłoni, mysz, wideo lub nagrana sesja
+    source = open_input_source(control_mode, sink.window_name,
+                               input_settings, tracker_settings, cursor_settings)
+    control_mode = source.control_mode
 
-    # Ustawienie callback dla myszy
-    if control_mode == CONTROL_MOUSE:
-        cv2.setMouseCallback('Edukacyjna Gra Muzyczna - Wyzwanie', mouse_callback)
+    # Inicjalizacja gry
+    game = MusicalGame(control_mode)
+    # Logika gry ze stalym krokiem, rysowanie z docelowym FPS
+    loop = FrameLoop(loop_settings)
+    # Na slabym komputerze jakośc spada stopniowo, zamiast tracic plynnośc
+    governor = QualityGovernor(loop.frame_time, {"enabled": loop.adaptive_quality})
+    render_scale = 1.0
 
     print("🎵 Edukacyjna Gra Muzyczna - Tryb Wyzwania 🎵")
     print("Obserwuj sekwencję podświetlanych instrumentów, a następnie powtórz ją!")
@@ -305,55 +319,42 @@ def run_challenge(control_mode):
     print("Naciśnij ESC aby zakończyć.")
 
     while True:
-        ret, frame = cap.read()
+        ret, frame_size = source.read_frame_size()
         if not ret:
             print("Błąd: Nie można odczytać klatki z kamery")
             break
 
-        # Odbij kamerę poziomo dla bardziej naturalnego doświadczenia
-        frame = cv2.flip(frame, 1)
-        h, w, _ = frame.shape
+        # Klatka kamery nie jest wyświetlana (ani kopiowana) - wyznacza tylko rozmiar
+        # planszy, zmniejszany przez QualityGovernor (uklad jest niezalezny od rozdzielczości)
+        w, h = frame_size
+        h, w = max(1, int(h * render_scale)), max(1, int(w * render_scale))
         
-        # Znajdź pozycję kursora (palec lub mysz)
-        cursor_x, cursor_y = None, None
+        # Znajdź pozycję kursora (palec lub mysz) - bez czekania na MediaPipe
+        cursor_x, cursor_y, mouse_clicked = source.poll(w, h)
         
-        if control_mode == CONTROL_HAND:
-            # Konwertuj na RGB dla MediaPipe
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(rgb)
-            
-            # Znajdź pozycję palca wskazującego prawej ręki
-            if results.multi_hand_landmarks and results.multi_handedness:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    if handedness.classification[0].label == 'Right':
-                        # Punkt 8 to czubek palca wskazującego
-                        finger_tip = hand_landmarks.landmark[8]
-                        cursor_x = int(finger_tip.x * w)
-                        cursor_y = int(finger_tip.y * h)
-                        break
-        
-        elif control_mode == CONTROL_MOUSE:
-            cursor_x, cursor_y = mouse_x, mouse_y
-            
+        if control_mode == CONTROL_MOUSE:
             # Sprawdź czy mysz jest w obszarze gry
             if not game.is_point_in_game_area(cursor_x, cursor_y, w, h):
                 cursor_x, cursor_y = None, None
         
-        # Aktualizuj stan gry
-        result = game.update()
+        # Aktualizuj stan gry (stala liczba krokow na sekunde)
+        for _ in range(loop.begin_frame()):
+            game.update()
         
         # Sprawdź czy gra się skończyła
         if game.game_state == GAME_STATE_GAME_OVER:
-            choice = show_game_over_screen()
+            # Bez okna (benchmark, odtwarzanie) gra zaczyna sie od nowa automatycznie
+            choice = show_game_over_screen() if sink.interactive else "retry"
             if choice == "retry":
                 print("Gra rozpoczyna się od nowa...")
                 game = MusicalGame(control_mode)  # Nowa gra
             elif choice == "menu":
                 print("Powrót do menu głównego...")
-                cap.release()
-                cv2.destroyAllWindows()
-                if hands:
-                    hands.close()
+                print(source.stats_text())
+                print(sink.stats_text())
+                print(loop.stats_text())
+                source.release()
+                sink.close()
                 return "menu"
             else:
                 print("Gra zakończona.")
@@ -361,62 +362,44 @@ def run_challenge(control_mode):
         
         # Aktualizuj hover (dla trybu ręki) lub sprawdź kliknięcie (dla trybu myszy)
         if control_mode == CONTROL_HAND and cursor_x is not None and cursor_y is not None:
-            game.update_hover(cursor_x, cursor_y)
+            game.update_hover(cursor_x, cursor_y, w, h)
         elif control_mode == CONTROL_MOUSE and mouse_clicked and cursor_x is not None and cursor_y is not None:
-            game.check_touch(cursor_x, cursor_y)
-            mouse_clicked = False  # Reset flagi kliknięcia
+            game.check_touch(cursor_x, cursor_y, w, h)
         elif control_mode == CONTROL_HAND and cursor_x is None:
             # Jeśli palec nie jest wykryty, resetuj hover
             game.reset_hover_state()
         
-        # Rysuj tło
-        cv2.rectangle(frame, (0, 0), (w, h), (20, 20, 20), -1)
+        # Statyczna plansza (tło, instrumenty, podpisy, granice obszaru myszy) - jedna kopia
+        frame = SCENE.frame(w, h, GAME_AREA_MARGIN if control_mode == CONTROL_MOUSE else None)
+        screen = LAYOUT.transform(w, h)
         
-        # Rysuj instrumenty
-        for i, instrument in enumerate(INSTRUMENTS):
-            pos = instrument["pos"]
-            color = instrument["color"]
-            
-            # Sprawdź czy instrument powinien być podświetlony (sekwencja) lub ma hover
-            is_sequence_highlight = (game.highlight_instrument == i)
-            is_hover_highlight = (control_mode == CONTROL_HAND and game.hover_instrument == i)
-            
-            if is_sequence_highlight:
-                # Rysuj podświetlenie sekwencji (białe)
-                cv2.circle(frame, pos, HIGHLIGHT_RADIUS, (255, 255, 255), 3)
-                cv2.circle(frame, pos, HIGHLIGHT_RADIUS - 5, color, -1)
-            elif is_hover_highlight:
-                # Rysuj postęp hover (zielony pierścień)
-                cv2.circle(frame, pos, INSTRUMENT_RADIUS, color, -1)
-                cv2.circle(frame, pos, INSTRUMENT_RADIUS, (255, 255, 255), 2)
-                
-                # Rysuj pierścień postępu
-                if game.hover_progress > 0:
-                    angle_end = int(360 * game.hover_progress)
-                    # Używamy elipsy do rysowania łuku postępu
-                    overlay = frame.copy()
-                    cv2.ellipse(overlay, pos, (HIGHLIGHT_RADIUS, HIGHLIGHT_RADIUS), 
-                               -90, 0, angle_end, (0, 255, 0), 4)
-                    frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
-                    
-                    # Rysuj tekst z postępem
-                    progress_text = f"{int(game.hover_progress * 100)}%"
-                    text_size = cv2.getTextSize(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
-                    text_pos = (pos[0] - text_size[0] // 2, pos[1] + 5)
-                    cv2.putText(frame, progress_text, text_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-            else:
-                # Rysuj normalny instrument
-                cv2.circle(frame, pos, INSTRUMENT_RADIUS, color, -1)
-                cv2.circle(frame, pos, INSTRUMENT_RADIUS, (255, 255, 255), 2)
-            
-            # Rysuj nazwę instrumentu
-            text_size = cv2.getTextSize(instrument["name"], cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
-            text_x = pos[0] - text_size[0] // 2
-            text_y = pos[1] + INSTRUMENT_RADIUS + 20
+        # Podświetlenie sekwencji (białe) - zasłania podpis, więc rysujemy go ponownie
+        if game.highlight_instrument >= 0:
+            i = game.highlight_instrument
+            pos = screen.center(i)
+            highlight_radius = screen.radius(i, HIGHLIGHT_SCALE)
+            cv2.circle(frame, pos, highlight_radius, (255, 255, 255), 3)
+            cv2.circle(frame, pos, highlight_radius - 5, INSTRUMENTS[i]["color"], -1)
+            SCENE.draw_label(frame, i)
+        
+        # Pierścień postępu hover (zielony), tylko dla trybu ręki
+        if (control_mode == CONTROL_HAND and game.hover_instrument >= 0
+                and game.hover_instrument != game.highlight_instrument and game.hover_progress > 0):
+            i = game.hover_instrument
+            pos = screen.center(i)
+            highlight_radius = screen.radius(i, HIGHLIGHT_SCALE)
+            angle_end = int(360 * game.hover_progress)
+            # Używamy elipsy do rysowania łuku postępu
+            OVERLAY.ellipse(pos, (highlight_radius, highlight_radius), -90, 0, angle_end, (0, 255, 0), 4,
+                            opacity=0.3)
+            OVERLAY.flush(frame)
+            SCENE.draw_label(frame, i)
             
-            # Tło dla tekstu
-            cv2.rectangle(frame, (text_x - 5, text_y - 15), (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
-            cv2.putText(frame, instrument["name"], (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            # Rysuj tekst z postępem
+            progress_text = f"{int(game.hover_progress * 100)}%"
+            text_size = measure_text(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
+            text_pos = (pos[0] - text_size[0] // 2, pos[1] + 5)
+            put_text(frame, progress_text, text_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
         
         # Rysuj pozycję kursora (palec lub mysz)
         if cursor_x is not None and cursor_y is not None:
@@ -427,10 +410,6 @@ def run_challenge(control_mode):
                 cv2.circle(frame, (cursor_x, cursor_y), 6, (255, 0, 0), -1)
                 cv2.circle(frame, (cursor_x, cursor_y), 10, (255, 255, 255), 2)
         
-        # Rysuj granice obszaru gry (dla trybu myszy)
-        if control_mode == CONTROL_MOUSE:
-            cv2.rectangle(frame, (50, 50), (w-50, h-50), (100, 100, 100), 2)
-        
         # Rysuj informacje o stanie gry
         info_y = 30
         if game.game_state == GAME_STATE_SHOWING:
@@ -452,32 +431,40 @@ def run_challenge(control_mode):
             color = (100, 100, 255)
         
         # Tło dla informacji
-        text_size = cv2.getTextSize(info_text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+        text_size = measure_text(info_text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
         cv2.rectangle(frame, (10, 5), (text_size[0] + 20, 40), (0, 0, 0), -1)
-        cv2.putText(frame, info_text, (15, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+        put_text(frame, info_text, (15, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
         
         # Rysuj poziom i tryb sterowania
         level_text = f"Poziom: {game.level}"
         control_text = f"Tryb: {'Ręka (1s hover)' if control_mode == CONTROL_HAND else 'Mysz (klik)'}"
         
         cv2.rectangle(frame, (w - 170, 5), (w - 10, 70), (0, 0, 0), -1)
-        cv2.putText(frame, level_text, (w - 165, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        cv2.putText(frame, control_text, (w - 165, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        put_text(frame, level_text, (w - 165, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        put_text(frame, control_text, (w - 165, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
         
         # Wyświetl klatkę
-        cv2.imshow('Edukacyjna Gra Muzyczna - Wyzwanie', frame)
+        put_text(frame, governor.stat_text(), (10, h - 12), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        key = sink.show(frame, loop.idle_time())
+        loop.end_frame()
+        if governor.frame_done(loop.work_time):
+            quality = governor.quality
+            source.set_quality(quality)
+            OVERLAY.translucent = quality["translucent"]
+            render_scale = quality["render_scale"]
         
         # Sprawdź wyjście (ESC)
-        if cv2.waitKey(1) & 0xFF == 27:
+        if source.poll_key(key) == 27:
             break
-        if cv2.getWindowProperty("Edukacyjna Gra Muzyczna - Wyzwanie", cv2.WND_PROP_VISIBLE) < 1:
+        if not sink.is_open():
             break
 
     # Cleanup
-    cap.release()
-    cv2.destroyAllWindows()
-    if hands:
-        hands.close()
+    print(source.stats_text())
+    print(sink.stats_text())
+    print(loop.stats_text())
+    source.release()
+    sink.close()
     print("Dziękuję za grę w trybie wyzwania! 🎵")
 
 if __name__ == "__main__":
@@ -0,0 +1,42 @@
+import time
+
+# Czas wirtualny uzywany przy odtwarzaniu nagranych sesji. Gdy jest None,
+# gra korzysta z normalnego zegara systemowego.
+_virtual_time = None
+
+
+def now():
+    """Aktualny czas gry w sekundach"""
+    if _virtual_time is not None:
+        return _virtual_time
+    return time.time()
+
+
+def sleep(seconds):
+    """Czeka podany czas - w trybie wirtualnym tylko przesuwa zegar"""
+    global _virtual_time
+    if _virtual_time is not None:
+        _virtual_time += seconds
+    else:
+        time.sleep(seconds)
+
+
+def use_virtual_time(start=0.0):
+    """Przelacza gre na zegar wirtualny, przesuwany tylko przez advance()"""
+    global _virtual_time
+    _virtual_time = start
+
+
+def use_real_time():
+    global _virtual_time
+    _virtual_time = None
+
+
+def is_virtual():
+    return _virtual_time is not None
+
+
+def advance(seconds):
+    global _virtual_time
+    if _virtual_time is not None:
+        _virtual_time += seconds
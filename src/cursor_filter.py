@@ -0,0 +1,110 @@
+import math
+import time
+
+# Domyślne ustawienia filtra kursora, wspolne dla wszystkich trybow gry
+CURSOR_FILTER_SETTINGS = {
+    "enabled": True,
+    "min_cutoff": 1.0,       # Hz - wygladzanie przy wolnym ruchu (mniej = gladszy kursor)
+    "beta": 0.01,            # Jak szybko filtr "puszcza" przy szybkim ruchu
+    "d_cutoff": 1.0,         # Hz - wygladzanie estymaty predkości
+    "prediction_gain": 0.5,  # Jaka czesc opoznienia kamery i detekcji kompensujemy
+    "max_prediction": 0.15,  # Maksymalny horyzont ekstrapolacji (s)
+}
+
+# Kursor musi odsunac sie o tyle promieni od środka, zeby opuścic instrument
+HOVER_EXIT_SCALE = 1.25
+
+
+def _smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class OneEuroFilter:
+    """Filtr One Euro dla jednej wspolrzednej (Casiez i in., 2012).
+
+    Przy wolnym ruchu mocno wygladza drgania, a przy szybkim zwieksza
+    czestotliwośc odciecia, zeby kursor nie zostawal w tyle.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = 0.0
+        self.last_time = None
+
+    def update(self, value, timestamp):
+        if self.value is None:
+            self.value = value
+            self.last_time = timestamp
+            return self.value
+
+        dt = timestamp - self.last_time
+        if dt <= 0:
+            return self.value
+        self.last_time = timestamp
+
+        raw_velocity = (value - self.value) / dt
+        a_d = _smoothing_factor(dt, self.d_cutoff)
+        self.velocity = a_d * raw_velocity + (1 - a_d) * self.velocity
+
+        cutoff = self.min_cutoff + self.beta * abs(self.velocity)
+        a = _smoothing_factor(dt, cutoff)
+        self.value = a * value + (1 - a) * self.value
+        return self.value
+
+
+class CursorFilter:
+    """Wygladza pozycje czubka palca i przewiduje ja na chwile wyświetlania.
+
+    Kazdy nowy wynik detekcji (rozpoznawany po frame_id) trafia do filtrow
+    One Euro. Przy kazdym odczycie pozycja jest ekstrapolowana przefiltrowana
+    predkościa o czesc czasu, ktory uplynal od przechwycenia klatki, co
+    kompensuje czesc opoznienia kamery i detekcji.
+    """
+
+    def __init__(self, settings=None):
+        options = dict(CURSOR_FILTER_SETTINGS)
+        if settings:
+            options.update(settings)
+        self.enabled = options["enabled"]
+        self.prediction_gain = options["prediction_gain"]
+        self.max_prediction = options["max_prediction"]
+        self.filter_x = OneEuroFilter(options["min_cutoff"], options["beta"], options["d_cutoff"])
+        self.filter_y = OneEuroFilter(options["min_cutoff"], options["beta"], options["d_cutoff"])
+        self.last_frame_id = None
+        self.size = None
+
+    def reset(self):
+        self.filter_x.reset()
+        self.filter_y.reset()
+        self.last_frame_id = None
+
+    def apply(self, hand_result, width, height):
+        """Zwraca wygladzona i przewidziana pozycje kursora w pikselach okna"""
+        raw_x, raw_y = hand_result.cursor(width, height)
+        if raw_x is None or not self.enabled:
+            return raw_x, raw_y
+
+        # Zmiana rozmiaru okna uniewaznia stan filtra (inne jednostki)
+        if self.size != (width, height):
+            self.size = (width, height)
+            self.reset()
+
+        if hand_result.frame_id != self.last_frame_id:
+            self.last_frame_id = hand_result.frame_id
+            self.filter_x.update(raw_x, hand_result.timestamp)
+            self.filter_y.update(raw_y, hand_result.timestamp)
+
+        lead = min(time.perf_counter() - hand_result.timestamp, self.max_prediction) * self.prediction_gain
+        x = self.filter_x.value + self.filter_x.velocity * lead
+        y = self.filter_y.value + self.filter_y.velocity * lead
+        x = min(max(x, 0), width - 1)
+        y = min(max(y, 0), height - 1)
+        return int(x), int(y)
+
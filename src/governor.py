@@ -0,0 +1,101 @@
+import clock
+
+# Kolejne poziomy obnizania jakości - od pelnej do najtanszej
+QUALITY_LEVELS = [
+    {"name": "pelna", "inference_stride": 1, "inference_width": None, "translucent": True, "render_scale": 1.0},
+    {"name": "detekcja co 2", "inference_stride": 2, "inference_width": None, "translucent": True,
+     "render_scale": 1.0},
+    {"name": "mniejsza detekcja", "inference_stride": 2, "inference_width": 320, "translucent": True,
+     "render_scale": 1.0},
+    {"name": "bez przezroczystosci", "inference_stride": 2, "inference_width": 320, "translucent": False,
+     "render_scale": 1.0},
+    {"name": "obraz 75%", "inference_stride": 3, "inference_width": 256, "translucent": False,
+     "render_scale": 0.75},
+    {"name": "obraz 50%", "inference_stride": 3, "inference_width": 256, "translucent": False,
+     "render_scale": 0.5},
+]
+
+# Domyślne ustawienia regulatora jakości
+GOVERNOR_SETTINGS = {
+    "enabled": True,
+    "smoothing": 0.1,      # Waga nowej klatki w średniej czasu pracy
+    "overload": 1.0,       # Obnizamy jakośc, gdy praca zajmuje wiecej niz budzet klatki...
+    "headroom": 0.6,       # ...a podnosimy, gdy mniej niz ta czesc budzetu
+    "degrade_after": 15,   # Tyle klatek z rzedu ponad budzetem przed obnizeniem
+    "upgrade_after": 120,  # Tyle klatek z rzedu z zapasem przed podniesieniem
+}
+
+
+class QualityGovernor:
+    """Pilnuje docelowej liczby klatek, zmieniajac poziom jakości.
+
+    Mierzy czas pracy nad klatka (bez czasu uśpienia petli) i porownuje go
+    z budzetem 1 / target_fps. Gdy praca stale przekracza budzet, przechodzi
+    do kolejnego poziomu z QUALITY_LEVELS (rzadsza i mniejsza detekcja dloni,
+    brak przezroczystości, nizsza rozdzielczośc rysowania); gdy jest zapas,
+    wraca poziom wyzej. Przy wirtualnym zegarze jest wylaczony, zeby
+    odtwarzanie dawalo zawsze ten sam obraz.
+    """
+
+    def __init__(self, frame_budget, settings=None):
+        options = dict(GOVERNOR_SETTINGS)
+        if settings:
+            options.update(settings)
+        self.enabled = options["enabled"] and frame_budget > 0 and not clock.is_virtual()
+        self.frame_budget = frame_budget
+        self.smoothing = options["smoothing"]
+        self.overload = options["overload"]
+        self.headroom = options["headroom"]
+        self.degrade_after = options["degrade_after"]
+        self.upgrade_after = options["upgrade_after"]
+
+        self.level = 0
+        self.work_time = None  # Wygladzony czas pracy nad klatka (s)
+        self.over_frames = 0
+        self.under_frames = 0
+        self.changes = 0
+
+    @property
+    def quality(self):
+        return QUALITY_LEVELS[self.level]
+
+    def frame_done(self, work_time):
+        """Zapisuje czas pracy nad klatka; zwraca True, gdy zmienil sie poziom jakości"""
+        if not self.enabled:
+            return False
+        if self.work_time is None:
+            self.work_time = work_time
+        else:
+            self.work_time += self.smoothing * (work_time - self.work_time)
+
+        load = self.work_time / self.frame_budget
+        if load > self.overload:
+            self.over_frames += 1
+            self.under_frames = 0
+        elif load < self.headroom:
+            self.under_frames += 1
+            self.over_frames = 0
+        else:
+            self.over_frames = 0
+            self.under_frames = 0
+
+        if self.over_frames >= self.degrade_after and self.level < len(QUALITY_LEVELS) - 1:
+            return self._set_level(self.level + 1)
+        if self.under_frames >= self.upgrade_after and self.level > 0:
+            return self._set_level(self.level - 1)
+        return False
+
+    def _set_level(self, level):
+        self.level = level
+        self.over_frames = 0
+        self.under_frames = 0
+        self.changes += 1
+        return True
+
+    def stat_text(self):
+        """Krotka linia stanu do wyświetlenia na ekranie"""
+        if not self.enabled:
+            return "Jakosc: stala"
+        work_ms = (self.work_time or 0.0) * 1000.0
+        return (f"Jakosc {self.level}/{len(QUALITY_LEVELS) - 1}: {self.quality['name']} | "
+                f"praca {work_ms:.0f}/{self.frame_budget * 1000.0:.0f} ms")
@@ -0,0 +1,610 @@
+import threading
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from buffers import frame_pool
+
+# Punkt 8 to czubek palca wskazujacego
+INDEX_FINGER_TIP = 8
+
+
+# Domyślne ustawienia śledzenia dloni, wspolne dla wszystkich trybow gry
+HAND_TRACKER_SETTINGS = {
+    "backend": "mediapipe",    # "mediapipe" lub "marker" (kolorowy znacznik / rekawiczka)
+    "model_complexity": 1,     # MediaPipe: 0 - lite (szybszy), 1 - full (dokladniejszy)
+    "roi_tracking": True,      # Detekcja tylko w wycinku wokol dloni
+    "detect_every": 1,         # Pelna detekcja co N klatek, pomiedzy nimi przeplyw optyczny
+    "max_num_hands": 1,        # Ile dloni śledzic naraz (wiecej niz 1 - gra wieloosobowa jednocześnie)
+}
+
+BACKEND_MEDIAPIPE = "mediapipe"
+BACKEND_MARKER = "marker"
+
+
+def find_right_hand(results):
+    """Zwraca landmarki prawej reki z wyniku MediaPipe lub None"""
+    if results.multi_hand_landmarks and results.multi_handedness:
+        for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
+            if handedness.classification[0].label == 'Right':
+                return hand_landmarks
+    return None
+
+
+class MediaPipeBackend:
+    """Detekcja prawej dloni modelem MediaPipe Hands"""
+
+    def __init__(self, model_complexity=1, max_num_hands=1,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.7):
+        self.model_complexity = model_complexity
+        self.hands = mp.solutions.hands.Hands(
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            max_num_hands=max_num_hands
+        )
+
+    def _rgb(self, image, reuse_buffers):
+        # Bufor z puli tylko dla obrazow o stalym rozmiarze - wycinek ROI zmienia go co klatke
+        dst = frame_pool().like("rgb", image) if reuse_buffers else None
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=dst)
+
+    def detect(self, image, reuse_buffers=True):
+        """Zwraca 21 punktow (x, y) prawej reki znormalizowanych do obrazu lub None"""
+        hand = find_right_hand(self.hands.process(self._rgb(image, reuse_buffers)))
+        if hand is None:
+            return None
+        return [(lm.x, lm.y) for lm in hand.landmark]
+
+    def detect_all(self, image, reuse_buffers=True):
+        """Zwraca liste punktow wszystkich dloni w kadrze (bez wzgledu na strone)"""
+        results = self.hands.process(self._rgb(image, reuse_buffers))
+        if not results.multi_hand_landmarks:
+            return []
+        return [[(lm.x, lm.y) for lm in hand.landmark] for hand in results.multi_hand_landmarks]
+
+    def describe(self):
+        return f"MediaPipe ({'lite' if self.model_complexity == 0 else 'full'})"
+
+    def close(self):
+        self.hands.close()
+
+
+class ColorMarkerBackend:
+    """Tania detekcja bez sieci neuronowej - śledzi kolorowy znacznik na palcu.
+
+    Szuka najwiekszej plamy w zadanym zakresie HSV (np. zielona naklejka lub
+    rekawiczka) na zmniejszonej klatce i zwraca jej środek jako czubek palca.
+    """
+
+    def __init__(self, hsv_lower=(40, 80, 80), hsv_upper=(80, 255, 255), work_width=160, min_area=0.0005,
+                 max_num_hands=1):
+        self.hsv_lower = np.array(hsv_lower, dtype=np.uint8)
+        self.hsv_upper = np.array(hsv_upper, dtype=np.uint8)
+        self.work_width = work_width
+        self.min_area = min_area  # Minimalny udzial plamy w powierzchni obrazu
+        self.max_num_hands = max_num_hands
+
+    def detect(self, image, reuse_buffers=True):
+        """Zwraca liste z jednym punktem (x, y) znacznika znormalizowanym do obrazu lub None"""
+        markers = self.detect_all(image, 1, reuse_buffers)
+        return markers[0] if markers else None
+
+    def detect_all(self, image, max_markers=None, reuse_buffers=True):
+        """Zwraca liste znacznikow (od najwiekszego), kazdy jako lista z jednym punktem (x, y)"""
+        if max_markers is None:
+            max_markers = self.max_num_hands
+        pool = frame_pool()
+        h, w = image.shape[:2]
+        if w > self.work_width:
+            scale = self.work_width / w
+            h, w = max(1, int(h * scale)), self.work_width
+            image = cv2.resize(image, (w, h), dst=pool.get("marker", (h, w, 3)) if reuse_buffers else None,
+                               interpolation=cv2.INTER_AREA)
+
+        hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV,
+                           dst=pool.get("marker_hsv", (h, w, 3)) if reuse_buffers else None)
+        mask = cv2.inRange(hsv, self.hsv_lower, self.hsv_upper,
+                           dst=pool.get("marker_mask", (h, w)) if reuse_buffers else None)
+        count, _, stats, centroids = cv2.connectedComponentsWithStats(mask)
+        if count < 2:
+            return []
+
+        # Etykieta 0 to tlo - bierzemy najwieksze plamy powyzej progu
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        order = 1 + np.argsort(-areas)[:max_markers]
+        markers = []
+        for label in order:
+            if stats[label, cv2.CC_STAT_AREA] < self.min_area * w * h:
+                break
+            cx, cy = centroids[label]
+            markers.append([(cx / w, cy / h)])
+        return markers
+
+    def describe(self):
+        return "Znacznik kolorowy"
+
+    def close(self):
+        pass
+
+
+class RoiHandDetector:
+    """Detekcja dloni tylko w przewidywanym obszarze wokol reki.
+
+    Na podstawie punktow z poprzedniej klatki (i ich przesuniecia) wyznacza
+    ramke dloni, wycina ja i zmniejsza do roi_size pikseli. Gdy dlon zostanie
+    zgubiona, szuka jej na calej klatce zmniejszonej do search_width pikseli.
+    Zwracane punkty sa zawsze znormalizowane do calej klatki.
+    """
+
+    def __init__(self, backend, roi_size=192, search_width=320, margin=0.4, min_box=64):
+        self.backend = backend
+        self.roi_size = roi_size
+        self.search_width = search_width
+        self.margin = margin  # Powiekszenie ramki wzgledem dloni (z kazdej strony)
+        self.min_box = min_box
+        self.prev_landmarks = None
+        self.prev_center = None
+        self.roi_hits = 0
+        self.full_searches = 0
+
+    def _predict_box(self, frame_w, frame_h):
+        xs = [p[0] * frame_w for p in self.prev_landmarks]
+        ys = [p[1] * frame_h for p in self.prev_landmarks]
+        cx = (min(xs) + max(xs)) / 2
+        cy = (min(ys) + max(ys)) / 2
+
+        # Przesun ramke o ostatni ruch dloni (stala predkośc)
+        if self.prev_center is not None:
+            cx += cx - self.prev_center[0]
+            cy += cy - self.prev_center[1]
+
+        side = max(max(xs) - min(xs), max(ys) - min(ys))
+        side = max(side * (1 + 2 * self.margin), self.min_box)
+        x1 = int(max(0, cx - side / 2))
+        y1 = int(max(0, cy - side / 2))
+        x2 = int(min(frame_w, cx + side / 2))
+        y2 = int(min(frame_h, cy + side / 2))
+        return x1, y1, x2, y2
+
+    def _detect_scaled(self, image, target, reuse_buffers=True):
+        """Zmniejsza obraz tak, by dluzszy bok mial target pikseli, i uruchamia detekcje.
+
+        Wycinek ROI ma inny rozmiar prawie w kazdej klatce, wiec dla niego
+        reuse_buffers=False - bufory z puli dostaja tylko obrazy o stalym rozmiarze.
+        """
+        h, w = image.shape[:2]
+        scale = target / max(w, h)
+        if scale < 1.0:
+            size_w, size_h = max(1, int(w * scale)), max(1, int(h * scale))
+            dst = frame_pool().get("search", (size_h, size_w) + image.shape[2:], image.dtype) if reuse_buffers else None
+            image = cv2.resize(image, (size_w, size_h), dst=dst, interpolation=cv2.INTER_AREA)
+        return self.backend.detect(image, reuse_buffers)
+
+    def detect(self, frame):
+        frame_h, frame_w = frame.shape[:2]
+        landmarks = None
+
+        if self.prev_landmarks is not None:
+            x1, y1, x2, y2 = self._predict_box(frame_w, frame_h)
+            if x2 - x1 > 1 and y2 - y1 > 1:
+                roi_landmarks = self._detect_scaled(frame[y1:y2, x1:x2], self.roi_size, reuse_buffers=False)
+                if roi_landmarks is not None:
+                    # Przelicz wspolrzedne z wycinka na cala klatke
+                    roi_w, roi_h = x2 - x1, y2 - y1
+                    landmarks = [((x1 + x * roi_w) / frame_w, (y1 + y * roi_h) / frame_h)
+                                 for x, y in roi_landmarks]
+                    self.roi_hits += 1
+                    # Predkosc tylko miedzy dwiema kolejnymi detekcjami w wycinku
+                    xs = [p[0] * frame_w for p in self.prev_landmarks]
+                    ys = [p[1] * frame_h for p in self.prev_landmarks]
+                    self.prev_center = ((min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2)
+
+        if landmarks is None:
+            # Dlon zgubiona - szukaj na calej klatce w niskiej rozdzielczości
+            landmarks = self._detect_scaled(frame, self.search_width)
+            self.full_searches += 1
+            self.prev_center = None
+
+        self.prev_landmarks = landmarks
+        return landmarks
+
+    def describe(self):
+        return f"{self.backend.describe()} + wycinek"
+
+    def close(self):
+        self.backend.close()
+
+
+class FlowFingertipTracker:
+    """Przesuwa czubek palca przeplywem optycznym miedzy detekcjami dloni.
+
+    Pelny detektor uruchamiany jest co detect_every klatek. W pozostalych
+    klatkach czubek palca (punkt 8) śledzony jest rzadkim przeplywem
+    Lucasa-Kanade na malym wycinku wokol niego, a reszta punktow dloni jest
+    przesuwana o ten sam wektor. Świeza detekcja zawsze zastepuje wynik
+    przeplywu, a zgubienie punktu wymusza detekcje od razu.
+    """
+
+    def __init__(self, detector, detect_every=3, patch_radius=48, win_size=21):
+        self.detector = detector
+        self.detect_every = detect_every
+        self.patch_radius = patch_radius
+        self.lk_params = dict(winSize=(win_size, win_size), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self.landmarks = None
+        self.tip = None  # Czubek palca w pikselach klatki
+        self.patch = None  # Wycinek w skali szarości wokol czubka palca
+        self.patch_origin = None
+        self.frames_since_detection = 0
+        self.detections = 0
+        self.flow_frames = 0
+
+    def _tip_index(self, landmarks):
+        return INDEX_FINGER_TIP if len(landmarks) > INDEX_FINGER_TIP else 0
+
+    def _crop_gray(self, frame, origin, size):
+        x1, y1 = origin
+        x2, y2 = x1 + size[0], y1 + size[1]
+        return cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+
+    def _store_patch(self, frame, tip):
+        """Zapamietuje wycinek wokol czubka palca do kolejnego kroku przeplywu"""
+        frame_h, frame_w = frame.shape[:2]
+        r = self.patch_radius
+        x1 = int(max(0, min(frame_w - 1, tip[0] - r)))
+        y1 = int(max(0, min(frame_h - 1, tip[1] - r)))
+        x2 = int(min(frame_w, tip[0] + r))
+        y2 = int(min(frame_h, tip[1] + r))
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            self.patch = None
+            return
+        self.patch_origin = (x1, y1)
+        self.patch = self._crop_gray(frame, self.patch_origin, (x2 - x1, y2 - y1))
+
+    def _anchor(self, frame, landmarks):
+        self.landmarks = landmarks
+        self.frames_since_detection = 0
+        if landmarks is None:
+            self.tip = None
+            self.patch = None
+            return
+        frame_h, frame_w = frame.shape[:2]
+        tx, ty = landmarks[self._tip_index(landmarks)]
+        self.tip = (tx * frame_w, ty * frame_h)
+        self._store_patch(frame, self.tip)
+
+    def _propagate(self, frame):
+        """Jeden krok przeplywu optycznego - zwraca przesuniete punkty lub None"""
+        if self.patch is None:
+            return None
+        frame_h, frame_w = frame.shape[:2]
+        patch_h, patch_w = self.patch.shape[:2]
+        current = self._crop_gray(frame, self.patch_origin, (patch_w, patch_h))
+        if current.shape != self.patch.shape:
+            return None
+
+        ox, oy = self.patch_origin
+        point = np.array([[[self.tip[0] - ox, self.tip[1] - oy]]], dtype=np.float32)
+        new_point, status, _ = cv2.calcOpticalFlowPyrLK(self.patch, current, point, None, **self.lk_params)
+        if status is None or not status[0][0]:
+            return None
+        nx, ny = new_point[0][0]
+        if not (0 <= nx < patch_w and 0 <= ny < patch_h):
+            return None
+
+        new_tip = (ox + float(nx), oy + float(ny))
+        dx = (new_tip[0] - self.tip[0]) / frame_w
+        dy = (new_tip[1] - self.tip[1]) / frame_h
+        self.tip = new_tip
+        self.landmarks = [(x + dx, y + dy) for x, y in self.landmarks]
+        self._store_patch(frame, new_tip)
+        return self.landmarks
+
+    def detect(self, frame):
+        self.frames_since_detection += 1
+        if self.landmarks is not None and self.frames_since_detection < self.detect_every:
+            landmarks = self._propagate(frame)
+            if landmarks is not None:
+                self.flow_frames += 1
+                return landmarks
+
+        landmarks = self.detector.detect(frame)
+        self.detections += 1
+        self._anchor(frame, landmarks)
+        return landmarks
+
+    def describe(self):
+        return f"{self.detector.describe()} + przeplyw co {self.detect_every}"
+
+    def close(self):
+        self.detector.close()
+
+
+class HandTracker:
+    """Wspolne API śledzenia dloni dla wszystkich trybow gry.
+
+    Wybiera backend (MediaPipe lub kolorowy znacznik), zlozonośc modelu,
+    śledzenie w wycinku i przeplyw optyczny miedzy detekcjami. process() zwraca punkty dloni znormalizowane
+    do klatki, a czubek palca wskazujacego daje HandResult.fingertip.
+
+    Przy max_num_hands > 1 process_all() zwraca wszystkie dlonie z jednego
+    wywolania modelu. Wycinek i przeplyw optyczny śledza tylko jedna dlon,
+    wiec w tym trybie sa wylaczone.
+    """
+
+    def __init__(self, backend=BACKEND_MEDIAPIPE, model_complexity=1, roi_tracking=True, detect_every=1,
+                 max_num_hands=1, **backend_options):
+        self.multi_hand = max_num_hands > 1
+        if backend == BACKEND_MEDIAPIPE:
+            detector = MediaPipeBackend(model_complexity=model_complexity, max_num_hands=max_num_hands,
+                                        **backend_options)
+            if roi_tracking and not self.multi_hand:
+                detector = RoiHandDetector(detector)
+        elif backend == BACKEND_MARKER:
+            # Znacznik jest na tyle tani, ze wycinek nie jest potrzebny
+            detector = ColorMarkerBackend(max_num_hands=max_num_hands, **backend_options)
+        else:
+            raise ValueError(f"Nieznany backend śledzenia dloni: {backend}")
+        if detect_every > 1 and not self.multi_hand:
+            detector = FlowFingertipTracker(detector, detect_every)
+        self.backend = backend
+        self.max_num_hands = max_num_hands
+        self.detector = detector
+
+    def process(self, frame):
+        """Zwraca punkty dloni (x, y) znormalizowane do klatki lub None"""
+        return self.detector.detect(frame)
+
+    def process_all(self, frame):
+        """Zwraca liste punktow wszystkich wykrytych dloni (co najwyzej max_num_hands)"""
+        if not self.multi_hand:
+            landmarks = self.detector.detect(frame)
+            return [landmarks] if landmarks is not None else []
+        return self.detector.detect_all(frame)
+
+    def describe(self):
+        text = self.detector.describe()
+        if self.multi_hand:
+            text += f", do {self.max_num_hands} dloni"
+        return text
+
+    def stats_text(self):
+        parts = []
+        detector = self.detector
+        if isinstance(detector, FlowFingertipTracker):
+            parts.append(f"detekcje: {detector.detections}, przeplyw: {detector.flow_frames}")
+            detector = detector.detector
+        if isinstance(detector, RoiHandDetector):
+            parts.append(f"wycinek: {detector.roi_hits}, cala klatka: {detector.full_searches}")
+        return " | ".join(parts)
+
+    def close(self):
+        self.detector.close()
+
+
+def create_hand_tracker(settings=None):
+    """Tworzy HandTracker z domyślnych ustawien nadpisanych przez settings"""
+    options = dict(HAND_TRACKER_SETTINGS)
+    if settings:
+        options.update(settings)
+    return HandTracker(**options)
+
+
+class HandResult:
+    """Wynik detekcji dloni dla jednej klatki kamery"""
+
+    def __init__(self, frame_id, timestamp, landmarks, hands=None):
+        self.frame_id = frame_id
+        self.timestamp = timestamp  # Czas przechwycenia klatki (time.perf_counter)
+        self.landmarks = landmarks  # Lista punktow (x, y) w zakresie 0-1 lub None
+        # Wszystkie dlonie w kadrze (tryb wielu dloni), inaczej tylko ta jedna
+        if hands is None:
+            hands = [landmarks] if landmarks is not None else []
+        self.hands = hands
+
+    @property
+    def fingertip(self):
+        if not self.landmarks:
+            return None
+        # Backend znacznika zwraca tylko jeden punkt - sam czubek palca
+        if len(self.landmarks) > INDEX_FINGER_TIP:
+            return self.landmarks[INDEX_FINGER_TIP]
+        return self.landmarks[0]
+
+    def cursor(self, width, height):
+        """Pozycja czubka palca wskazujacego w pikselach okna"""
+        tip = self.fingertip
+        if tip is None:
+            return None, None
+        return int(tip[0] * width), int(tip[1] * height)
+
+    def fingertips(self):
+        """Czubki palcow wszystkich dloni jako tablica (M, 2) w zakresie 0-1"""
+        tips = [hand[INDEX_FINGER_TIP] if len(hand) > INDEX_FINGER_TIP else hand[0] for hand in self.hands]
+        return np.array(tips, dtype=np.float32).reshape(-1, 2)
+
+    def age(self):
+        return time.perf_counter() - self.timestamp
+
+
+class HandInferenceWorker:
+    """Uruchamia śledzenie dloni w osobnym watku na klatkach z CameraCapture.
+
+    Petla gry nie czeka na inferencje - pobiera tylko ostatni opublikowany
+    wynik przez latest(), wiec rysowanie dziala z czestotliwościa ekranu.
+    """
+
+    def __init__(self, capture, tracker=None, max_result_age=0.5):
+        self.capture = capture
+        self.tracker = tracker if tracker is not None else create_hand_tracker()
+        self.max_result_age = max_result_age  # Starsze wyniki traktujemy jak brak dloni
+        # Obnizanie jakości na slabym komputerze (QualityGovernor)
+        self.frame_stride = 1       # Detekcja co N-ta klatka kamery
+        self.input_width = None     # Klatka zmniejszana do tej szerokości przed detekcja
+
+        self._lock = threading.Lock()
+        self._result = None
+        self._running = False
+        self._thread = None
+        self.pool = None  # Pula buforow watku detekcji
+        self.inference_fps = 0.0
+        self.inference_ms = 0.0
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._inference_loop, name="HandInference", daemon=True)
+        self._thread.start()
+        return self
+
+    def set_quality(self, frame_stride=1, input_width=None):
+        self.frame_stride = max(1, frame_stride)
+        self.input_width = input_width
+
+    def _inference_loop(self):
+        self.pool = frame_pool()
+        last_frame_id = 0
+        last_processed_id = -self.frame_stride
+        last_time = time.perf_counter()
+        while self._running:
+            item = self.capture.wait_for_frame(last_frame_id)
+            if item is None:
+                if self.capture.is_failed():
+                    break
+                continue
+            frame_id, timestamp, frame = item
+            last_frame_id = frame_id
+            if frame_id - last_processed_id < self.frame_stride:
+                continue
+            last_processed_id = frame_id
+
+            start = time.perf_counter()
+            # Punkty sa znormalizowane, wiec mniejsza klatka nie zmienia wyniku, tylko koszt
+            width = self.input_width
+            if width and frame.shape[1] > width:
+                height = max(1, frame.shape[0] * width // frame.shape[1])
+                frame = cv2.resize(frame, (width, height), dst=self.pool.get("inference", (height, width, 3)),
+                                   interpolation=cv2.INTER_AREA)
+            if self.tracker.multi_hand:
+                hands = self.tracker.process_all(frame)
+                result = HandResult(frame_id, timestamp, hands[0] if hands else None, hands)
+            else:
+                result = HandResult(frame_id, timestamp, self.tracker.process(frame))
+            end = time.perf_counter()
+
+            with self._lock:
+                self._result = result
+                self.inference_ms = (end - start) * 1000.0
+                dt = end - last_time
+                if dt > 0:
+                    self.inference_fps = 0.9 * self.inference_fps + 0.1 * (1.0 / dt) if self.inference_fps else 1.0 / dt
+            last_time = end
+            self.pool.end_frame()
+
+    def latest(self):
+        """Zwraca najnowszy wynik detekcji lub None, jeśli jest zbyt stary"""
+        with self._lock:
+            result = self._result
+        if result is None or result.age() > self.max_result_age:
+            return None
+        return result
+
+    def stats_text(self):
+        text = f"{self.tracker.describe()}: {self.inference_fps:.1f} FPS ({self.inference_ms:.1f} ms)"
+        if self.frame_stride > 1 or self.input_width:
+            text += f" | co {self.frame_stride}. klatka, {self.input_width or 'pelna'} px"
+        tracker_stats = self.tracker.stats_text()
+        if tracker_stats:
+            text += f" | {tracker_stats}"
+        if self.pool is not None:
+            text += f"\n{self.pool.stats_text()}"
+        return text
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.tracker.close()
+
+
+ASSIGN_REGION = "region"
+ASSIGN_IDENTITY = "identity"
+
+
+class HandAssigner:
+    """Przypisuje wykryte dlonie do graczy.
+
+    "region" - kadr jest podzielony na pionowe pasy, gracz i steruje dlonia
+    w swoim pasie. "identity" - dlon zostaje przy graczu, ktoremu byla
+    przypisana w poprzednich klatkach (najblizszy czubek palca), a nowe dlonie
+    trafiaja do wolnych graczy. assign() zwraca tablice (N, 2) z pozycjami
+    czubkow palcow w zakresie 0-1, z NaN dla graczy bez dloni.
+    """
+
+    def __init__(self, num_players, mode=ASSIGN_REGION, max_jump=0.25, max_lost_frames=15):
+        if mode not in (ASSIGN_REGION, ASSIGN_IDENTITY):
+            raise ValueError(f"Nieznany sposob przypisania dloni: {mode}")
+        self.num_players = num_players
+        self.mode = mode
+        self.max_jump = max_jump  # Najwiekszy ruch czubka palca miedzy klatkami (czesc kadru)
+        self.max_lost_frames = max_lost_frames  # Po tylu klatkach bez dloni gracz ja traci
+        self.last = np.full((num_players, 2), np.nan, dtype=np.float32)
+        self.lost_frames = np.zeros(num_players, dtype=np.int32)
+
+    def reset(self):
+        self.last.fill(np.nan)
+        self.lost_frames.fill(0)
+
+    def assign(self, tips):
+        tips = np.asarray(tips, dtype=np.float32).reshape(-1, 2)
+        if self.mode == ASSIGN_REGION:
+            return self._assign_region(tips)
+        return self._assign_identity(tips)
+
+    def _assign_region(self, tips):
+        result = np.full((self.num_players, 2), np.nan, dtype=np.float32)
+        if not len(tips):
+            return result
+        players = np.clip((tips[:, 0] * self.num_players).astype(np.int32), 0, self.num_players - 1)
+        # Przy dwoch dloniach w jednym pasie wygrywa pierwsza wykryta
+        for tip, player in zip(tips[::-1], players[::-1]):
+            result[player] = tip
+        return result
+
+    def _assign_identity(self, tips):
+        result = np.full((self.num_players, 2), np.nan, dtype=np.float32)
+        known = ~np.isnan(self.last[:, 0])
+        free_tips = np.ones(len(tips), dtype=bool)
+
+        if len(tips) and known.any():
+            # Odleglości kazdy gracz - kazda dlon, przypisanie zachlanne od najblizszych par
+            dist = np.linalg.norm(self.last[:, None, :] - tips[None, :, :], axis=2)
+            dist[~known] = np.inf
+            dist[dist > self.max_jump] = np.inf
+            while np.isfinite(dist).any():
+                player, tip = np.unravel_index(np.argmin(dist), dist.shape)
+                result[player] = tips[tip]
+                free_tips[tip] = False
+                dist[player, :] = np.inf
+                dist[:, tip] = np.inf
+
+        matched = ~np.isnan(result[:, 0])
+        self.lost_frames[matched] = 0
+        self.lost_frames[known & ~matched] += 1
+        expired = known & ~matched & (self.lost_frames > self.max_lost_frames)
+        self.last[expired] = np.nan
+
+        # Nowe dlonie dostaja gracze, ktorzy nie maja zadnej dloni
+        free_players = np.flatnonzero(np.isnan(self.last[:, 0]) & ~matched)
+        for player, tip in zip(free_players, np.flatnonzero(free_tips)):
+            result[player] = tips[tip]
+            matched[player] = True
+            self.lost_frames[player] = 0
+
+        self.last[matched] = result[matched]
+        return result
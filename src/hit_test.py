@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+
+from cursor_filter import HOVER_EXIT_SCALE
+
+NO_INSTRUMENT = -1
+
+
+class HitTestMap:
+    """Obraz etykiet: w kazdym pikselu indeks instrumentu pod nim lub -1.
+
+    Budowany raz dla danego ukladu instrumentow i rozmiaru okna, odpowiada
+    na pytanie "ktory instrument jest pod (x, y)" w czasie stalym, takze dla
+    wielu kursorow naraz (tablice NumPy).
+    """
+
+    def __init__(self, centers, radii, width=None, height=None):
+        self.centers = np.asarray(centers, dtype=np.float32).reshape(-1, 2)
+        self.radii = np.asarray(radii, dtype=np.float32).reshape(-1)
+
+        # Bez podanego rozmiaru mapa obejmuje wszystkie instrumenty
+        if width is None:
+            width = int(np.max(self.centers[:, 0] + self.radii)) + 1 if len(self.radii) else 1
+        if height is None:
+            height = int(np.max(self.centers[:, 1] + self.radii)) + 1 if len(self.radii) else 1
+        self.width = max(1, int(width))
+        self.height = max(1, int(height))
+
+        self.labels = np.full((self.height, self.width), NO_INSTRUMENT, dtype=np.int16)
+        # Rysujemy od konca, zeby przy nakladaniu wygrywal wcześniejszy instrument
+        for i in range(len(self.radii) - 1, -1, -1):
+            center = (int(self.centers[i][0]), int(self.centers[i][1]))
+            cv2.circle(self.labels, center, int(self.radii[i]), i, -1)
+
+    def query(self, x, y):
+        """Indeks instrumentu pod punktem (x, y) lub -1"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return int(self.labels[int(y), int(x)])
+        return NO_INSTRUMENT
+
+    def query_many(self, points):
+        """Indeksy instrumentow dla tablicy punktow o ksztalcie (N, 2)"""
+        points = np.asarray(points).reshape(-1, 2)
+        xs = points[:, 0].astype(np.int64)
+        ys = points[:, 1].astype(np.int64)
+        result = np.full(len(points), NO_INSTRUMENT, dtype=np.int16)
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        result[inside] = self.labels[ys[inside], xs[inside]]
+        return result
+
+    def query_hover(self, x, y, current=NO_INSTRUMENT, exit_scale=HOVER_EXIT_SCALE):
+        """Jak query(), ale z histereza: aktualny instrument jest utrzymywany
+        az kursor wyjdzie poza jego promien * exit_scale"""
+        if current >= 0:
+            cx, cy = self.centers[current]
+            if (x - cx) ** 2 + (y - cy) ** 2 <= (self.radii[current] * exit_scale) ** 2:
+                return current
+        return self.query(x, y)
+
+    def query_hover_many(self, points, current, exit_scale=HOVER_EXIT_SCALE):
+        """Wersja query_hover() dla wielu kursorow naraz"""
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+        current = np.asarray(current).reshape(-1)
+        result = self.query_many(points)
+        held = np.flatnonzero(current >= 0)
+        if len(held):
+            held_current = current[held]
+            d2 = np.sum((points[held] - self.centers[held_current]) ** 2, axis=1)
+            stay = d2 <= (self.radii[held_current] * exit_scale) ** 2
+            result[held[stay]] = held_current[stay]
+        return result
+
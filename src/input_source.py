@@ -0,0 +1,429 @@
+import json
+import random
+import time
+
+import cv2
+import numpy as np
+
+import clock
+from buffers import frame_pool
+from capture import CameraCapture
+from cursor_filter import CursorFilter
+from hand_tracking import HandInferenceWorker, HandResult, create_hand_tracker
+from pipeline import SharedFrameCapture, SharedHandWorker
+from render_sink import NO_KEY
+
+CONTROL_HAND = "hand"
+CONTROL_MOUSE = "mouse"
+
+# Domyślne ustawienia zrodla wejścia (nagrywanie / odtwarzanie)
+INPUT_SETTINGS = {
+    "record": None,  # Ścieżka pliku, do ktorego nagrywamy sesje na zywo
+    "replay": None,  # Ścieżka nagranej sesji (zdarzenia kursora, klikniecia, klawisze)
+    "video": None,   # Ścieżka pliku wideo zamiast kamery (śledzenie dloni na klatkach)
+    "pipeline": False,  # Kamera i detekcja dloni w osobnych procesach (pipeline.py)
+}
+
+
+def hands_to_pixels(points, width, height):
+    """Przelicza tablice (N, 2) z zakresu 0-1 na piksele okna (NaN zostaje NaN)"""
+    return np.asarray(points, dtype=np.float32).reshape(-1, 2) * np.array([width, height], dtype=np.float32)
+
+
+def throughput(frames, wall_start):
+    """Liczba klatek na sekunde rzeczywistego czasu od wall_start"""
+    elapsed = time.perf_counter() - wall_start
+    return frames / elapsed if elapsed > 0 else 0.0
+
+
+class LiveInput:
+    """Kamera ze śledzeniem dloni albo mysz w oknie gry - zwykla rozgrywka"""
+
+    def __init__(self, control_mode, window_name=None, tracker_settings=None, cursor_settings=None,
+                 pipeline=False):
+        self.control_mode = control_mode
+        self.hand_worker = None
+        if pipeline:
+            # Kamera, detekcja i gra na osobnych rdzeniach - klatki przez pamiec wspoldzielona
+            self.capture = SharedFrameCapture().start()
+            if control_mode == CONTROL_HAND:
+                self.hand_worker = SharedHandWorker(self.capture, tracker_settings).start()
+        else:
+            self.capture = CameraCapture().start()
+            if control_mode == CONTROL_HAND:
+                self.hand_worker = HandInferenceWorker(self.capture, create_hand_tracker(tracker_settings)).start()
+        self.cursor_filter = CursorFilter(cursor_settings)
+
+        # Pozycja myszy jako ulamek klatki - rozmiar wyświetlanej klatki moze sie zmieniac
+        self.mouse_x, self.mouse_y = 0.0, 0.0
+        self.mouse_clicked = False
+        self.frame_size = None  # Rozmiar ostatnio wyświetlanej klatki (z poll)
+        if control_mode == CONTROL_MOUSE and window_name is not None:
+            cv2.setMouseCallback(window_name, self._mouse_callback)
+
+    def _mouse_callback(self, event, x, y, flags, param):
+        # cv2 podaje wspolrzedne w pikselach wyświetlanego obrazu, nie okna
+        if self.frame_size is None:
+            return
+        width, height = self.frame_size
+        self.mouse_x, self.mouse_y = x / width, y / height
+        if event == cv2.EVENT_LBUTTONDOWN:
+            self.mouse_clicked = True
+
+    def read_frame(self):
+        """Zwraca (ret, frame) z najnowsza klatka kamery"""
+        return self.capture.read()
+
+    def read_frame_size(self):
+        """Zwraca (ret, (szerokośc, wysokośc)) najnowszej klatki - bez kopiowania samej klatki"""
+        size = self.capture.frame_size()
+        return size is not None, size
+
+    def advance(self):
+        """Krok zrodla bez pobierania klatki - False, gdy wejście sie skonczylo"""
+        return not self.capture.is_failed()
+
+    def poll(self, width, height):
+        """Zwraca (cursor_x, cursor_y, clicked) w pikselach okna o podanym rozmiarze"""
+        if self.control_mode == CONTROL_HAND:
+            hand_result = self.hand_worker.latest()
+            if hand_result is None:
+                self.cursor_filter.reset()
+                return None, None, False
+            cursor_x, cursor_y = self.cursor_filter.apply(hand_result, width, height)
+            return cursor_x, cursor_y, False
+
+        self.frame_size = (width, height)
+        clicked = self.mouse_clicked
+        self.mouse_clicked = False
+        return int(self.mouse_x * width), int(self.mouse_y * height), clicked
+
+    def poll_hands(self, width, height, assigner):
+        """Zwraca tablice (N, 2) z pozycjami czubkow palcow graczy w pikselach okna (NaN - brak dloni)"""
+        hand_result = self.hand_worker.latest() if self.hand_worker else None
+        tips = hand_result.fingertips() if hand_result is not None else []
+        return hands_to_pixels(assigner.assign(tips), width, height)
+
+    def poll_key(self, key):
+        """Klawisz wciśniety w oknie (NO_KEY jeśli zaden)"""
+        return key
+
+    def set_quality(self, quality):
+        """Poziom jakości z QualityGovernor - rzadsza lub mniejsza detekcja dloni"""
+        if self.hand_worker:
+            self.hand_worker.set_quality(quality["inference_stride"], quality["inference_width"])
+
+    def stats_text(self):
+        text = self.capture.stats_text()
+        if self.hand_worker:
+            text += "\n" + self.hand_worker.stats_text()
+        return text
+
+    def release(self):
+        if self.hand_worker:
+            self.hand_worker.stop()
+        self.capture.release()
+
+
+class VideoFileInput:
+    """Klatki z pliku wideo zamiast kamery.
+
+    Śledzenie dloni dziala synchronicznie na kazdej klatce, a zegar gry jest
+    wirtualny (1 / fps na klatke), wiec kolejne uruchomienia daja ten sam wynik.
+    """
+
+    def __init__(self, path, control_mode=CONTROL_HAND, tracker_settings=None, flip=True):
+        self.control_mode = control_mode
+        self.flip = flip
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Nie mozna otworzyc pliku wideo: {path}")
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_time = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+        self.tracker = create_hand_tracker(tracker_settings) if control_mode == CONTROL_HAND else None
+        self.hand_result = None
+        self.raw = None
+        self.frames = 0
+        self.wall_start = time.perf_counter()
+        clock.use_virtual_time()
+
+    def read_frame(self):
+        # Odczyt i odbicie do tych samych buforow w kazdej klatce
+        ret, self.raw = self.cap.read(self.raw)
+        if not ret:
+            return False, None
+        frame = self.raw
+        if self.flip:
+            frame = cv2.flip(frame, 1, dst=frame_pool().like("video", frame))
+        if self.frames > 0:
+            clock.advance(self.frame_time)
+        self.frames += 1
+        if self.tracker is not None and self.tracker.multi_hand:
+            hands = self.tracker.process_all(frame)
+            self.hand_result = HandResult(self.frames, 0.0, hands[0] if hands else None, hands)
+        elif self.tracker is not None:
+            self.hand_result = HandResult(self.frames, 0.0, self.tracker.process(frame))
+        return True, frame
+
+    def read_frame_size(self):
+        # Klatke i tak trzeba odczytac - przesuwa wideo, zegar i śledzenie dloni
+        ret, frame = self.read_frame()
+        return ret, (frame.shape[1], frame.shape[0]) if ret else None
+
+    def advance(self):
+        ret, _ = self.read_frame()
+        return ret
+
+    def poll(self, width, height):
+        if self.hand_result is None:
+            return None, None, False
+        cursor_x, cursor_y = self.hand_result.cursor(width, height)
+        return cursor_x, cursor_y, False
+
+    def poll_hands(self, width, height, assigner):
+        tips = self.hand_result.fingertips() if self.hand_result is not None else []
+        return hands_to_pixels(assigner.assign(tips), width, height)
+
+    def poll_key(self, key):
+        return NO_KEY
+
+    def set_quality(self, quality):
+        # Wideo jest przetwarzane klatka po klatce - wynik nie moze zalezec od obciazenia
+        pass
+
+    def stats_text(self):
+        text = f"Wideo: {self.frames} klatek, {throughput(self.frames, self.wall_start):.1f} klatek/s"
+        if self.tracker is not None:
+            text += f" | {self.tracker.describe()}"
+        return text
+
+    def release(self):
+        self.cap.release()
+        if self.tracker is not None:
+            self.tracker.close()
+        clock.use_real_time()
+
+
+class EventReplayInput:
+    """Odtwarza nagrana sesje (plik JSON Lines z InputRecorder) bez kamery i myszy.
+
+    Zamiast obrazu z kamery zwraca czarne klatki o nagranym rozmiarze, a zegar
+    gry przesuwa sie o 1 / fps na klatke, niezaleznie od szybkości komputera.
+    """
+
+    def __init__(self, path):
+        self.events = []
+        self.header = {"width": 640, "height": 480, "fps": 30, "control_mode": CONTROL_HAND}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event["type"] == "header":
+                    self.header.update(event)
+                else:
+                    self.events.append(event)
+        self.events.sort(key=lambda e: e["t"])
+        # Te same losowe sekwencje co w nagranej sesji
+        if "seed" in self.header:
+            random.seed(self.header["seed"])
+
+        self.control_mode = self.header["control_mode"]
+        self.frame_time = 1.0 / self.header["fps"]
+        self.end_time = self.events[-1]["t"] if self.events else 0.0
+        self.blank = np.zeros((self.header["height"], self.header["width"], 3), dtype=np.uint8)
+
+        self.next_event = 0
+        self.elapsed = 0.0
+        self.frames = 0
+        # Znormalizowana pozycja kursora lub None (zgubiona dlon). Mysz, jak na zywo,
+        # ma pozycje od poczatku - z naglowka albo lewy gorny rog
+        self.cursor = None
+        if self.control_mode == CONTROL_MOUSE:
+            self.cursor = tuple(self.header.get("cursor", (0.0, 0.0)))
+        self.hands = None  # Znormalizowane pozycje dloni graczy (N, 2) lub None
+        self.clicked = False
+        self.keys = []
+        self.wall_start = time.perf_counter()
+        clock.use_virtual_time()
+        self.start_time = clock.now()
+
+    def _apply_events(self):
+        while self.next_event < len(self.events) and self.events[self.next_event]["t"] <= self.elapsed:
+            event = self.events[self.next_event]
+            self.next_event += 1
+            if event["type"] == "cursor":
+                self.cursor = (event["x"], event["y"])
+            elif event["type"] == "lost":
+                self.cursor = None
+            elif event["type"] == "click":
+                self.cursor = (event["x"], event["y"])
+                self.clicked = True
+            elif event["type"] == "key":
+                self.keys.append(event["key"])
+            elif event["type"] == "hands":
+                self.hands = np.array([p if p is not None else (np.nan, np.nan) for p in event["points"]],
+                                      dtype=np.float32).reshape(-1, 2)
+
+    def read_frame(self):
+        if self.frames > 0:
+            clock.advance(self.frame_time)
+        # Czas liczymy z zegara gry, bo clock.sleep() w logice tez go przesuwa
+        self.elapsed = clock.now() - self.start_time
+        if self.elapsed > self.end_time:
+            return False, None
+        self.frames += 1
+        self._apply_events()
+        # Klatka wyznacza tylko rozmiar planszy - tryby rysuja we wlasnych buforach
+        return True, self.blank
+
+    def read_frame_size(self):
+        ret, frame = self.read_frame()
+        return ret, (frame.shape[1], frame.shape[0]) if ret else None
+
+    def advance(self):
+        ret, _ = self.read_frame()
+        return ret
+
+    def poll(self, width, height):
+        clicked = self.clicked
+        self.clicked = False
+        if self.cursor is None:
+            return None, None, clicked
+        return int(self.cursor[0] * width), int(self.cursor[1] * height), clicked
+
+    def poll_hands(self, width, height, assigner):
+        # Nagrane sa pozycje juz przypisane do graczy, wiec assigner nie jest potrzebny
+        points = np.full((assigner.num_players, 2), np.nan, dtype=np.float32)
+        if self.hands is not None:
+            count = min(len(self.hands), assigner.num_players)
+            points[:count] = self.hands[:count]
+        return hands_to_pixels(points, width, height)
+
+    def poll_key(self, key):
+        return self.keys.pop(0) if self.keys else NO_KEY
+
+    def set_quality(self, quality):
+        pass
+
+    def stats_text(self):
+        return (f"Odtwarzanie: {self.frames} klatek, {throughput(self.frames, self.wall_start):.1f} klatek/s, "
+                f"{self.next_event}/{len(self.events)} zdarzen")
+
+    def release(self):
+        clock.use_real_time()
+
+
+class InputRecorder:
+    """Nagrywa sesje z dowolnego zrodla wejścia w formacie EventReplayInput.
+
+    Zapisuje tylko zmiany: ruch kursora, zgubienie dloni, klikniecia, klawisze
+    i pozycje dloni wszystkich graczy, kazde ze znacznikiem czasu od poczatku sesji.
+    """
+
+    def __init__(self, source, path, fps=30):
+        self.source = source
+        self.control_mode = source.control_mode
+        self.file = open(path, "w", encoding="utf-8")
+        self.fps = fps
+        self.start_time = None
+        self.last_cursor = None
+        self.last_hands = None
+        self.events = 0
+        # Zapamietujemy ziarno losowania, zeby odtworzenie dostalo te same sekwencje
+        self.seed = random.randrange(2 ** 31)
+        random.seed(self.seed)
+
+    def _write(self, event_type, **fields):
+        event = {"t": round(clock.now() - self.start_time, 4), "type": event_type}
+        event.update(fields)
+        self.file.write(json.dumps(event) + "\n")
+        self.events += 1
+
+    def read_frame(self):
+        return self.source.read_frame()
+
+    def read_frame_size(self):
+        return self.source.read_frame_size()
+
+    def advance(self):
+        return self.source.advance()
+
+    def _start(self, width, height, cursor=None):
+        # Naglowek zapisujemy przy pierwszym odczycie, gdy znamy rozmiar okna
+        if self.start_time is not None:
+            return
+        self.start_time = clock.now()
+        header = {"type": "header", "width": width, "height": height, "fps": self.fps,
+                  "control_mode": self.control_mode, "seed": self.seed}
+        if cursor is not None:
+            header["cursor"] = cursor  # Poczatkowa pozycja (mysz ma ja zawsze)
+        self.file.write(json.dumps(header) + "\n")
+
+    def poll(self, width, height):
+        cursor_x, cursor_y, clicked = self.source.poll(width, height)
+        if cursor_x is not None:
+            self._start(width, height, [round(cursor_x / width, 4), round(cursor_y / height, 4)])
+        else:
+            self._start(width, height)
+
+        if cursor_x is None:
+            if self.last_cursor is not None:
+                self._write("lost")
+            self.last_cursor = None
+        else:
+            cursor = (round(cursor_x / width, 4), round(cursor_y / height, 4))
+            if clicked:
+                self._write("click", x=cursor[0], y=cursor[1])
+            elif cursor != self.last_cursor:
+                self._write("cursor", x=cursor[0], y=cursor[1])
+            self.last_cursor = cursor
+        return cursor_x, cursor_y, clicked
+
+    def poll_hands(self, width, height, assigner):
+        points = self.source.poll_hands(width, height, assigner)
+        self._start(width, height)
+        hands = [None if np.isnan(x) else [round(float(x) / width, 4), round(float(y) / height, 4)]
+                 for x, y in points]
+        if hands != self.last_hands:
+            self._write("hands", points=hands)
+            self.last_hands = hands
+        return points
+
+    def poll_key(self, key):
+        key = self.source.poll_key(key)
+        if key != NO_KEY and self.start_time is not None:
+            self._write("key", key=key)
+        return key
+
+    def set_quality(self, quality):
+        self.source.set_quality(quality)
+
+    def stats_text(self):
+        return self.source.stats_text() + f"\nNagrano zdarzen: {self.events}"
+
+    def release(self):
+        if self.start_time is not None:
+            self._write("end")
+        self.file.close()
+        self.source.release()
+
+
+def open_input_source(control_mode, window_name=None, input_settings=None,
+                      tracker_settings=None, cursor_settings=None):
+    """Tworzy zrodlo wejścia na podstawie ustawien (na zywo, wideo lub nagranie)"""
+    options = dict(INPUT_SETTINGS)
+    if input_settings:
+        options.update(input_settings)
+
+    if options["replay"]:
+        source = EventReplayInput(options["replay"])
+    elif options["video"]:
+        source = VideoFileInput(options["video"], control_mode, tracker_settings)
+    else:
+        source = LiveInput(control_mode, window_name, tracker_settings, cursor_settings, options["pipeline"])
+
+    if options["record"]:
+        source = InputRecorder(source, options["record"])
+    return source
@@ -0,0 +1,87 @@
+import numpy as np
+
+from hit_test import HitTestMap
+
+# Tyle rozmiarow okna pamietamy naraz (zwykle 1-2: okno i zmniejszona klatka)
+MAX_CACHED_TRANSFORMS = 8
+
+
+class Layout:
+    """Uklad instrumentow niezalezny od rozdzielczości.
+
+    Środki sa zapisane jako ulamki szerokości i wysokości ekranu (0..1),
+    promienie jako ulamki krotszego boku, wiec okragle pady zostaja okragle
+    przy kazdych proporcjach okna. Dane wejściowe podaje sie w pikselach
+    ekranu odniesienia (reference_size), w ktorym projektowano uklad.
+
+    Przeksztalcenie do pikseli (ScreenTransform) jest liczone raz dla danego
+    rozmiaru okna i wspoldzielone przez rysowanie i mape trafien. Po zmianie
+    pozycji lub promienia (set_instrument) pamiec przeksztalcen jest czyszczona.
+    """
+
+    def __init__(self, centers, radii, reference_size=(1.0, 1.0)):
+        self.reference_size = reference_size
+        ref_w, ref_h = reference_size
+        self.centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2) / (ref_w, ref_h)
+        self.radii = np.asarray(radii, dtype=np.float64).reshape(-1) / min(ref_w, ref_h)
+        self.version = 0
+        self._transforms = {}
+
+    def __len__(self):
+        return len(self.radii)
+
+    def set_instrument(self, index, pos=None, radius=None):
+        """Zmienia pozycje i/lub promien instrumentu (w pikselach ekranu odniesienia)"""
+        ref_w, ref_h = self.reference_size
+        if pos is not None:
+            self.centers[index] = (pos[0] / ref_w, pos[1] / ref_h)
+        if radius is not None:
+            self.radii[index] = radius / min(ref_w, ref_h)
+        self.invalidate()
+
+    def invalidate(self):
+        self.version += 1
+        self._transforms.clear()
+
+    def transform(self, width, height):
+        """ScreenTransform dla okna o podanym rozmiarze (liczony raz na rozmiar)"""
+        key = (int(width), int(height))
+        transform = self._transforms.get(key)
+        if transform is None:
+            if len(self._transforms) >= MAX_CACHED_TRANSFORMS:
+                self._transforms.clear()
+            transform = ScreenTransform(self, *key)
+            self._transforms[key] = transform
+        return transform
+
+
+class ScreenTransform:
+    """Uklad przeliczony do pikseli okna o danym rozmiarze.
+
+    centers i radii to tablice int32 liczone wektorowo dla wszystkich
+    instrumentow naraz; mapa trafien powstaje przy pierwszym zapytaniu.
+    """
+
+    def __init__(self, layout, width, height):
+        self.width = width
+        self.height = height
+        self.unit = min(width, height)  # Piksele na jednostke promienia
+        self.version = layout.version
+        self.centers = np.rint(layout.centers * (width, height)).astype(np.int32)
+        self.radii = np.maximum(1, np.rint(layout.radii * self.unit)).astype(np.int32)
+        self._hit_map = None
+
+    def center(self, index):
+        """Środek instrumentu jako krotka (x, y) - w formie oczekiwanej przez cv2"""
+        x, y = self.centers[index]
+        return int(x), int(y)
+
+    def radius(self, index, scale=1.0):
+        """Promien instrumentu w pikselach, opcjonalnie przeskalowany (np. podświetlenie)"""
+        return max(1, int(self.radii[index] * scale))
+
+    @property
+    def hit_map(self):
+        if self._hit_map is None:
+            self._hit_map = HitTestMap(self.centers, self.radii, self.width, self.height)
+        return self._hit_map
@@ -0,0 +1,92 @@
+import time
+
+import clock
+from buffers import frame_pool
+
+# Menu nie zmienia sie samo - rysujemy je raz i tylko czekamy na zdarzenia okna
+MENU_WAIT_MS = 100
+
+# Domyślne ustawienia petli gry
+LOOP_SETTINGS = {
+    "tick_rate": 30,           # Kroki logiki gry (update, hover) na sekunde
+    "target_fps": 30,          # Docelowa liczba rysowanych klatek na sekunde
+    "max_ticks_per_frame": 5,  # Po dlugiej przerwie nie nadrabiamy wiecej krokow naraz
+    "adaptive_quality": True,  # Obnizanie jakości, gdy komputer nie nadaza (QualityGovernor)
+}
+
+
+class FrameLoop:
+    """Petla gry ze stalym krokiem logiki i osobnym tempem rysowania.
+
+    begin_frame() mowi, ile krokow logiki wykonac przed narysowaniem klatki
+    (czas jest akumulowany, wiec logika biegnie z tick_rate niezaleznie od
+    tempa petli). idle_time() to czas do nastepnej klatki - wyjście obrazu
+    przesypia go (w oknie w cv2.waitKey), zamiast krecic petla na 100% CPU.
+    Przy wirtualnym zegarze (wideo, odtwarzanie) petla nie czeka wcale.
+    """
+
+    def __init__(self, settings=None):
+        options = dict(LOOP_SETTINGS)
+        if settings:
+            options.update(settings)
+        self.tick = 1.0 / options["tick_rate"]
+        self.frame_time = 1.0 / options["target_fps"] if options["target_fps"] else 0.0
+        self.max_ticks_per_frame = options["max_ticks_per_frame"]
+        self.adaptive_quality = options["adaptive_quality"]
+
+        self.accumulator = 0.0
+        self.last_time = None
+        self.next_frame_time = None
+        self.frames = 0
+        self.ticks = 0
+        self.start_time = None
+        self.frame_start = None
+        self.work_time = 0.0  # Czas pracy nad ostatnia klatka bez uśpienia (s)
+        self.pool = frame_pool()  # Bufory watku gry - liczniki alokacji zamykane co klatke
+
+    def begin_frame(self):
+        """Zwraca liczbe krokow logiki do wykonania w tej klatce"""
+        self.frame_start = time.perf_counter()
+        now = clock.now()
+        if self.last_time is None:
+            # Pierwsza klatka - jeden krok, zeby stan gry byl gotowy do rysowania
+            self.last_time = now
+            self.start_time = now
+            self.next_frame_time = now
+            self.ticks += 1
+            return 1
+
+        self.accumulator += now - self.last_time
+        self.last_time = now
+        ticks = int(self.accumulator / self.tick)
+        if ticks > self.max_ticks_per_frame:
+            ticks = self.max_ticks_per_frame
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= ticks * self.tick
+        self.ticks += ticks
+        return ticks
+
+    def idle_time(self):
+        """Ile sekund mozna przespac przed nastepna klatka"""
+        if self.frame_start is not None:
+            self.work_time = time.perf_counter() - self.frame_start
+        if clock.is_virtual() or self.next_frame_time is None:
+            return 0.0
+        return max(0.0, self.next_frame_time - clock.now())
+
+    def end_frame(self):
+        """Wywolywane po wyświetleniu klatki - wyznacza termin nastepnej"""
+        now = clock.now()
+        self.frames += 1
+        self.pool.end_frame()
+        if self.next_frame_time is None:
+            self.next_frame_time = now
+        # Gdy klatka sie spoznila, nie nadrabiamy serii klatek - liczymy od teraz
+        self.next_frame_time = max(self.next_frame_time + self.frame_time, now)
+
+    def stats_text(self):
+        elapsed = (clock.now() - self.start_time) if self.start_time is not None else 0.0
+        fps = self.frames / elapsed if elapsed > 0 else 0.0
+        return (f"Petla gry: {self.frames} klatek ({fps:.1f} FPS), {self.ticks} krokow logiki\n"
+                f"{self.pool.stats_text()}")
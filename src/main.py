@@ -1,8 +1,12 @@
+import argparse
 import cv2
 import numpy as np
 from playground import run_playground
 from challenge import run_challenge
 from multiplayer import run_multiplayer
+from hand_tracking import BACKEND_MEDIAPIPE, BACKEND_MARKER, ASSIGN_REGION, ASSIGN_IDENTITY
+from loop import LOOP_SETTINGS, MENU_WAIT_MS
+from mixer import MIXER_SETTINGS
 
 # Tryby sterowania
 CONTROL_HAND = "hand"
@@ -57,8 +61,9 @@ def choose_control_mode():
     cv2.namedWindow("Wybór trybu")
     cv2.setMouseCallback("Wybór trybu", mouse_callback_control)
 
+    # Obraz menu jest statyczny - wyświetlamy go raz, a w pętli tylko czekamy na zdarzenia
+    cv2.imshow("Wybór trybu", img)
     while True:
-        cv2.imshow("Wybór trybu", img)
 
         # sprawdzamy czy okno istnieje
         if cv2.getWindowProperty("Wybór trybu", cv2.WND_PROP_VISIBLE) < 1:
@@ -68,7 +73,7 @@ def choose_control_mode():
         if selected_mode is not None:
             break
 
-        if cv2.waitKey(20) & 0xFF == 27:  # ESC
+        if cv2.waitKey(MENU_WAIT_MS) & 0xFF == 27:  # ESC
             selected_mode = None
             break
 
@@ -102,8 +107,9 @@ def choose_game_mode():
     cv2.namedWindow("Wybór trybu gry")
     cv2.setMouseCallback("Wybór trybu gry", mouse_callback_game_mode)
 
+    # Obraz menu jest statyczny - wyświetlamy go raz, a w pętli tylko czekamy na zdarzenia
+    cv2.imshow("Wybór trybu gry", img)
     while True:
-        cv2.imshow("Wybór trybu gry", img)
 
         if cv2.getWindowProperty("Wybór trybu gry", cv2.WND_PROP_VISIBLE) < 1:
             game_mode = None
@@ -112,14 +118,85 @@ def choose_game_mode():
         if game_mode is not None:
             break
 
-        if cv2.waitKey(20) & 0xFF == 27:  # ESC
+        if cv2.waitKey(MENU_WAIT_MS) & 0xFF == 27:  # ESC
             game_mode = None
             break
 
     cv2.destroyWindow("Wybór trybu gry")
     return game_mode
 
-def main():
+def parse_args():
+    """Ustawienia śledzenia dłoni z linii poleceń"""
+    parser = argparse.ArgumentParser(description="Edukacyjna Gra Muzyczna")
+    parser.add_argument("--tracker", choices=[BACKEND_MEDIAPIPE, BACKEND_MARKER], default=BACKEND_MEDIAPIPE,
+                        help="backend śledzenia dłoni (marker - kolorowy znacznik dla słabych komputerów)")
+    parser.add_argument("--model-complexity", type=int, choices=[0, 1], default=1,
+                        help="złożoność modelu MediaPipe: 0 - lite, 1 - full")
+    parser.add_argument("--no-roi", action="store_true",
+                        help="wyłącz śledzenie dłoni w wycinku klatki")
+    parser.add_argument("--detect-every", type=int, default=1,
+                        help="pełna detekcja dłoni co N klatek, pomiędzy nimi przepływ optyczny")
+    parser.add_argument("--record", metavar="PLIK",
+                        help="nagraj sesję (kursor, kliknięcia, klawisze) do pliku")
+    parser.add_argument("--replay", metavar="PLIK",
+                        help="odtwórz nagraną sesję zamiast kamery i myszy")
+    parser.add_argument("--video", metavar="PLIK",
+                        help="użyj pliku wideo zamiast kamery")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="kamera i śledzenie dłoni w osobnych procesach (wiele rdzeni)")
+    parser.add_argument("--simultaneous", action="store_true",
+                        help="multiplayer: wszyscy zgadują naraz, każdy gracz swoją dłonią")
+    parser.add_argument("--hand-assignment", choices=[ASSIGN_REGION, ASSIGN_IDENTITY], default=ASSIGN_REGION,
+                        help="przypisanie dłoni do graczy: region - pas ekranu, identity - śledzenie dłoni")
+    parser.add_argument("--fps", type=int, default=LOOP_SETTINGS["target_fps"],
+                        help="docelowa liczba klatek na sekundę (mniej - mniejsze zużycie CPU)")
+    parser.add_argument("--tick-rate", type=int, default=LOOP_SETTINGS["tick_rate"],
+                        help="liczba kroków logiki gry na sekundę")
+    parser.add_argument("--fixed-quality", action="store_true",
+                        help="wyłącz automatyczne obniżanie jakości, gdy komputer nie nadąża")
+    parser.add_argument("--audio-block", type=int, default=MIXER_SETTINGS["block_size"],
+                        help="rozmiar bloku miksera w próbkach (mniej - mniejsze opóźnienie dźwięku)")
+    parser.add_argument("--polyphony", type=int, default=MIXER_SETTINGS["polyphony"],
+                        help="maksymalna liczba jednocześnie brzmiących dźwięków w trybie własnej melodii")
+    return parser.parse_args()
+
+def tracker_settings_from_args(args):
+    return {
+        "backend": args.tracker,
+        "model_complexity": args.model_complexity,
+        "roi_tracking": not args.no_roi,
+        "detect_every": max(1, args.detect_every),
+    }
+
+def input_settings_from_args(args):
+    return {
+        "record": args.record,
+        "replay": args.replay,
+        "video": args.video,
+        "pipeline": args.pipeline,
+    }
+
+def multiplayer_settings_from_args(args):
+    return {
+        "simultaneous": args.simultaneous,
+        "hand_assignment": args.hand_assignment,
+    }
+
+def loop_settings_from_args(args):
+    return {
+        "target_fps": max(1, args.fps),
+        "tick_rate": max(1, args.tick_rate),
+        "adaptive_quality": not args.fixed_quality,
+    }
+
+def mixer_settings_from_args(args):
+    return {
+        "block_size": max(64, args.audio_block),
+        "polyphony": max(1, args.polyphony),
+    }
+
+def main(tracker_settings=None, input_settings=None, multiplayer_settings=None, loop_settings=None,
+         mixer_settings=None):
     """Główna funkcja aplikacji"""
     while True:
         # Wybór trybu sterowania
@@ -137,18 +214,21 @@ def main():
         # Uruchom odpowiedni tryb gry
         if game_mode == MODE_PLAYGROUND:
             print("Uruchamianie trybu własnej melodii...")
-            run_playground(control_mode)
+            run_playground(control_mode, tracker_settings, input_settings=input_settings,
+                           loop_settings=loop_settings, mixer_settings=mixer_settings)
             break
         elif game_mode == MODE_DOUBLE:
             print("Uruchamianie trybu multiplayer...")
-            result = run_multiplayer(control_mode)
+            result = run_multiplayer(control_mode, tracker_settings, input_settings=input_settings,
+                                     multiplayer_settings=multiplayer_settings, loop_settings=loop_settings)
             if result == "menu":
                 continue  # Powróć do menu
             else:
                 break  # Wyjdź z aplikacji
         elif game_mode == MODE_SINGLE:
             print("Uruchamianie trybu wyzwania dla jednego gracza...")
-            result = run_challenge(control_mode)
+            result = run_challenge(control_mode, tracker_settings, input_settings=input_settings,
+                                   loop_settings=loop_settings)
             if result == "menu":
                 continue  # Powróć do menu
             else:
@@ -160,5 +240,7 @@ def main():
 if __name__ == "__main__":
     print("🎵 Edukacyjna Gra Muzyczna 🎵")
     print("Witaj w grze muzycznej!")
-    main()
+    args = parse_args()
+    main(tracker_settings_from_args(args), input_settings_from_args(args), multiplayer_settings_from_args(args),
+         loop_settings_from_args(args), mixer_settings_from_args(args))
     print("Dziękuję za grę! 🎵")
\ No newline at end of file
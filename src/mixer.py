@@ -0,0 +1,274 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from sound_bank import SOUND_BANK
+
+# Domyślne ustawienia programowego miksera
+MIXER_SETTINGS = {
+    "block_size": 512,      # Probki na blok - opoznienie od wyzwolenia to najwyzej ok. 2 bloki
+    "polyphony": 8,         # Ile glosow gra naraz, zanim najstarszy zostanie wyciszony
+    "voices_per_sound": 2,  # Limit glosow jednej nuty przy szybkim powtarzaniu
+    "attack": 0.005,        # Narastanie glośności nowego glosu (s) - bez trzaskow
+    "release": 0.03,        # Wyciszanie odebranego glosu (s)
+    "master_gain": 1.0,
+    "note_cache_mb": 32,    # Limit pamieci na probki przestrojone do innych nut
+}
+
+
+def sound_samples(sound):
+    """Probki pygame.mixer.Sound jako float32 (N, kanaly) w zakresie -1..1"""
+    data = pygame.sndarray.array(sound)
+    scale = float(np.iinfo(data.dtype).max)
+    data = data.astype(np.float32) / scale
+    return data.reshape(len(data), -1)
+
+
+def pitch_shift(samples, semitones):
+    """Probka przestrojona o podana liczbe poltonow przez przeprobkowanie.
+
+    Interpolacja liniowa liczona wektorowo dla calej probki i wszystkich
+    kanalow naraz; wyzsza nuta jest odpowiednio krotsza (jak przy szybszym
+    odtwarzaniu tasmy).
+    """
+    if semitones == 0 or len(samples) < 2:
+        return samples
+    ratio = 2.0 ** (semitones / 12.0)
+    positions = np.arange(0.0, len(samples) - 1, ratio)
+    index = positions.astype(np.intp)
+    frac = (positions - index).astype(np.float32)[:, None]
+    shifted = samples[index] * (1.0 - frac)
+    shifted += samples[index + 1] * frac
+    return shifted
+
+
+class NoteCache:
+    """Przestrojone probki (instrument, polton) z limitem pamieci.
+
+    Kazdy wariant jest liczony przy pierwszym uzyciu, a po przekroczeniu
+    max_bytes usuwane sa najdawniej grane nuty.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name, semitones, base):
+        key = (name, semitones)
+        samples = self.entries.get(key)
+        if samples is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return samples
+        self.misses += 1
+        samples = pitch_shift(base, semitones)
+        self.entries[key] = samples
+        self.bytes += samples.nbytes
+        # Zawsze zostaje co najmniej wlaśnie policzona nuta
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.nbytes
+            self.evictions += 1
+        return samples
+
+    def stats_text(self):
+        return (f"Nuty: {len(self.entries)} w pamieci ({self.bytes / (1024 * 1024):.1f} MB), "
+                f"trafienia: {self.hits}, przeliczone: {self.misses}, usuniete: {self.evictions}")
+
+
+class Voice:
+    """Jedna odtwarzana probka z wlasnym wzmocnieniem i obwiednia"""
+
+    def __init__(self, note, samples, gain, serial):
+        self.note = note        # (instrument, polton)
+        self.samples = samples  # float32 (N, kanaly) w zakresie -1..1
+        self.gain = gain
+        self.serial = serial    # Kolejnośc wyzwolenia - najmniejszy to najstarszy glos
+        self.position = 0
+        self.release_from = None  # Pozycja, od ktorej trwa wyciszanie
+
+    @property
+    def releasing(self):
+        return self.release_from is not None
+
+    def release(self):
+        if self.release_from is None:
+            self.release_from = self.position
+
+
+class SoftwareMixer:
+    """Programowy mikser: probki jako tablice NumPy sumowane blok po bloku.
+
+    Watek miksera sklada kolejne bloki ze wszystkich aktywnych glosow (z ich
+    wzmocnieniem i obwiednia narastania/wyciszania) i kolejkuje je na jednym
+    zarezerwowanym kanale pygame (Channel.queue). Gra tylko dodaje glosy
+    przez play(). Gdy glosow jest wiecej niz polyphony, najstarszy jest
+    krotko wyciszany, a nie urywany; to samo przy zbyt wielu powtorzeniach
+    jednej nuty. Inne nuty instrumentu to probka przestrojona w NoteCache.
+    Opoznienie od play() do wyjścia ogranicza rozmiar bloku (blok grany +
+    blok w kolejce). Bez aktywnych glosow watek tylko czeka - nie sklada
+    ani nie kolejkuje blokow ciszy.
+    """
+
+    def __init__(self, settings=None, sound_bank=SOUND_BANK):
+        options = dict(MIXER_SETTINGS)
+        if settings:
+            options.update(settings)
+        self.block_size = options["block_size"]
+        self.polyphony = options["polyphony"]
+        self.voices_per_sound = options["voices_per_sound"]
+        self.master_gain = options["master_gain"]
+        self.sound_bank = sound_bank
+
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.frequency, size, self.channels = pygame.mixer.get_init()
+        if size not in (-8, -16, -32):
+            raise ValueError(f"Mikser programowy wymaga probek ze znakiem, a format miksera to {size}")
+        self.sample_type = {-8: np.int8, -16: np.int16, -32: np.int32}[size]
+        self.sample_scale = float(np.iinfo(self.sample_type).max)
+        self.attack = max(1, int(options["attack"] * self.frequency))
+        self.release_length = max(1, int(options["release"] * self.frequency))
+        self.block_time = self.block_size / self.frequency
+
+        self.samples = {}  # Nazwa -> float32 (N, kanaly) lub None
+        self.notes = NoteCache(int(options["note_cache_mb"] * 1024 * 1024))
+        self.voices = []
+        self.serial = 0
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._mix = np.zeros((self.block_size, self.channels), dtype=np.float32)
+        self._ramp = np.arange(self.block_size, dtype=np.float32)
+        self._output = np.zeros((self.block_size, self.channels), dtype=self.sample_type)
+
+        # Kanal 0 tylko dla miksera - Sound.play() z innych miejsc go nie zajmie
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+
+        # Statystyki
+        self.blocks = 0
+        self.underruns = 0
+        self.stolen = 0
+        self.peak_voices = 0
+
+    def _samples_for(self, name, semitones=0):
+        if name not in self.samples:
+            sound = self.sound_bank.get(name)
+            if sound is None:
+                self.samples[name] = None
+            else:
+                self.samples[name] = sound_samples(sound)
+        base = self.samples[name]
+        if base is None or semitones == 0:
+            return base
+        return self.notes.get(name, semitones, base)
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._mix_loop, name="SoftwareMixer", daemon=True)
+        self._thread.start()
+        return self
+
+    def play(self, name, gain=1.0, semitones=0):
+        """Wyzwala nowy glos instrumentu (opcjonalnie przestrojony o semitones
+        poltonow); zwraca False, gdy probki brak"""
+        samples = self._samples_for(name, semitones)
+        if samples is None:
+            return False
+        with self._lock:
+            # Limit powtorzen liczony dla jednej nuty - rozne nuty instrumentu moga brzmiec razem
+            note = (name, semitones)
+            same = [v for v in self.voices if v.note == note and not v.releasing]
+            if len(same) >= self.voices_per_sound:
+                self._steal(same)
+            active = [v for v in self.voices if not v.releasing]
+            if len(active) >= self.polyphony:
+                self._steal(active)
+            self.voices.append(Voice(note, samples, gain, self.serial))
+            self.serial += 1
+            self.peak_voices = max(self.peak_voices, len(self.voices))
+        return True
+
+    def _steal(self, candidates):
+        min(candidates, key=lambda v: v.serial).release()
+        self.stolen += 1
+
+    def _render_block(self):
+        """Sumuje jeden blok wszystkich glosow (wywolywane pod blokada)"""
+        mix = self._mix
+        mix.fill(0.0)
+        ramp = self._ramp
+        finished = []
+        for voice in self.voices:
+            n = min(self.block_size, len(voice.samples) - voice.position)
+            envelope = (voice.position + ramp[:n]) / self.attack
+            np.minimum(envelope, 1.0, out=envelope)
+            if voice.releasing:
+                fade = 1.0 - (voice.position - voice.release_from + ramp[:n]) / self.release_length
+                np.maximum(fade, 0.0, out=fade)
+                envelope *= fade
+            envelope *= voice.gain
+            mix[:n] += voice.samples[voice.position:voice.position + n] * envelope[:, None]
+            voice.position += n
+            done = voice.position >= len(voice.samples)
+            if voice.releasing and voice.position - voice.release_from >= self.release_length:
+                done = True
+            if done:
+                finished.append(voice)
+        for voice in finished:
+            self.voices.remove(voice)
+
+        mix *= self.master_gain * self.sample_scale
+        np.clip(mix, -self.sample_scale, self.sample_scale, out=mix)
+        self._output[:] = mix
+        self.blocks += 1
+        if self.channels == 1:
+            return pygame.sndarray.make_sound(self._output[:, 0])
+        return pygame.sndarray.make_sound(self._output)
+
+    def _mix_loop(self):
+        idle = True
+        while self._running:
+            if self.channel.get_queue() is not None:
+                time.sleep(self.block_time / 4)
+                continue
+            with self._lock:
+                block = self._render_block() if self.voices else None
+            if block is None:
+                # Brak glosow - nic nie miksujemy, kanal sam wybrzmiewa do ciszy
+                idle = True
+                time.sleep(self.block_time / 4)
+                continue
+            if self.channel.get_busy():
+                self.channel.queue(block)
+            else:
+                # Kanal zdazyl wybrzmiec - blok nie zostal przygotowany na czas
+                # (po przerwie bez glosow to zwykly start, a nie niedobor)
+                if not idle:
+                    self.underruns += 1
+                self.channel.play(block)
+            idle = False
+
+    def stats_text(self):
+        block_ms = self.block_time * 1000.0
+        return (f"Mikser: blok {self.block_size} probek ({block_ms:.1f} ms), glosy {len(self.voices)}/{self.polyphony} "
+                f"(max {self.peak_voices}), odebrane: {self.stolen}, niedobory: {self.underruns} | "
+                f"{self.notes.stats_text()}")
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.channel.stop()
+        pygame.mixer.set_reserved(0)
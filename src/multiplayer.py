@@ -1,9 +1,19 @@
 import cv2
-import mediapipe as mp
-import time
-import math
 import numpy as np
-import pygame
+
+import clock
+from hand_tracking import ASSIGN_REGION, HandAssigner
+from governor import QualityGovernor
+from hit_test import NO_INSTRUMENT
+from input_source import open_input_source
+from layout import Layout
+from loop import FrameLoop
+from overlay import OverlayCompositor
+from render_sink import open_render_sink
+from scheduler import PlaybackScheduler
+from sound_bank import SOUND_BANK
+from scene import StaticScene
+from text_cache import measure_text, put_text
 
 # Definicja instrumentow z pozycjami (powtorzone z main.py dla niezalezności)
 INSTRUMENTS = [
@@ -15,19 +25,23 @@ INSTRUMENTS = [
     {"name": "Flet", "pos": (350, 250), "color": (100, 255, 255)},
 ]
 
-pygame.mixer.init()
-
-# Zaladuj dzwieki instrumentow
-for instrument in INSTRUMENTS:
-    instrument_name = instrument["name"].lower()
-    try:
-        instrument["sound"] = pygame.mixer.Sound(f"sound/{instrument_name}.mp3")
-    except:
-        print(f"Nie mozna zaladowac dzwieku dla {instrument_name}")
-
 INSTRUMENT_RADIUS = 40
 HIGHLIGHT_RADIUS = 60
 
+# Pozycje i promienie zaprojektowane dla klatki kamery 640x480 - uklad przelicza je
+# do rozmiaru klatki, a mapa trafien i rysowanie korzystaja z tego samego przeliczenia
+LAYOUT_SIZE = (640, 480)
+LAYOUT = Layout([instrument["pos"] for instrument in INSTRUMENTS], [INSTRUMENT_RADIUS] * len(INSTRUMENTS),
+                LAYOUT_SIZE)
+HIGHLIGHT_SCALE = HIGHLIGHT_RADIUS / INSTRUMENT_RADIUS
+
+# Tlo, instrumenty i podpisy rysowane raz - w petli tylko kopiowane do klatki
+SCENE = StaticScene(INSTRUMENTS, LAYOUT)
+GAME_AREA_MARGIN = 50
+
+# Polprzezroczyste elementy mieszane tylko w swoich prostokatach
+OVERLAY = OverlayCompositor()
+
 # Tryby sterowania
 CONTROL_HAND = "hand"
 CONTROL_MOUSE = "mouse"
@@ -43,8 +57,23 @@ GAME_STATE_WAITING_FOR_CREATOR = "waiting_for_creator"
 GAME_STATE_SHOWING_SCORES = "showing_scores"
 GAME_STATE_NEXT_CREATOR = "next_creator"
 
+# Stany graczy w trybie jednoczesnym (tablica player_status)
+PLAYER_IDLE = 0      # Nie zgaduje (np. tworca sekwencji)
+PLAYER_GUESSING = 1
+PLAYER_DONE = 2      # Odgadl cala sekwencje
+PLAYER_FAILED = 3    # Pomylil sie
+
+# Kolory kursorow graczy w trybie jednoczesnym
+PLAYER_COLORS = [(0, 255, 0), (255, 128, 0), (0, 128, 255), (255, 0, 255), (0, 255, 255), (255, 255, 0)]
+
+# Domyślne ustawienia trybu multiplayer
+MULTIPLAYER_SETTINGS = {
+    "simultaneous": False,             # Wszyscy odgadujacy graja naraz, kazdy swoja dlonia
+    "hand_assignment": ASSIGN_REGION,  # "region" (pas kadru) lub "identity" (śledzenie dloni)
+}
+
 class MultiplayerGame:
-    def __init__(self, players, control_mode=CONTROL_HAND, starting_level=2):
+    def __init__(self, players, control_mode=CONTROL_HAND, starting_level=2, simultaneous=False):
         self.players = players  # Lista imion graczy
         self.scores = {player: 0 for player in players}  # Punkty graczy
         self.current_creator_idx = 0  # Indeks gracza tworzacego sekwencje
@@ -71,6 +100,16 @@ class MultiplayerGame:
         self.hover_duration_needed = 1.0
         self.hover_progress = 0.0
         
+        # Tryb jednoczesny: stan kazdego gracza w tablicach indeksowanych numerem gracza
+        self.simultaneous = simultaneous
+        num_players = len(players)
+        self.player_hover = np.full(num_players, NO_INSTRUMENT, dtype=np.int16)
+        self.player_hover_start = np.zeros(num_players, dtype=np.float64)
+        self.player_hover_progress = np.zeros(num_players, dtype=np.float32)
+        self.player_progress = np.zeros(num_players, dtype=np.int32)  # Ile instrumentow odgadl gracz
+        self.player_status = np.full(num_players, PLAYER_IDLE, dtype=np.int8)
+        self.scores_shown_at = 0
+        
         # Liczniki rund
         self.completed_rounds_in_level = 0  # Ile graczy juz stworzylo sekwencje na tym poziomie
         self.total_rounds_per_level = len(players)  # Kazdy gracz tworzy sekwencje raz na poziom
@@ -78,6 +117,9 @@ class MultiplayerGame:
         self.show_message_until = 0  # Do wyświetlania komunikatow czasowych
         self.current_message = ""
         
+        # Opoznione przejścia (np. przerwa przed nowym poziomem) - update() nigdy nie czeka
+        self.scheduler = PlaybackScheduler()
+        
         print(f"🎵 Gra wieloosobowa rozpoczeta!")
         print(f"Gracze: {', '.join(self.players)}")
         print(f"Poziom trudności: {self.current_level} instrumentow")
@@ -93,10 +135,11 @@ class MultiplayerGame:
     
     def show_timed_message(self, message, duration):
         self.current_message = message
-        self.show_message_until = time.time() + duration
+        self.show_message_until = clock.now() + duration
     
     def update(self):
-        current_time = time.time()
+        current_time = clock.now()
+        self.scheduler.update(current_time)
         
         # Ukryj wiadomośc po czasie
         if current_time > self.show_message_until:
@@ -121,9 +164,12 @@ class MultiplayerGame:
             else:
                 self.game_state = GAME_STATE_WAITING
                 self.highlight_instrument = -1
-                current_guesser = self.get_current_guesser()
-                if current_guesser:
-                    self.show_timed_message(f"Kolej {current_guesser}!", 1.5)
+                if self.simultaneous:
+                    self.show_timed_message("Wszyscy zgaduja!", 1.5)
+                else:
+                    current_guesser = self.get_current_guesser()
+                    if current_guesser:
+                        self.show_timed_message(f"Kolej {current_guesser}!", 1.5)
                     
         elif self.game_state == GAME_STATE_SUCCESS:
             # Gracz odgadl sekwencje - przejdz do nastepnego gracza po krotkiej przerwie
@@ -142,11 +188,14 @@ class MultiplayerGame:
                 self.next_guesser()
             
         elif self.game_state == GAME_STATE_SHOWING_SCORES:
-            # Wyświetlanie wynikow po rundzie
-            pass
+            # Wyświetlanie wynikow po rundzie (w trybie jednoczesnym krotka przerwa)
+            if self.simultaneous and current_time - self.scores_shown_at > 2.0:
+                self.end_round()
         
         # Aktualizuj hover dla trybu reki
-        if self.control_mode == CONTROL_HAND and self.game_state in [GAME_STATE_WAITING, GAME_STATE_WAITING_FOR_CREATOR]:
+        if self.simultaneous:
+            self.update_player_progress(current_time)
+        elif self.control_mode == CONTROL_HAND and self.game_state in [GAME_STATE_WAITING, GAME_STATE_WAITING_FOR_CREATOR]:
             if self.hover_instrument >= 0:
                 hover_elapsed = current_time - self.hover_start_time
                 self.hover_progress = min(hover_elapsed / self.hover_duration_needed, 1.0)
@@ -161,21 +210,65 @@ class MultiplayerGame:
         self.hover_instrument = -1
         self.hover_start_time = 0
         self.hover_progress = 0.0
+        self.player_hover.fill(NO_INSTRUMENT)
+        self.player_hover_progress.fill(0.0)
     
-    def update_hover(self, x, y):
+    def active_players(self):
+        """Maska graczy, ktorzy moga teraz wybierac instrumenty (tryb jednoczesny)"""
+        if self.game_state == GAME_STATE_WAITING_FOR_CREATOR:
+            active = np.zeros(len(self.players), dtype=bool)
+            active[self.current_creator_idx] = True
+            return active
+        if self.game_state == GAME_STATE_WAITING:
+            return self.player_status == PLAYER_GUESSING
+        return np.zeros(len(self.players), dtype=bool)
+    
+    def update_hover_players(self, points, frame_width, frame_height):
+        """Hover wszystkich graczy naraz; points to tablica (N, 2) w pikselach, NaN - brak dloni"""
+        points = np.nan_to_num(np.asarray(points, dtype=np.float32), nan=-1.0)
+        hit_map = LAYOUT.transform(frame_width, frame_height).hit_map
+        hovered = hit_map.query_hover_many(points, self.player_hover)
+        hovered[~self.active_players()] = NO_INSTRUMENT
+        
+        changed = hovered != self.player_hover
+        self.player_hover[changed] = hovered[changed]
+        self.player_hover_start[changed] = clock.now()
+        self.player_hover_progress[changed] = 0.0
+    
+    def update_player_progress(self, current_time):
+        """Postep hover kazdego gracza i wybor instrumentu po hover_duration_needed"""
+        hovering = self.player_hover >= 0
+        elapsed = (current_time - self.player_hover_start) / self.hover_duration_needed
+        self.player_hover_progress[:] = np.where(hovering, np.minimum(elapsed, 1.0), 0.0)
+        
+        for player in np.flatnonzero(self.player_hover_progress >= 1.0):
+            instrument = int(self.player_hover[player])
+            self.player_hover[player] = NO_INSTRUMENT
+            self.player_hover_progress[player] = 0.0
+            self.activate_for_player(int(player), instrument)
+    
+    def hovered_instruments(self):
+        """Slownik {instrument: postep hover} do rysowania (najwiekszy postep, gdy kilku graczy)"""
+        if not self.simultaneous:
+            if self.hover_instrument < 0:
+                return {}
+            return {self.hover_instrument: self.hover_progress}
+        hovers = {}
+        for player in np.flatnonzero(self.player_hover >= 0):
+            instrument = int(self.player_hover[player])
+            hovers[instrument] = max(hovers.get(instrument, 0.0), float(self.player_hover_progress[player]))
+        return hovers
+    
+    def update_hover(self, x, y, frame_width, frame_height):
         if self.control_mode != CONTROL_HAND:
             return
         if self.game_state not in [GAME_STATE_WAITING, GAME_STATE_WAITING_FOR_CREATOR]:
             return
             
-        current_time = time.time()
+        current_time = clock.now()
         
-        hovered_instrument = -1
-        for i, instrument in enumerate(INSTRUMENTS):
-            dist = math.sqrt((x - instrument["pos"][0])**2 + (y - instrument["pos"][1])**2)
-            if dist <= INSTRUMENT_RADIUS:
-                hovered_instrument = i
-                break
+        hit_map = LAYOUT.transform(frame_width, frame_height).hit_map
+        hovered_instrument = hit_map.query_hover(x, y, self.hover_instrument)
         
         if hovered_instrument != self.hover_instrument:
             if hovered_instrument >= 0:
@@ -185,30 +278,27 @@ class MultiplayerGame:
             else:
                 self.reset_hover_state()
     
-    def check_touch(self, x, y):
+    def check_touch(self, x, y, frame_width, frame_height):
         if self.control_mode != CONTROL_MOUSE:
             return
         if self.game_state not in [GAME_STATE_WAITING, GAME_STATE_WAITING_FOR_CREATOR]:
             return
             
-        current_time = time.time()
+        current_time = clock.now()
         if current_time - self.last_touch_time < self.touch_cooldown:
             return
         
-        for i, instrument in enumerate(INSTRUMENTS):
-            dist = math.sqrt((x - instrument["pos"][0])**2 + (y - instrument["pos"][1])**2)
-            if dist <= INSTRUMENT_RADIUS:
-                self.activate_instrument(i)
-                self.last_touch_time = current_time
-                break
+        touched_instrument = LAYOUT.transform(frame_width, frame_height).hit_map.query(x, y)
+        if touched_instrument >= 0:
+            self.activate_instrument(touched_instrument)
+            self.last_touch_time = current_time
+    
+    def play_instrument_sound(self, instrument_index):
+        SOUND_BANK.play(INSTRUMENTS[instrument_index]["name"], 0.8)
     
     def activate_instrument(self, instrument_index):
-        current_time = time.time()
-        
         # Odtworz dzwiek instrumentu
-        if "sound" in INSTRUMENTS[instrument_index]:
-            INSTRUMENTS[instrument_index]["sound"].play()
-            INSTRUMENTS[instrument_index]["sound"].set_volume(0.8)
+        self.play_instrument_sound(instrument_index)
         
         if self.game_state == GAME_STATE_WAITING_FOR_CREATOR:
             # Tworca dodaje instrument do sekwencji
@@ -256,8 +346,49 @@ class MultiplayerGame:
                 self.show_timed_message(f"✗ {current_guesser} sie pomylil na {self.current_sequence_index + 1}. instrumencie!", 2.0)
                 self.game_state = GAME_STATE_GAME_OVER
     
+    def activate_for_player(self, player, instrument_index):
+        """Wybor instrumentu przez jednego gracza w trybie jednoczesnym"""
+        if not self.active_players()[player]:
+            return
+        if self.game_state == GAME_STATE_WAITING_FOR_CREATOR:
+            self.activate_instrument(instrument_index)
+            return
+        
+        self.play_instrument_sound(instrument_index)
+        guesser = self.players[player]
+        expected_instrument = self.sequence[self.player_progress[player]]
+        print(f"{guesser} wybral: {INSTRUMENTS[instrument_index]['name']}")
+        
+        if instrument_index == expected_instrument:
+            self.player_progress[player] += 1
+            if self.player_progress[player] >= len(self.sequence):
+                self.scores[guesser] += 1
+                self.player_status[player] = PLAYER_DONE
+                self.show_timed_message(f"🎉 {guesser} odgadl cala sekwencje!", 2.0)
+                print(f"🎉 {guesser} odgadl cala sekwencje!")
+        else:
+            # Bledna odpowiedz - tworca dostaje punkt za blad gracza
+            creator = self.get_current_creator()
+            self.round_scores[creator] = self.round_scores.get(creator, 0) + 1
+            self.player_status[player] = PLAYER_FAILED
+            expected_name = INSTRUMENTS[expected_instrument]['name']
+            print(f"✗ {guesser} sie pomylil! Oczekiwano: {expected_name}")
+            self.show_timed_message(f"✗ {guesser} sie pomylil na {self.player_progress[player] + 1}. instrumencie!", 2.0)
+        
+        # Wszyscy skonczyli - pokaz wyniki i zakoncz runde
+        if not np.any(self.player_status == PLAYER_GUESSING):
+            self.game_state = GAME_STATE_SHOWING_SCORES
+            self.scores_shown_at = clock.now()
+            self.reset_hover_state()
+    
     def start_guessing_phase(self):
         """Rozpocznij faze odgadywania - pokaz sekwencje"""
+        if self.simultaneous:
+            # Odgaduja wszyscy poza tworca, kazdy od poczatku sekwencji
+            self.player_status.fill(PLAYER_GUESSING)
+            self.player_status[self.current_creator_idx] = PLAYER_IDLE
+            self.player_progress.fill(0)
+            self.reset_hover_state()
         self.current_guesser_idx = 0
         # Pomin tworce sekwencji
         if self.current_guesser_idx == self.current_creator_idx:
@@ -265,7 +396,7 @@ class MultiplayerGame:
             
         self.game_state = GAME_STATE_SHOWING
         self.sequence_display_index = 0
-        self.highlight_start_time = time.time()
+        self.highlight_start_time = clock.now()
         self.show_timed_message("Obserwuj sekwencje...", 1.0)
         
         creator = self.get_current_creator()
@@ -293,7 +424,7 @@ class MultiplayerGame:
         self.current_sequence_index = 0
         self.game_state = GAME_STATE_SHOWING
         self.sequence_display_index = 0
-        self.highlight_start_time = time.time()
+        self.highlight_start_time = clock.now()
         self.reset_hover_state()
         
         current_guesser = self.get_current_guesser()
@@ -338,9 +469,10 @@ class MultiplayerGame:
         print(f"🎉 Nowy poziom! Teraz {self.current_level} instrumentow")
         self.print_scores()
         
-        # Krotka przerwa przed nastepnym poziomem
-        time.sleep(1.0)
-        self.next_creator()
+        # Krotka przerwa przed nastepnym poziomem - gra w tym czasie tylko rysuje komunikat
+        self.game_state = GAME_STATE_NEXT_CREATOR
+        self.highlight_instrument = -1
+        self.scheduler.schedule_in(1.0, self.next_creator)
     
     def print_scores(self):
         """Wyświetl aktualny stan punktow"""
@@ -351,7 +483,7 @@ class MultiplayerGame:
         print()
     
     def is_point_in_game_area(self, x, y, frame_width, frame_height):
-        margin = 50
+        margin = GAME_AREA_MARGIN
         return (margin <= x <= frame_width - margin and 
                 margin <= y <= frame_height - margin)
 
@@ -442,7 +574,9 @@ def draw_multiplayer_info(frame, game, control_mode):
         remaining = game.current_level - len(game.created_sequence)
         info_text = f"{creator} tworzy sekwencje ({remaining} instrumentow pozostalo)"
         
-        if control_mode == CONTROL_HAND and game.hover_instrument >= 0:
+        if game.simultaneous and game.player_hover[game.current_creator_idx] >= 0:
+            info_text += f" | Hover: {int(game.player_hover_progress[game.current_creator_idx] * 100)}%"
+        elif control_mode == CONTROL_HAND and game.hover_instrument >= 0:
             info_text += f" | Hover: {int(game.hover_progress * 100)}%"
         color = (255, 255, 100)
         
@@ -450,6 +584,12 @@ def draw_multiplayer_info(frame, game, control_mode):
         info_text = f"Obserwuj sekwencje... ({game.sequence_display_index + 1}/{len(game.sequence)})"
         color = (100, 255, 255)
         
+    elif game.game_state == GAME_STATE_WAITING and game.simultaneous:
+        finished = int(np.count_nonzero(game.player_status >= PLAYER_DONE))
+        guessers = int(np.count_nonzero(game.player_status != PLAYER_IDLE))
+        info_text = f"Wszyscy zgaduja! Skonczylo: {finished}/{guessers}"
+        color = (100, 255, 100)
+        
     elif game.game_state == GAME_STATE_WAITING:
         guesser = game.get_current_guesser()
         progress = len(game.player_sequence)
@@ -469,87 +609,94 @@ def draw_multiplayer_info(frame, game, control_mode):
         info_text = game.current_message
         color = (255, 255, 100)
     
-    text_size = cv2.getTextSize(info_text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
+    text_size = measure_text(info_text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
     cv2.rectangle(frame, (10, 5), (text_size[0] + 20, 40), (0, 0, 0), -1)
-    cv2.putText(frame, info_text, (15, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    put_text(frame, info_text, (15, info_y), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
     
     # Informacje o rundzie i poziomie
     round_info = f"Poziom: {game.current_level} | Runda: {game.completed_rounds_in_level + 1}/{game.total_rounds_per_level}"
     control_text = f"Tryb: {'Reka' if control_mode == CONTROL_HAND else 'Mysz'}"
     
     cv2.rectangle(frame, (w - 200, 5), (w - 10, 70), (0, 0, 0), -1)
-    cv2.putText(frame, round_info, (w - 195, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-    cv2.putText(frame, control_text, (w - 195, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+    put_text(frame, round_info, (w - 195, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+    put_text(frame, control_text, (w - 195, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
     
     # Wyniki graczy
     scores_y = h - 100
     cv2.rectangle(frame, (10, scores_y - 25), (w - 10, h - 10), (0, 0, 0), -1)
-    cv2.putText(frame, "Wyniki:", (15, scores_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
+    put_text(frame, "Wyniki:", (15, scores_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
     
     sorted_players = sorted(game.players, key=lambda p: game.scores[p], reverse=True)
     x_offset = 100
     for i, player in enumerate(sorted_players):
         score_text = f"{player}: {game.scores[player]}"
+        status = game.player_status[game.players.index(player)]
         
         # Podświetl aktualnego tworce lub gracza
         if player == game.get_current_creator():
             color = (100, 255, 255)  # Tworca - cyan
+        elif game.simultaneous and status == PLAYER_DONE:
+            color = (100, 255, 100)  # Odgadl sekwencje - zielony
+        elif game.simultaneous and status == PLAYER_FAILED:
+            color = (100, 100, 255)  # Pomylil sie - czerwony
+        elif game.simultaneous:
+            color = (255, 255, 255)  # Jeszcze zgaduje - bialy
         elif player == game.get_current_guesser():
             color = (100, 255, 100)  # Aktualny gracz - zielony
         else:
             color = (200, 200, 200)  # Pozostali - szary
             
-        cv2.putText(frame, score_text, (x_offset, scores_y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
+        put_text(frame, score_text, (x_offset, scores_y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
         x_offset += len(score_text) * 10 + 20
 
-def draw_game_interface(frame, game, cursor_x, cursor_y, control_mode):
-    """Rysuj interfejs gry"""
-    h, w, _ = frame.shape
-    
-    # Rysuj tlo
-    cv2.rectangle(frame, (0, 0), (w, h), (20, 20, 20), -1)
-    
-    # Rysuj instrumenty
-    for i, instrument in enumerate(INSTRUMENTS):
-        pos = instrument["pos"]
-        color = instrument["color"]
-        
-        # Sprawdz podświetlenia
-        is_sequence_highlight = (game.highlight_instrument == i)
-        is_hover_highlight = (control_mode == CONTROL_HAND and hasattr(game, 'hover_instrument') and game.hover_instrument == i)
-        
-        if is_sequence_highlight:
-            cv2.circle(frame, pos, HIGHLIGHT_RADIUS, (255, 255, 255), 3)
-            cv2.circle(frame, pos, HIGHLIGHT_RADIUS - 5, color, -1)
-        elif is_hover_highlight:
-            cv2.circle(frame, pos, INSTRUMENT_RADIUS, color, -1)
-            cv2.circle(frame, pos, INSTRUMENT_RADIUS, (255, 255, 255), 2)
-            
-            if hasattr(game, 'hover_progress') and game.hover_progress > 0:
-                angle_end = int(360 * game.hover_progress)
-                overlay = frame.copy()
-                cv2.ellipse(overlay, pos, (HIGHLIGHT_RADIUS, HIGHLIGHT_RADIUS), 
-                           -90, 0, angle_end, (0, 255, 0), 4)
-                frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
-                
-                progress_text = f"{int(game.hover_progress * 100)}%"
-                text_size = cv2.getTextSize(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
-                text_pos = (pos[0] - text_size[0] // 2, pos[1] + 5)
-                cv2.putText(frame, progress_text, text_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
-        else:
-            cv2.circle(frame, pos, INSTRUMENT_RADIUS, color, -1)
-            cv2.circle(frame, pos, INSTRUMENT_RADIUS, (255, 255, 255), 2)
-        
-        # Nazwa instrumentu
-        text_size = cv2.getTextSize(instrument["name"], cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
-        text_x = pos[0] - text_size[0] // 2
-        text_y = pos[1] + INSTRUMENT_RADIUS + 20
-        
-        cv2.rectangle(frame, (text_x - 5, text_y - 15), (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
-        cv2.putText(frame, instrument["name"], (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+def draw_player_cursors(frame, game, player_points):
+    """Kursory wszystkich graczy w trybie jednoczesnym, kazdy w kolorze gracza"""
+    for player, (x, y) in enumerate(player_points):
+        if np.isnan(x):
+            continue
+        pos = (int(x), int(y))
+        color = PLAYER_COLORS[player % len(PLAYER_COLORS)]
+        cv2.circle(frame, pos, 8, color, -1)
+        cv2.circle(frame, pos, 12, (255, 255, 255), 2)
+        put_text(frame, game.players[player], (pos[0] + 14, pos[1] - 10),
+                 cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)
+
+def draw_game_interface(frame, game, cursor_x, cursor_y, control_mode, player_points=None):
+    """Rysuj interfejs gry na klatce ze statyczna plansza (SCENE.frame)"""
+    frame_h, frame_w = frame.shape[:2]
+    screen = LAYOUT.transform(frame_w, frame_h)
+    
+    # Podświetlenie sekwencji zaslania podpis, wiec rysujemy go ponownie
+    if game.highlight_instrument >= 0:
+        i = game.highlight_instrument
+        pos = screen.center(i)
+        highlight_radius = screen.radius(i, HIGHLIGHT_SCALE)
+        cv2.circle(frame, pos, highlight_radius, (255, 255, 255), 3)
+        cv2.circle(frame, pos, highlight_radius - 5, INSTRUMENTS[i]["color"], -1)
+        SCENE.draw_label(frame, i)
+    
+    # Pierścienie postepu hover (w trybie jednoczesnym kilka naraz)
+    hovers = game.hovered_instruments() if control_mode == CONTROL_HAND else {}
+    hovers = {i: p for i, p in hovers.items() if i != game.highlight_instrument and p > 0}
+    for i, hover_progress in hovers.items():
+        angle_end = int(360 * hover_progress)
+        highlight_radius = screen.radius(i, HIGHLIGHT_SCALE)
+        OVERLAY.ellipse(screen.center(i), (highlight_radius, highlight_radius), -90, 0, angle_end,
+                        (0, 255, 0), 4, opacity=0.3)
+    OVERLAY.flush(frame)
+    
+    for i, hover_progress in hovers.items():
+        pos = screen.center(i)
+        SCENE.draw_label(frame, i)
+        progress_text = f"{int(hover_progress * 100)}%"
+        text_size = measure_text(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
+        text_pos = (pos[0] - text_size[0] // 2, pos[1] + 5)
+        put_text(frame, progress_text, text_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
     
     # Rysuj kursor
-    if cursor_x is not None and cursor_y is not None:
+    if player_points is not None:
+        draw_player_cursors(frame, game, player_points)
+    elif cursor_x is not None and cursor_y is not None:
         if control_mode == CONTROL_HAND:
             cv2.circle(frame, (cursor_x, cursor_y), 8, (0, 255, 0), -1)
             cv2.circle(frame, (cursor_x, cursor_y), 12, (255, 255, 255), 2)
@@ -557,52 +704,55 @@ def draw_game_interface(frame, game, cursor_x, cursor_y, control_mode):
             cv2.circle(frame, (cursor_x, cursor_y), 6, (255, 0, 0), -1)
             cv2.circle(frame, (cursor_x, cursor_y), 10, (255, 255, 255), 2)
     
-    # Granice dla myszy
-    if control_mode == CONTROL_MOUSE:
-        cv2.rectangle(frame, (50, 50), (w-50, h-50), (100, 100, 100), 2)
-    
     return frame
 
-def run_multiplayer(control_mode):
+def run_multiplayer(control_mode, tracker_settings=None, cursor_settings=None, input_settings=None,
+                    render_settings=None, players=None, starting_level=2, multiplayer_settings=None,
+                    loop_settings=None):
     """Glowna funkcja uruchamiajaca tryb multiplayer"""
-    # Konfiguracja gry
-    players, starting_level = setup_multiplayer_game()
+    options = dict(MULTIPLAYER_SETTINGS)
+    if multiplayer_settings:
+        options.update(multiplayer_settings)
+    
+    # Konfiguracja gry (chyba ze gracze zostali podani, np. przy odtwarzaniu sesji)
+    if players is None:
+        players, starting_level = setup_multiplayer_game()
     if players is None:
         print("Anulowano konfiguracje gry.")
         return "menu"
     
-    # Inicjalizacja MediaPipe (tylko dla trybu reki)
-    mp_hands = None
-    hands = None
-    if control_mode == CONTROL_HAND:
-        mp_hands = mp.solutions.hands
-        hands = mp_hands.Hands(
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7,
-            max_num_hands=1
-        )
-    
-    # Inicjalizacja gry i kamery
-    game = MultiplayerGame(players, control_mode, starting_level)
-    cap = cv2.VideoCapture(0)
-    cv2.namedWindow('Edukacyjna Gra Muzyczna - Multiplayer', cv2.WINDOW_NORMAL)
-    
-    # Zmienne dla myszy
-    mouse_x, mouse_y = 0, 0
-    mouse_clicked = False
-    
-    def mouse_callback(event, x, y, flags, param):
-        nonlocal mouse_x, mouse_y, mouse_clicked
-        mouse_x, mouse_y = x, y
-        if event == cv2.EVENT_LBUTTONDOWN:
-            mouse_clicked = True
-    
-    if control_mode == CONTROL_MOUSE:
-        cv2.setMouseCallback('Edukacyjna Gra Muzyczna - Multiplayer', mouse_callback)
+    # Tryb jednoczesny wymaga dloni - kazdy gracz steruje swoja, jedna detekcja na klatke
+    simultaneous = options["simultaneous"] and control_mode == CONTROL_HAND
+    if options["simultaneous"] and not simultaneous:
+        print("Tryb jednoczesny dziala tylko ze sterowaniem reka - gracze zgaduja po kolei.")
+    hand_assigner = None
+    if simultaneous:
+        tracker_settings = dict(tracker_settings or {})
+        tracker_settings["max_num_hands"] = len(players)
+        hand_assigner = HandAssigner(len(players), options["hand_assignment"])
+    
+    # Wyjście obrazu: okno albo bez ekranu (benchmark, hashe klatek, plik wideo)
+    sink = open_render_sink('Edukacyjna Gra Muzyczna - Multiplayer', render_settings)
+    
+    # Zrodlo wejścia: kamera ze śledzeniem dloni, mysz, wideo lub nagrana sesja
+    source = open_input_source(control_mode, sink.window_name,
+                               input_settings, tracker_settings, cursor_settings)
+    control_mode = source.control_mode
+    
+    # Inicjalizacja gry
+    game = MultiplayerGame(players, control_mode, starting_level, simultaneous=simultaneous)
+    # Logika gry ze stalym krokiem, rysowanie z docelowym FPS
+    loop = FrameLoop(loop_settings)
+    # Na slabym komputerze jakośc spada stopniowo, zamiast tracic plynnośc
+    governor = QualityGovernor(loop.frame_time, {"enabled": loop.adaptive_quality})
+    render_scale = 1.0
     
     print("🎵 Edukacyjna Gra Muzyczna - Tryb Multiplayer 🎵")
     print("Tryb wieloosobowy aktywny!")
     print("Obserwuj sekwencje i powtarzaj CAla SEKWENCJe aby zdobyc punkty!")
+    if simultaneous:
+        region_text = "w swoim pasie ekranu" if options["hand_assignment"] == ASSIGN_REGION else "swoja dlonia"
+        print(f"Tryb jednoczesny: wszyscy zgaduja naraz, kazdy gracz wskazuje {region_text}.")
     if control_mode == CONTROL_HAND:
         print("Trzymaj palec wskazujacy prawej reki nad instrumentem przez 1 sekunde aby go wybrac.")
     else:
@@ -610,66 +760,71 @@ def run_multiplayer(control_mode):
     print("Naciśnij ESC aby zakonczyc.")
     
     while True:
-        ret, frame = cap.read()
+        ret, frame_size = source.read_frame_size()
         if not ret:
             print("Blad: Nie mozna odczytac klatki z kamery")
             break
         
-        frame = cv2.flip(frame, 1)
-        h, w, _ = frame.shape
+        # Klatka kamery nie jest wyświetlana (ani kopiowana) - wyznacza tylko rozmiar
+        # planszy, zmniejszany przez QualityGovernor (uklad jest niezalezny od rozdzielczości)
+        w, h = frame_size
+        h, w = max(1, int(h * render_scale)), max(1, int(w * render_scale))
         
-        # Znajdz pozycje kursora
-        cursor_x, cursor_y = None, None
+        # Znajdz pozycje kursora (w trybie jednoczesnym - czubki palcow wszystkich graczy)
+        player_points = None
+        if simultaneous:
+            player_points = source.poll_hands(w, h, hand_assigner)
+            cursor_x, cursor_y, mouse_clicked = None, None, False
+        else:
+            cursor_x, cursor_y, mouse_clicked = source.poll(w, h)
         
-        if control_mode == CONTROL_HAND:
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = hands.process(rgb)
-            
-            if results.multi_hand_landmarks and results.multi_handedness:
-                for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                    if handedness.classification[0].label == 'Right':
-                        finger_tip = hand_landmarks.landmark[8]
-                        cursor_x = int(finger_tip.x * w)
-                        cursor_y = int(finger_tip.y * h)
-                        break
-        
-        elif control_mode == CONTROL_MOUSE:
-            cursor_x, cursor_y = mouse_x, mouse_y
+        if control_mode == CONTROL_MOUSE:
             if not game.is_point_in_game_area(cursor_x, cursor_y, w, h):
                 cursor_x, cursor_y = None, None
         
-        # Aktualizuj gre
-        game.update()
+        # Aktualizuj gre (stala liczba krokow na sekunde)
+        for _ in range(loop.begin_frame()):
+            game.update()
         
         # Obsluz interakcje
-        if control_mode == CONTROL_HAND and cursor_x is not None and cursor_y is not None:
-            game.update_hover(cursor_x, cursor_y)
+        if simultaneous:
+            game.update_hover_players(player_points, w, h)
+        elif control_mode == CONTROL_HAND and cursor_x is not None and cursor_y is not None:
+            game.update_hover(cursor_x, cursor_y, w, h)
         elif control_mode == CONTROL_MOUSE and mouse_clicked and cursor_x is not None and cursor_y is not None:
-            game.check_touch(cursor_x, cursor_y)
-            mouse_clicked = False
+            game.check_touch(cursor_x, cursor_y, w, h)
         elif control_mode == CONTROL_HAND and cursor_x is None:
             game.reset_hover_state()
         
-        # Rysuj interfejs
-        frame = draw_game_interface(frame, game, cursor_x, cursor_y, control_mode)
+        # Rysuj interfejs na statycznej planszy (tlo, instrumenty, podpisy, granice obszaru myszy)
+        frame = SCENE.frame(w, h, GAME_AREA_MARGIN if control_mode == CONTROL_MOUSE else None)
+        frame = draw_game_interface(frame, game, cursor_x, cursor_y, control_mode, player_points)
         
         # Rysuj informacje multiplayer
         draw_multiplayer_info(frame, game, control_mode)
         
         # Wyświetl
-        cv2.imshow('Edukacyjna Gra Muzyczna - Multiplayer', frame)
+        put_text(frame, governor.stat_text(), (10, h - 12), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        key = sink.show(frame, loop.idle_time())
+        loop.end_frame()
+        if governor.frame_done(loop.work_time):
+            quality = governor.quality
+            source.set_quality(quality)
+            OVERLAY.translucent = quality["translucent"]
+            render_scale = quality["render_scale"]
         
         # Sprawdz wyjście
-        if cv2.waitKey(1) & 0xFF == 27:
+        if source.poll_key(key) == 27:
             break
-        if cv2.getWindowProperty("Edukacyjna Gra Muzyczna - Multiplayer", cv2.WND_PROP_VISIBLE) < 1:
+        if not sink.is_open():
             break
     
     # Cleanup
-    cap.release()
-    cv2.destroyAllWindows()
-    if hands:
-        hands.close()
+    print(source.stats_text())
+    print(sink.stats_text())
+    print(loop.stats_text())
+    source.release()
+    sink.close()
     
     # Wyświetl finalne wyniki
     print("\n🏆 FINALNE WYNIKI:")
@@ -0,0 +1,9 @@
+# Wspolne dla trybu Wlasna Melodia i zgrywania sesji (bounce.py) - bez zaleznosci od gry,
+# wiec bounce.py dziala bez OpenCV i MediaPipe
+
+# Nuty instrumentu: nazwa i przesuniecie wzgledem probki w poltonach (probka bazowa to "do")
+NOTES = [("do", 0), ("re", 2), ("mi", 4), ("fa", 5), ("sol", 7), ("la", 9)]
+
+# Log zagranych nut
+CSV_FILE = "played_instruments.csv"
+CSV_HEADER = ["Timestamp", "Instrument", "Note"]
@@ -0,0 +1,73 @@
+import cv2
+import numpy as np
+
+from buffers import frame_pool
+from text_cache import measure_text, put_text
+
+
+class OverlayCompositor:
+    """Polprzezroczyste elementy interfejsu nakladane tylko w swoich prostokatach.
+
+    Elementy sa zbierane (rectangle, ellipse, text) i rysowane w kolejności
+    dodania przez flush(). Dla elementu polprzezroczystego kopiowany i
+    mieszany jest tylko jego prostokat ograniczajacy, w miejscu, wiec koszt
+    zalezy od wielkości elementu, a nie calej klatki. Elementy z opacity 1.0
+    sa rysowane bezpośrednio, podobnie jak wszystkie elementy, gdy
+    translucent jest wylaczone (najtanszy tryb QualityGovernor).
+    """
+
+    def __init__(self):
+        self.items = []
+        self.translucent = True
+
+    def rectangle(self, pt1, pt2, color, opacity=1.0, thickness=-1):
+        x1, x2 = sorted((pt1[0], pt2[0]))
+        y1, y2 = sorted((pt1[1], pt2[1]))
+        pad = max(thickness, 0)
+        bbox = (x1 - pad, y1 - pad, x2 + pad + 1, y2 + pad + 1)
+        self.items.append((bbox, opacity, cv2.rectangle, (pt1, pt2, color, thickness)))
+
+    def ellipse(self, center, axes, angle, start_angle, end_angle, color, thickness=1, opacity=1.0):
+        pad = max(thickness, 0) + 1
+        bbox = (center[0] - axes[0] - pad, center[1] - axes[1] - pad,
+                center[0] + axes[0] + pad + 1, center[1] + axes[1] + pad + 1)
+        self.items.append((bbox, opacity, cv2.ellipse,
+                           (center, axes, angle, start_angle, end_angle, color, thickness)))
+
+    def text(self, text, org, font_face, font_scale, color, thickness=1, opacity=1.0):
+        (text_w, text_h), baseline = measure_text(text, font_face, font_scale, thickness)
+        bbox = (org[0] - thickness, org[1] - text_h - thickness,
+                org[0] + text_w + thickness + 1, org[1] + baseline + thickness + 1)
+        self.items.append((bbox, opacity, put_text, (text, org, font_face, font_scale, color, thickness)))
+
+    def flush(self, frame):
+        """Rysuje wszystkie zebrane elementy na klatce (w miejscu) i czyści kolejke"""
+        frame_h, frame_w = frame.shape[:2]
+        pool = frame_pool()
+        for bbox, opacity, draw, args in self.items:
+            if opacity >= 1.0 or not self.translucent:
+                draw(frame, *args)
+                continue
+            x1, y1 = max(0, bbox[0]), max(0, bbox[1])
+            x2, y2 = min(frame_w, bbox[2]), min(frame_h, bbox[3])
+            if x2 <= x1 or y2 <= y1:
+                continue
+            roi = frame[y1:y2, x1:x2]
+            layer = pool.like("overlay", roi)
+            np.copyto(layer, roi)
+            draw(layer, *_shift(draw, args, x1, y1))
+            cv2.addWeighted(roi, 1.0 - opacity, layer, opacity, 0, dst=roi)
+        self.items.clear()
+        return frame
+
+
+def _shift(draw, args, dx, dy):
+    """Przesuwa wspolrzedne argumentow rysowania do ukladu wycinka"""
+    if draw is cv2.rectangle:
+        pt1, pt2 = args[0], args[1]
+        return ((pt1[0] - dx, pt1[1] - dy), (pt2[0] - dx, pt2[1] - dy)) + args[2:]
+    if draw is cv2.ellipse:
+        center = args[0]
+        return ((center[0] - dx, center[1] - dy),) + args[1:]
+    org = args[1]
+    return (args[0], (org[0] - dx, org[1] - dy)) + args[2:]
@@ -0,0 +1,359 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from buffers import frame_pool
+from hand_tracking import HandResult, create_hand_tracker
+
+# Domyślne ustawienia potoku wieloprocesowego (kamera / detekcja dloni / gra)
+PIPELINE_SETTINGS = {
+    "device": 0,
+    "width": 640,    # Rozmiar klatek w pierścieniu - kamera o innym rozmiarze jest skalowana
+    "height": 480,
+    "slots": 4,      # Liczba miejsc na klatki w pierścieniu
+    "flip": True,    # Odbicie poziome jak w lustrze (w procesie kamery)
+}
+
+# Pola bloku sterujacego pierścienia (int64)
+LATEST = 0      # Numer ostatniej zapisanej klatki (0 - jeszcze brak)
+STATE = 1       # Stan procesu kamery
+DELIVERED = 2   # Numer ostatniej klatki odebranej przez gre
+CAPTURED = 3
+DROPPED = 4
+CONTROL_FIELDS = 5
+
+STATE_RUNNING = 0
+STATE_FAILED = 1
+STATE_STOPPED = 2
+
+WRITING = -1  # Numer miejsca w trakcie zapisu
+
+# Przy spawn kazdy proces ma wlasny interpreter - bez dziedziczenia watkow kamery i GIL
+CONTEXT = multiprocessing.get_context("spawn")
+
+
+class FrameRing:
+    """Pierścien klatek w pamieci wspoldzielonej (multiprocessing.shared_memory).
+
+    Jeden proces zapisuje, dowolnie wiele czyta; klatki nie sa serializowane,
+    tylko kopiowane do i z miejsc pierścienia. Kazde miejsce ma numer
+    sekwencyjny: na czas zapisu jest ustawiany na WRITING, a czytelnik
+    sprawdza go przed i po kopiowaniu, wiec nie dostanie klatki nadpisanej
+    w polowie. Czas przechwycenia (time.perf_counter) jest wspolny dla
+    wszystkich procesow.
+    """
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 8 * (CONTROL_FIELDS + 2 * slots + 1)
+        create = name is None
+        size = header_bytes + slots * frame_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.owner = create
+
+        buf = self.shm.buf
+        self.control = np.ndarray((CONTROL_FIELDS,), dtype=np.int64, buffer=buf)
+        self.sequence = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=8 * CONTROL_FIELDS)
+        self.timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buf,
+                                     offset=8 * (CONTROL_FIELDS + slots))
+        self.capture_fps = np.ndarray((1,), dtype=np.float64, buffer=buf,
+                                      offset=8 * (CONTROL_FIELDS + 2 * slots))
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=header_bytes)
+        if create:
+            self.control[:] = 0
+            self.sequence[:] = 0
+            self.capture_fps[0] = 0.0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, frame, timestamp):
+        """Zapisuje klatke do nastepnego miejsca (tylko proces kamery)"""
+        seq = int(self.control[LATEST]) + 1
+        slot = seq % self.slots
+        self.sequence[slot] = WRITING
+        np.copyto(self.frames[slot], frame)
+        self.timestamps[slot] = timestamp
+        self.sequence[slot] = seq
+        self.control[LATEST] = seq
+        return seq
+
+    def latest(self):
+        return int(self.control[LATEST])
+
+    def read(self, out, newer_than=0):
+        """Kopiuje najnowsza klatke do out; zwraca (numer, czas) lub None, gdy brak nowszej"""
+        for _ in range(self.slots):
+            seq = int(self.control[LATEST])
+            if seq <= newer_than:
+                return None
+            slot = seq % self.slots
+            if self.sequence[slot] != seq:
+                continue  # Juz nadpisywana - bierzemy nowsza
+            timestamp = float(self.timestamps[slot])
+            np.copyto(out, self.frames[slot])
+            if self.sequence[slot] == seq:
+                return seq, timestamp
+        return None
+
+    def close(self):
+        # Widoki NumPy trzymaja bufor - trzeba je zwolnic przed zamknieciem pamieci
+        self.control = self.sequence = self.timestamps = self.capture_fps = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _capture_process(ring_name, shape, slots, device, flip):
+    """Proces kamery: odczyt, odbicie i zapis klatek do pierścienia"""
+    ring = FrameRing(shape, slots, ring_name)
+    height, width = shape[:2]
+    cap = cv2.VideoCapture(device)
+    pool = frame_pool()
+    last_time = time.perf_counter()
+    frame = None
+    try:
+        while ring.control[STATE] == STATE_RUNNING:
+            ret, frame = cap.read(frame)
+            if not ret:
+                ring.control[STATE] = STATE_FAILED
+                break
+            image = frame
+            if image.shape[:2] != (height, width):
+                image = cv2.resize(image, (width, height), dst=pool.get("resized", shape))
+            if flip:
+                image = cv2.flip(image, 1, dst=pool.get("flipped", shape))
+
+            now = time.perf_counter()
+            # Najnowsza klatka nie zostala odebrana - zostanie nadpisana
+            if ring.control[LATEST] > ring.control[DELIVERED]:
+                ring.control[DROPPED] += 1
+            ring.write(image, now)
+            ring.control[CAPTURED] += 1
+            dt = now - last_time
+            last_time = now
+            if dt > 0:
+                fps = ring.capture_fps[0]
+                ring.capture_fps[0] = 0.9 * fps + 0.1 * (1.0 / dt) if fps else 1.0 / dt
+    finally:
+        cap.release()
+        ring.close()
+
+
+def _inference_process(ring_name, shape, slots, tracker_settings, results, quality, running):
+    """Proces detekcji dloni: czyta najnowsze klatki z pierścienia i odsyla tylko punkty"""
+    ring = FrameRing(shape, slots, ring_name)
+    tracker = create_hand_tracker(tracker_settings)
+    results.put(("describe", tracker.describe()))
+    pool = frame_pool()
+    frame = pool.get("frame", shape)
+    last_frame_id = 0
+    last_processed_id = 0
+    try:
+        while running.value:
+            item = ring.read(frame, last_frame_id)
+            if item is None:
+                if ring.control[STATE] != STATE_RUNNING:
+                    break
+                time.sleep(0.002)
+                continue
+            frame_id, timestamp = item
+            last_frame_id = frame_id
+            stride, input_width = quality[0], quality[1]
+            if frame_id - last_processed_id < stride:
+                continue
+            last_processed_id = frame_id
+
+            start = time.perf_counter()
+            image = frame
+            if input_width and image.shape[1] > input_width:
+                height = max(1, image.shape[0] * input_width // image.shape[1])
+                image = cv2.resize(image, (input_width, height), dst=pool.get("inference", (height, input_width, 3)),
+                                   interpolation=cv2.INTER_AREA)
+            if tracker.multi_hand:
+                hands = tracker.process_all(image)
+                landmarks = hands[0] if hands else None
+            else:
+                landmarks = tracker.process(image)
+                hands = None
+            end = time.perf_counter()
+            try:
+                results.put_nowait(("result", frame_id, timestamp, landmarks, hands, start, end,
+                                    tracker.stats_text()))
+            except queue.Full:
+                pass  # Gra nie odbiera wynikow (np. okno menu) - starsze i tak sa nieaktualne
+    finally:
+        tracker.close()
+        ring.close()
+
+
+class SharedFrameCapture:
+    """Odpowiednik CameraCapture, ktorego kamera dziala w osobnym procesie.
+
+    Klatki przychodza przez FrameRing; read() kopiuje najnowsza do stalego
+    bufora, ktory petla gry moze modyfikowac do nastepnego read().
+    """
+
+    def __init__(self, settings=None, first_frame_timeout=5.0):
+        options = dict(PIPELINE_SETTINGS)
+        if settings:
+            options.update(settings)
+        self.options = options
+        self.shape = (options["height"], options["width"], 3)
+        self.first_frame_timeout = first_frame_timeout
+        self.ring = FrameRing(self.shape, options["slots"])
+        self._process = None
+        self._frame = np.empty(self.shape, dtype=np.uint8)
+        self._frame_id = 0
+
+    def start(self):
+        if self._process is not None:
+            return self
+        self._process = CONTEXT.Process(
+            target=_capture_process, name="CameraCapture", daemon=True,
+            args=(self.ring.name, self.shape, self.ring.slots, self.options["device"], self.options["flip"]))
+        self._process.start()
+        return self
+
+    def _wait_for_first_frame(self):
+        deadline = time.perf_counter() + self.first_frame_timeout
+        while self.ring.latest() == 0 and not self.is_failed() and time.perf_counter() < deadline:
+            time.sleep(0.01)
+
+    def read(self):
+        """Zwraca (ret, frame) z najnowsza klatka, bez blokowania petli gry"""
+        if self._frame_id == 0:
+            self._wait_for_first_frame()
+        if self.is_failed():
+            return False, None
+        item = self.ring.read(self._frame, self._frame_id)
+        if item is not None:
+            self._frame_id = item[0]
+            self.ring.control[DELIVERED] = self._frame_id
+        if self._frame_id == 0:
+            return False, None
+        # Bufor odbiorcy jest staly - klatka wazna do nastepnego read()
+        return True, self._frame
+
+    def frame_size(self):
+        """(szerokośc, wysokośc) klatek bez kopiowania z pamieci wspoldzielonej; None, gdy kamera nie dziala"""
+        if self.ring.latest() == 0:
+            self._wait_for_first_frame()
+        latest = self.ring.latest()
+        if self.is_failed() or latest == 0:
+            return None
+        self.ring.control[DELIVERED] = latest
+        return self.shape[1], self.shape[0]
+
+    def is_failed(self):
+        return self.ring.control[STATE] == STATE_FAILED
+
+    def stats_text(self):
+        control = self.ring.control
+        return (f"Kamera (osobny proces): {self.ring.capture_fps[0]:.1f} FPS | "
+                f"klatki: {control[CAPTURED]} | zgubione: {control[DROPPED]}")
+
+    def release(self):
+        """Zatrzymuje proces kamery i zwalnia pamiec wspoldzielona"""
+        if self.ring.control[STATE] == STATE_RUNNING:
+            self.ring.control[STATE] = STATE_STOPPED
+        if self._process is not None:
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        self.ring.close()
+
+
+class SharedHandWorker:
+    """Odpowiednik HandInferenceWorker, ktorego detekcja dziala w osobnym procesie.
+
+    Proces czyta klatki z pierścienia SharedFrameCapture i odsyla przez
+    kolejke tylko punkty dloni; latest() odbiera je bez czekania.
+    """
+
+    def __init__(self, capture, tracker_settings=None, max_result_age=0.5):
+        self.capture = capture
+        self.tracker_settings = tracker_settings
+        self.max_result_age = max_result_age
+        self.frame_stride = 1
+        self.input_width = None
+
+        self._results = CONTEXT.Queue(maxsize=8)
+        self._quality = CONTEXT.Array("i", [1, 0], lock=False)
+        self._running = CONTEXT.Value("b", 1, lock=False)
+        self._process = None
+        self._result = None
+        self.description = "Detekcja dloni (osobny proces)"
+        self.tracker_stats = ""
+        self.inference_fps = 0.0
+        self.inference_ms = 0.0
+        self._last_time = None
+
+    def start(self):
+        if self._process is not None:
+            return self
+        ring = self.capture.ring
+        self._process = CONTEXT.Process(
+            target=_inference_process, name="HandInference", daemon=True,
+            args=(ring.name, ring.shape, ring.slots, self.tracker_settings,
+                  self._results, self._quality, self._running))
+        self._process.start()
+        return self
+
+    def set_quality(self, frame_stride=1, input_width=None):
+        self.frame_stride = max(1, frame_stride)
+        self.input_width = input_width
+        self._quality[0] = self.frame_stride
+        self._quality[1] = input_width or 0
+
+    def _drain(self):
+        while True:
+            try:
+                message = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if message[0] == "describe":
+                self.description = message[1]
+                continue
+            _, frame_id, timestamp, landmarks, hands, start, end, self.tracker_stats = message
+            self._result = HandResult(frame_id, timestamp, landmarks, hands)
+            self.inference_ms = (end - start) * 1000.0
+            # Czas perf_counter jest wspolny dla procesow - tempo liczymy z chwil zakonczenia
+            if self._last_time is not None and end > self._last_time:
+                fps = 1.0 / (end - self._last_time)
+                self.inference_fps = 0.9 * self.inference_fps + 0.1 * fps if self.inference_fps else fps
+            self._last_time = end
+
+    def latest(self):
+        """Zwraca najnowszy wynik detekcji lub None, jeśli jest zbyt stary"""
+        self._drain()
+        result = self._result
+        if result is None or result.age() > self.max_result_age:
+            return None
+        return result
+
+    def stats_text(self):
+        text = f"{self.description} [osobny proces]: {self.inference_fps:.1f} FPS ({self.inference_ms:.1f} ms)"
+        if self.frame_stride > 1 or self.input_width:
+            text += f" | co {self.frame_stride}. klatka, {self.input_width or 'pelna'} px"
+        if self.tracker_stats:
+            text += f" | {self.tracker_stats}"
+        return text
+
+    def stop(self):
+        self._running.value = 0
+        if self._process is not None:
+            self._drain()
+            self._process.join(timeout=2.0)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        self._results.close()
@@ -1,14 +1,24 @@
 import cv2
-import mediapipe as mp
-import time
-import math
-import numpy as np
 from datetime import datetime
 import csv
 import os
-import pygame
 import json
 
+import clock
+from governor import QualityGovernor
+from hit_test import NO_INSTRUMENT
+from input_source import open_input_source
+from layout import Layout
+from loop import FrameLoop
+from mixer import SoftwareMixer
+from notes import CSV_FILE, CSV_HEADER, NOTES
+from overlay import OverlayCompositor
+from render_sink import open_render_sink
+from scene import BackgroundCache
+from sound_bank import SOUND_BANK
+from sprites import SpriteCache
+from text_cache import measure_text, put_text
+
 
 # Definicja instrumentow z pozycjami dopasowanymi do tla i nazwami plikow obrazow
 INSTRUMENTS = [
@@ -21,25 +31,24 @@ INSTRUMENTS = [
     {"name": "Bass", "pos": (450, 300), "size": 75, "color": (200, 150, 50), "image_file": "img/bass.png"},
 ]
 
-pygame.mixer.init()
-
-# Zaladuj dzwieki instrumentow
-for instrument in INSTRUMENTS:
-    instrument_name = instrument["name"].lower()
-    try:
-        instrument["sound"] = pygame.mixer.Sound(f"sound/{instrument_name}.mp3")
-    except:
-        print(f"Nie mozna zaladowac dzwieku dla {instrument_name}")
-
 INSTRUMENT_RADIUS = 40
 HIGHLIGHT_RADIUS = 60
 CONTROL_HAND = "hand"
 CONTROL_MOUSE = "mouse"
-CSV_FILE = "played_instruments.csv"
+# Pozycje i rozmiary instrumentow (takze w instrument_settings.json) sa w pikselach
+# tla 1024x1024 - uklad przelicza je do rozmiaru klatki
+LAYOUT_SIZE = (1024, 1024)
+# Pady nut (NOTES) pojawiaja sie nad ostatnio zagranym instrumentem
+NOTE_PAD_RADIUS = 22
+NOTE_PAD_GAP = 8
 
 class PlaygroundMode:
-    def __init__(self, control_mode):
+    def __init__(self, control_mode, mixer=None, csv_file=CSV_FILE):
         self.control_mode = control_mode
+        # Programowy mikser (polifonia, obwiednie); bez niego zwykle Sound.play()
+        self.mixer = mixer
+        # Log zagranych nut (None - bez zapisu, np. przy odtwarzaniu sesji)
+        self.csv_file = csv_file
         self.played_instruments = []
         self.hover_instrument = -1
         self.hover_start_time = 0
@@ -48,6 +57,19 @@ class PlaygroundMode:
         self.last_touch_time = 0
         self.touch_cooldown = 0.5
         self.selected_instrument = -1  # Aktualnie wybrany instrument do edycji rozmiaru
+        # Uklad niezalezny od rozdzielczości - przeliczenie do pikseli (i mapa trafien)
+        # liczone raz na rozmiar klatki, wspolne dla rysowania i trafien
+        self.layout = Layout([instrument["pos"] for instrument in INSTRUMENTS],
+                             [instrument["size"] for instrument in INSTRUMENTS], LAYOUT_SIZE)
+        # Pady nut (osobny uklad na instrument, liczony przy pierwszym otwarciu)
+        self.note_instrument = -1
+        self.note_layouts = {}
+        # Obrazy instrumentow gotowe do nakladania (alfa przeliczona raz)
+        self.sprites = SpriteCache()
+        # Polprzezroczyste tla podpisow i HUD, mieszane tylko w swoich prostokatach
+        self.overlay = OverlayCompositor()
+        # Skala rysowania (< 1.0, gdy QualityGovernor zmniejsza rozdzielczośc klatki)
+        self.render_scale = 1.0
         self.init_csv()
         self.load_instrument_settings()  # Wczytaj ustawienia przed ladowaniem obrazow
         self.load_images()
@@ -55,6 +77,7 @@ class PlaygroundMode:
 
     def load_images(self):
         """Zaladuj obrazy instrumentow"""
+        self.sprites.invalidate()
         for instrument in INSTRUMENTS:
             try:
                 # Wczytaj obraz z kanalem alfa (UNCHANGED zachowuje przezroczystośc)
@@ -85,52 +108,109 @@ class PlaygroundMode:
             self.background = None
 
     def init_csv(self):
-        """Inicjalizuje plik CSV z naglowkami, jeśli nie istnieje"""
-        if not os.path.exists(CSV_FILE):
-            with open(CSV_FILE, mode='w', newline='', encoding='utf-8') as file:
+        """Inicjalizuje plik CSV z naglowkami, jeśli nie istnieje (starszy plik bez kolumny Note uzupelnia)"""
+        if self.csv_file is None:
+            return
+        if not os.path.exists(self.csv_file):
+            with open(self.csv_file, mode='w', newline='', encoding='utf-8') as file:
                 writer = csv.writer(file)
-                writer.writerow(["Timestamp", "Instrument"])
+                writer.writerow(CSV_HEADER)
+            return
 
-    def save_to_csv(self, timestamp, instrument_name):
+        try:
+            with open(self.csv_file, mode='r', newline='', encoding='utf-8') as file:
+                rows = list(csv.reader(file))
+            if not rows or rows[0] == CSV_HEADER:
+                return
+            # Wiersze sprzed padow nut to zawsze nuta bazowa
+            base_note = NOTES[0][0]
+            rows = [CSV_HEADER] + [row + [base_note] if len(row) == 2 else row for row in rows[1:]]
+            tmp_path = f"{self.csv_file}.tmp"
+            with open(tmp_path, mode='w', newline='', encoding='utf-8') as file:
+                csv.writer(file).writerows(rows)
+            os.replace(tmp_path, self.csv_file)
+            print(f"Dodano kolumne Note do {self.csv_file}")
+        except OSError as e:
+            print(f"Blad podczas aktualizacji {self.csv_file}: {e}")
+
+    def save_to_csv(self, timestamp, instrument_name, note_name):
         """Zapisuje zagrany instrument do pliku CSV"""
-        with open(CSV_FILE, mode='a', newline='', encoding='utf-8') as file:
+        if self.csv_file is None:
+            return
+        with open(self.csv_file, mode='a', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
-            writer.writerow([timestamp, instrument_name])
+            writer.writerow([timestamp, instrument_name, note_name])
 
-    def activate_instrument(self, instrument_index):
-        """Aktywuje instrument i zapisuje go do pliku CSV"""
+    def activate_instrument(self, instrument_index, note_index=0):
+        """Aktywuje instrument (podana nuta) i zapisuje go do pliku CSV"""
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         instrument_name = INSTRUMENTS[instrument_index]["name"]
+        note_name, semitones = NOTES[note_index]
         
-        if "sound" in INSTRUMENTS[instrument_index]:
-            INSTRUMENTS[instrument_index]["sound"].play()
-            INSTRUMENTS[instrument_index]["sound"].set_volume(0.8)
+        if self.mixer is not None:
+            self.mixer.play(instrument_name, 0.8, semitones)
+        else:
+            # Bez miksera programowego dostepna jest tylko probka bazowa
+            SOUND_BANK.play(instrument_name, 0.8)
         
-        self.played_instruments.append({"timestamp": timestamp, "instrument": instrument_name})
-        print(f"Zagrano: {instrument_name} o {timestamp}")
-        self.save_to_csv(timestamp, instrument_name)
+        self.played_instruments.append({"timestamp": timestamp, "instrument": instrument_name, "note": note_name})
+        print(f"Zagrano: {instrument_name} ({note_name}) o {timestamp}")
+        self.save_to_csv(timestamp, instrument_name, note_name)
         
         if len(self.played_instruments) > 10:
             self.played_instruments.pop(0)
 
+    def note_layout(self, instrument_index):
+        """Uklad padow nut instrumentu: rzad kolek nad nim (pod nim, gdy brak miejsca)"""
+        layout = self.note_layouts.get(instrument_index)
+        if layout is None:
+            instrument = INSTRUMENTS[instrument_index]
+            (x, y), size = instrument["pos"], instrument["size"]
+            ref_w, ref_h = LAYOUT_SIZE
+            step = 2 * NOTE_PAD_RADIUS + NOTE_PAD_GAP
+            pad_y = y - size - NOTE_PAD_GAP - NOTE_PAD_RADIUS
+            if pad_y < NOTE_PAD_RADIUS:
+                pad_y = y + size + 30 + NOTE_PAD_RADIUS  # Pod podpisem instrumentu
+            first_x = x - step * (len(NOTES) - 1) / 2
+            # Caly rzad przesuniety tak, zeby mieścil sie w ekranie odniesienia
+            first_x = min(max(first_x, NOTE_PAD_RADIUS), ref_w - NOTE_PAD_RADIUS - step * (len(NOTES) - 1))
+            centers = [(first_x + i * step, pad_y) for i in range(len(NOTES))]
+            layout = Layout(centers, [NOTE_PAD_RADIUS] * len(NOTES), LAYOUT_SIZE)
+            self.note_layouts[instrument_index] = layout
+        return layout
+
+    def target_at(self, x, y, frame_width, frame_height, current=NO_INSTRUMENT):
+        """Cel pod punktem: instrument (0..n-1), pad nuty (n + numer nuty) lub -1.
+
+        current to aktualnie wskazywany cel - utrzymywany z histereza jak w query_hover.
+        """
+        count = len(INSTRUMENTS)
+        if self.note_instrument >= 0:
+            pads = self.note_layout(self.note_instrument).transform(frame_width, frame_height).hit_map
+            pad = pads.query_hover(x, y, current - count if current >= count else NO_INSTRUMENT)
+            if pad >= 0:
+                return count + pad
+        hit_map = self.layout.transform(frame_width, frame_height).hit_map
+        return hit_map.query_hover(x, y, current if current < count else NO_INSTRUMENT)
+
+    def activate_target(self, target):
+        """Gra cel z target_at(); instrument gra nute bazowa i otwiera swoje pady nut"""
+        count = len(INSTRUMENTS)
+        if target >= count:
+            self.activate_instrument(self.note_instrument, target - count)
+        elif target >= 0:
+            self.note_instrument = target
+            self.activate_instrument(target)
+
+
     def update_hover(self, x, y, frame_width, frame_height):
-        """Aktualizuje stan hover dla trybu reki"""
+        """Aktualizuje cel hover dla trybu reki (postep i aktywacja - w update())"""
         if self.control_mode != CONTROL_HAND:
             return
         
-        current_time = time.time()
-        hovered_instrument = -1
-        # Skaluj pozycje instrumentow do aktualnych wymiarow
-        original_bg_size = 1024
-        scale_x = frame_width / original_bg_size
-        scale_y = frame_height / original_bg_size
-        
-        for i, instrument in enumerate(INSTRUMENTS):
-            scaled_pos = (int(instrument["pos"][0] * scale_x), int(instrument["pos"][1] * scale_y))
-            dist = math.sqrt((x - scaled_pos[0])**2 + (y - scaled_pos[1])**2)
-            if dist <= instrument["size"]:  # Uzyj indywidualnego rozmiaru
-                hovered_instrument = i
-                break
+        current_time = clock.now()
+        # Histereza na krawedzi instrumentu (lub padu nuty)
+        hovered_instrument = self.target_at(x, y, frame_width, frame_height, self.hover_instrument)
         
         if hovered_instrument != self.hover_instrument:
             if hovered_instrument >= 0:
@@ -139,13 +219,16 @@ class PlaygroundMode:
                 self.hover_progress = 0.0
             else:
                 self.reset_hover_state()
-        
-        if self.hover_instrument >= 0:
-            hover_elapsed = current_time - self.hover_start_time
-            self.hover_progress = min(hover_elapsed / self.hover_duration_needed, 1.0)
-            if self.hover_progress >= 1.0:
-                self.activate_instrument(self.hover_instrument)
-                self.reset_hover_state()
+
+    def update(self):
+        """Krok logiki: postep hover i aktywacja po czasie hover_duration_needed"""
+        if self.control_mode != CONTROL_HAND or self.hover_instrument < 0:
+            return
+        hover_elapsed = clock.now() - self.hover_start_time
+        self.hover_progress = min(hover_elapsed / self.hover_duration_needed, 1.0)
+        if self.hover_progress >= 1.0:
+            self.activate_target(self.hover_instrument)
+            self.reset_hover_state()
 
     def reset_hover_state(self):
         """Resetuje stan hover"""
@@ -159,6 +242,9 @@ class PlaygroundMode:
             current_size = INSTRUMENTS[instrument_index]["size"]
             new_size = max(10, min(100, current_size + size_change))  # Ograniczenie 10-100 pikseli
             INSTRUMENTS[instrument_index]["size"] = new_size
+            self.layout.set_instrument(instrument_index, radius=new_size)
+            self.note_layouts.pop(instrument_index, None)
+            self.sprites.invalidate(instrument_index)
             
             # Ponownie skaluj obraz jeśli istnieje
             if INSTRUMENTS[instrument_index]["original_image"] is not None:
@@ -201,6 +287,9 @@ class PlaygroundMode:
                 
                 # Ponownie zaladuj obrazy z nowymi rozmiarami
                 self.load_images()
+                for i, instrument in enumerate(INSTRUMENTS):
+                    self.layout.set_instrument(i, instrument["pos"], instrument["size"])
+                self.note_layouts.clear()
                 print("Wczytano ustawienia instrumentow z instrument_settings.json")
         except Exception as e:
             print(f"Blad podczas wczytywania ustawien: {e}")
@@ -210,22 +299,14 @@ class PlaygroundMode:
         if self.control_mode != CONTROL_MOUSE:
             return
         
-        current_time = time.time()
+        current_time = clock.now()
         if current_time - self.last_touch_time < self.touch_cooldown:
             return
         
-        # Skaluj pozycje instrumentow do aktualnych wymiarow
-        original_bg_size = 1024
-        scale_x = frame_width / original_bg_size
-        scale_y = frame_height / original_bg_size
-        
-        for i, instrument in enumerate(INSTRUMENTS):
-            scaled_pos = (int(instrument["pos"][0] * scale_x), int(instrument["pos"][1] * scale_y))
-            dist = math.sqrt((x - scaled_pos[0])**2 + (y - scaled_pos[1])**2)
-            if dist <= instrument["size"]:  # Uzyj indywidualnego rozmiaru
-                self.activate_instrument(i)
-                self.last_touch_time = current_time
-                break
+        touched_instrument = self.target_at(x, y, frame_width, frame_height)
+        if touched_instrument >= 0:
+            self.activate_target(touched_instrument)
+            self.last_touch_time = current_time
 
     def is_point_in_game_area(self, x, y, frame_width, frame_height):
         """Sprawdza czy punkt znajduje sie w obszarze gry"""
@@ -235,19 +316,16 @@ class PlaygroundMode:
 
     def draw_instrument(self, frame, instrument, index, is_hovered=False):
         """Rysuje instrument na ramce"""
-        # Skaluj pozycje instrumentu do aktualnych wymiarow ramki
+        # Pozycja i promien przeliczone do aktualnych wymiarow ramki
         frame_h, frame_w = frame.shape[:2]
-        original_bg_size = 1024  # Oryginalny rozmiar tla
-        scale_x = frame_w / original_bg_size
-        scale_y = frame_h / original_bg_size
-        
-        pos = (int(instrument["pos"][0] * scale_x), int(instrument["pos"][1] * scale_y))
-        instrument_radius = instrument["size"]  # Uzyj indywidualnego rozmiaru
+        screen = self.layout.transform(frame_w, frame_h)
+        pos = screen.center(index)
+        instrument_radius = screen.radius(index)
         
         # Jeśli obraz jest dostepny, uzyj go
         if "image" in instrument and instrument["image"] is not None:
             img = instrument["image"]
-            h, w = img.shape[:2]
+            h = w = 2 * instrument_radius
             
             # Oblicz pozycje do wyrysowania (środek obrazu w pozycji instrumentu)
             x1 = pos[0] - w // 2
@@ -258,29 +336,10 @@ class PlaygroundMode:
             # Upewnij sie, ze wspolrzedne mieszcza sie w ramce
             frame_h, frame_w = frame.shape[:2]
             if x1 >= 0 and y1 >= 0 and x2 <= frame_w and y2 <= frame_h:
-                # Jeśli obraz ma kanal alfa, uzyj go do mieszania
-                if img.shape[2] == 4:
-                    # Rozdziel kanaly
-                    bgr = img[:, :, :3]
-                    alpha = img[:, :, 3] / 255.0
-                    
-                    # Jeśli instrument jest podświetlony, zwieksz jasnośc
-                    if is_hovered or self.hover_instrument == index:
-                        bgr = cv2.addWeighted(bgr, 1.2, bgr, 0, 30)
-                    
-                    # Mieszaj obraz z tlem uzywajac kanalu alfa
-                    for c in range(3):
-                        frame[y1:y2, x1:x2, c] = (
-                            alpha * bgr[:, :, c] + 
-                            (1 - alpha) * frame[y1:y2, x1:x2, c]
-                        )
-                else:
-                    # Jeśli nie ma kanalu alfa, po prostu skopiuj obraz
-                    if is_hovered or self.hover_instrument == index:
-                        img_bright = cv2.addWeighted(img, 1.2, img, 0, 30)
-                        frame[y1:y2, x1:x2] = img_bright
-                    else:
-                        frame[y1:y2, x1:x2] = img
+                # Podświetlony instrument ma osobny, rozjaśniony sprite
+                highlighted = is_hovered or self.hover_instrument == index
+                sprite = self.sprites.get(index, img, instrument_radius, highlighted)
+                sprite.blend(frame, x1, y1)
             
             # Dodaj efekt podświetlenia dla hover
             if is_hovered or self.hover_instrument == index:
@@ -295,9 +354,9 @@ class PlaygroundMode:
                                -90, 0, angle_end, (0, 255, 0), 3)
                     
                     progress_text = f"{int(self.hover_progress * 100)}%"
-                    text_size = cv2.getTextSize(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
+                    text_size = measure_text(progress_text, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
                     text_pos = (pos[0] - text_size[0] // 2, pos[1] + instrument_radius + 35)
-                    cv2.putText(frame, progress_text, text_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 2)
+                    put_text(frame, progress_text, text_pos, cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 2)
             
             # Dodaj ramke dla wybranego instrumentu
             if self.selected_instrument == index:
@@ -320,77 +379,74 @@ class PlaygroundMode:
         text = instrument["name"]
         if self.selected_instrument == index:
             text += f" (rozmiar: {instrument['size']})"
-        text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
+        text_size = measure_text(text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)[0]
         text_x = pos[0] - text_size[0] // 2
         text_y = pos[1] + instrument_radius + 20
         
-        # Tlo dla tekstu z przezroczystościa
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (text_x - 5, text_y - 15), (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0), -1)
-        frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
+        # Tlo dla tekstu z przezroczystościa - rysowane razem z innymi przy flush()
+        self.overlay.rectangle((text_x - 5, text_y - 15), (text_x + text_size[0] + 5, text_y + 5), (0, 0, 0),
+                               opacity=0.3)
         
         # Tekst
         text_color = (255, 255, 100) if (is_hovered or self.hover_instrument == index) else (255, 255, 255)
-        cv2.putText(frame, text, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, text_color, 1)
+        self.overlay.text(text, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, text_color, 1)
 
-def run_playground(control_mode):
-    # Inicjalizacja MediaPipe (tylko dla trybu reki)
-    mp_hands = None
-    hands = None
-    if control_mode == CONTROL_HAND:
-        mp_hands = mp.solutions.hands
-        hands = mp_hands.Hands(
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.7,
-            max_num_hands=1
-        )
-
-    # Inicjalizacja kamery i gry
-    playground = PlaygroundMode(control_mode)
-    cap = cv2.VideoCapture(0)
-    cv2.namedWindow('Tryb Wlasna Melodia', cv2.WINDOW_NORMAL)
-
-    # Zmienne dla myszy
-    mouse_x, mouse_y = 0, 0
-    mouse_clicked = False
+    def draw_note_pads(self, frame, hovered=NO_INSTRUMENT):
+        """Rysuje pady nut ostatnio zagranego instrumentu"""
+        if self.note_instrument < 0:
+            return
+        frame_h, frame_w = frame.shape[:2]
+        screen = self.note_layout(self.note_instrument).transform(frame_w, frame_h)
+        color = INSTRUMENTS[self.note_instrument]["color"]
+        count = len(INSTRUMENTS)
+        for i, (note_name, _) in enumerate(NOTES):
+            pos = screen.center(i)
+            radius = screen.radius(i)
+            target = count + i
+            active = hovered == target or self.hover_instrument == target
+            cv2.circle(frame, pos, radius, color, -1)
+            cv2.circle(frame, pos, radius, (255, 255, 100) if active else (255, 255, 255), 3 if active else 1)
+            if self.control_mode == CONTROL_HAND and self.hover_instrument == target and self.hover_progress > 0:
+                angle_end = int(360 * self.hover_progress)
+                cv2.ellipse(frame, pos, (radius + 6, radius + 6), -90, 0, angle_end, (0, 255, 0), 2)
+            text_size = measure_text(note_name, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)[0]
+            put_text(frame, note_name, (pos[0] - text_size[0] // 2, pos[1] + text_size[1] // 2),
+                     cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 0, 0), 1)
+
+def run_playground(control_mode, tracker_settings=None, cursor_settings=None, input_settings=None,
+                   render_settings=None, loop_settings=None, mixer_settings=None, csv_file=CSV_FILE):
+    # Wyjście obrazu: okno albo bez ekranu (benchmark, hashe klatek, plik wideo)
+    sink = open_render_sink('Tryb Wlasna Melodia', render_settings)
+
+    # Zrodlo wejścia: kamera ze śledzeniem dloni, mysz, wideo lub nagrana sesja
+    source = open_input_source(control_mode, sink.window_name,
+                               input_settings, tracker_settings, cursor_settings)
+    control_mode = source.control_mode
+    # Odtworzona sesja nie dopisuje tych samych nut drugi raz do logu gracza
+    if input_settings and input_settings.get("replay") and csv_file == CSV_FILE:
+        csv_file = None
+
+    # Inicjalizacja gry
+    # Szybkie powtorzenia instrumentu miksowane z limitem glosow zamiast urywania
+    mixer = SoftwareMixer(mixer_settings).start()
+    playground = PlaygroundMode(control_mode, mixer, csv_file)
+    background = BackgroundCache(playground.background)
+    # Tempo rysowania ograniczone do docelowego FPS (bez petli na 100% CPU)
+    loop = FrameLoop(loop_settings)
+    # Na slabym komputerze jakośc spada stopniowo, zamiast tracic plynnośc
+    governor = QualityGovernor(loop.frame_time, {"enabled": loop.adaptive_quality})
     mouse_hover = -1
 
-    def mouse_callback(event, x, y, flags, param):
-        nonlocal mouse_x, mouse_y, mouse_clicked, mouse_hover
-        mouse_x, mouse_y = x, y
-        if event == cv2.EVENT_LBUTTONDOWN:
-            mouse_clicked = True
-        
-        # Sprawdz ktory instrument jest pod myszka
-        mouse_hover = -1
-        # Uzyj stalych wymiarow dla skalowania pozycji
-        frame_w, frame_h = 800, 600  # Domyślne wymiary
-        if playground.background is not None:
-            bg_h, bg_w = playground.background.shape[:2]
-            scale = min(800/bg_w, 600/bg_h)
-            frame_w = int(bg_w * scale)
-            frame_h = int(bg_h * scale)
-        
-        original_bg_size = 1024
-        scale_x = frame_w / original_bg_size
-        scale_y = frame_h / original_bg_size
-        
-        for i, instrument in enumerate(INSTRUMENTS):
-            scaled_pos = (int(instrument["pos"][0] * scale_x), int(instrument["pos"][1] * scale_y))
-            dist = math.sqrt((x - scaled_pos[0])**2 + (y - scaled_pos[1])**2)
-            if dist <= instrument["size"]:  # Uzyj indywidualnego rozmiaru
-                mouse_hover = i
-                break
-
-    if control_mode == CONTROL_MOUSE:
-        cv2.setMouseCallback('Tryb Wlasna Melodia', mouse_callback)
-
     print("🎵 Tryb Wlasna Melodia 🎵")
-    print(f"Graj dowolne melodie na instrumentach! Sekwencja zapisywana do {CSV_FILE}")
+    if csv_file is not None:
+        print(f"Graj dowolne melodie na instrumentach! Sekwencja zapisywana do {csv_file}")
+    else:
+        print("Graj dowolne melodie na instrumentach! (sekwencja nie jest zapisywana)")
     if control_mode == CONTROL_HAND:
         print("Trzymaj palec wskazujacy prawej reki nad instrumentem przez 1 sekunde.")
     else:
         print("Uzyj myszy do klikania na instrumenty.")
+    print(f"Po zagraniu instrumentu nad nim pojawiaja sie pady nut: {', '.join(name for name, _ in NOTES)}.")
     print("\nSterowanie rozmiarem instrumentow:")
     print("- Klawisze 1-7: wybierz instrument do edycji")
     print("- Klawisz +/=: zwieksz rozmiar wybranego instrumentu")
@@ -400,42 +456,25 @@ def run_playground(control_mode):
     print("Naciśnij ESC aby zakonczyc.")
 
     while True:
-        # Uzyj tylko tla - ukryj kamere calkowicie
-        if playground.background is not None:
-            # Uzyj oryginalnego rozmiaru tla lub skaluj do odpowiednich proporcji
-            bg_h, bg_w = playground.background.shape[:2]
-            # Skaluj tlo do rozmiaru okna zachowujac proporcje
-            scale = min(800/bg_w, 600/bg_h)  # Maksymalne wymiary okna
-            new_w = int(bg_w * scale)
-            new_h = int(bg_h * scale)
-            frame = cv2.resize(playground.background, (new_w, new_h))
-            h, w, _ = frame.shape
-        else:
-            # Domyślne ciemne tlo z gradientem
-            h, w = 600, 800
-            frame = np.zeros((h, w, 3), dtype=np.uint8)
-            gradient = np.linspace(40, 80, h).astype(np.uint8)
-            for i in range(h):
-                frame[i, :] = [gradient[i], gradient[i] * 0.8, gradient[i] * 0.6]
-
-        cursor_x, cursor_y = None, None
-        if control_mode == CONTROL_HAND:
-            # Pobierz obraz z kamery do analizy rak
-            ret_cam, camera_frame = cap.read()
-            if ret_cam:
-                camera_frame = cv2.flip(camera_frame, 1)
-                camera_frame = cv2.resize(camera_frame, (w, h))
-                rgb = cv2.cvtColor(camera_frame, cv2.COLOR_BGR2RGB)
-                results = hands.process(rgb)
-                if results.multi_hand_landmarks and results.multi_handedness:
-                    for hand_landmarks, handedness in zip(results.multi_hand_landmarks, results.multi_handedness):
-                        if handedness.classification[0].label == 'Right':
-                            finger_tip = hand_landmarks.landmark[8]
-                            cursor_x = int(finger_tip.x * w)
-                            cursor_y = int(finger_tip.y * h)
-                            break
-        elif control_mode == CONTROL_MOUSE:
-            cursor_x, cursor_y = mouse_x, mouse_y
+        # Kamera nie jest wyświetlana - tylko przesuwamy zrodlo wejścia
+        if not source.advance():
+            print("Blad: Zrodlo wejścia zakonczylo dzialanie")
+            break
+        # Liczba krokow logiki (postep hover) w tej klatce - wykonywane po odczycie kursora
+        ticks = loop.begin_frame()
+
+        # Uzyj tylko tla - ukryj kamere calkowicie. Tlo jest skalowane tylko po zmianie
+        # rozmiaru okna, a klatka to ciagle ten sam bufor
+        window_w, window_h = background.frame_size(sink.window_size())
+        scale = playground.render_scale
+        frame = background.get((max(1, int(window_w * scale)), max(1, int(window_h * scale))))
+        h, w, _ = frame.shape
+
+        # Wspolrzedne z detekcji sa znormalizowane - zrodlo skaluje je do rozmiaru okna
+        cursor_x, cursor_y, mouse_clicked = source.poll(w, h)
+        if control_mode == CONTROL_MOUSE:
+            # Sprawdz ktory instrument jest pod myszka
+            mouse_hover = playground.target_at(cursor_x, cursor_y, w, h)
             if not playground.is_point_in_game_area(cursor_x, cursor_y, w, h):
                 cursor_x, cursor_y = None, None
 
@@ -444,14 +483,20 @@ def run_playground(control_mode):
             playground.update_hover(cursor_x, cursor_y, w, h)
         elif control_mode == CONTROL_MOUSE and mouse_clicked and cursor_x is not None and cursor_y is not None:
             playground.check_touch(cursor_x, cursor_y, w, h)
-            mouse_clicked = False
         elif control_mode == CONTROL_HAND and cursor_x is None:
             playground.reset_hover_state()
 
+        # Postep hover i aktywacja (stala liczba krokow na sekunde)
+        for _ in range(ticks):
+            playground.update()
+
         # Rysuj instrumenty
         for i, instrument in enumerate(INSTRUMENTS):
             is_hovered = (control_mode == CONTROL_MOUSE and mouse_hover == i)
             playground.draw_instrument(frame, instrument, i, is_hovered)
+        playground.draw_note_pads(frame, mouse_hover if control_mode == CONTROL_MOUSE else NO_INSTRUMENT)
+        overlay = playground.overlay
+        overlay.flush(frame)
 
         # Rysuj kursor
         if cursor_x is not None and cursor_y is not None:
@@ -464,16 +509,13 @@ def run_playground(control_mode):
 
         # Rysuj informacje o trybie
         info_text = "Tryb Wlasna Melodia - graj swobodnie!"
-        text_size = cv2.getTextSize(info_text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (10, 5), (text_size[0] + 20, 40), (0, 0, 0), -1)
-        frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
-        cv2.putText(frame, info_text, (15, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 255, 100), 2)
+        text_size = measure_text(info_text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+        overlay.rectangle((10, 5), (text_size[0] + 20, 40), (0, 0, 0), opacity=0.3)
+        overlay.text(info_text, (15, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 255, 100), 2)
 
         control_text = f"Tryb: {'Reka (1s hover)' if control_mode == CONTROL_HAND else 'Mysz (klik)'}"
-        cv2.rectangle(overlay, (w - 170, 5), (w - 10, 40), (0, 0, 0), -1)
-        frame = cv2.addWeighted(frame, 0.7, overlay, 0.3, 0)
-        cv2.putText(frame, control_text, (w - 165, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
+        overlay.rectangle((w - 170, 5), (w - 10, 40), (0, 0, 0), opacity=0.3)
+        overlay.text(control_text, (w - 165, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1)
 
         # Dodaj instrukcje sterowania
         instructions = [
@@ -481,17 +523,24 @@ def run_playground(control_mode):
         
         start_y = 50
         for i, instruction in enumerate(instructions):
-            text_size = cv2.getTextSize(instruction, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (5, start_y + i * 20), (text_size[0] + 15, start_y + i * 20 + 18), (0, 0, 0), -1)
-            frame = cv2.addWeighted(frame, 0.8, overlay, 0.2, 0)
-            cv2.putText(frame, instruction, (10, start_y + i * 20 + 12), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+            text_size = measure_text(instruction, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 1)[0]
+            overlay.rectangle((5, start_y + i * 20), (text_size[0] + 15, start_y + i * 20 + 18), (0, 0, 0),
+                              opacity=0.2)
+            overlay.text(instruction, (10, start_y + i * 20 + 12), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+        overlay.flush(frame)
+        put_text(frame, governor.stat_text(), (10, h - 12), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
 
         # Wyświetl klatke
-        cv2.imshow('Tryb Wlasna Melodia', frame)
+        key = sink.show(frame, loop.idle_time())
+        loop.end_frame()
+        if governor.frame_done(loop.work_time):
+            quality = governor.quality
+            source.set_quality(quality)
+            overlay.translucent = quality["translucent"]
+            playground.render_scale = quality["render_scale"]
 
         # Sprawdz wyjście i obsluz klawiature
-        key = cv2.waitKey(1) & 0xFF
+        key = source.poll_key(key)
         if key == 27:  # ESC
             break
         elif key == ord('1'):  # Wybierz instrument 1
@@ -519,16 +568,20 @@ def run_playground(control_mode):
         elif key == ord('s') or key == ord('S'):  # Zapisz ustawienia
             playground.save_instrument_settings()
         
-        if cv2.getWindowProperty('Tryb Wlasna Melodia', cv2.WND_PROP_VISIBLE) < 1:
+        if not sink.is_open():
             break
 
     # Cleanup
-    cap.release()
-    cv2.destroyAllWindows()
-    if hands:
-        hands.close()
+    print(source.stats_text())
+    print(sink.stats_text())
+    print(loop.stats_text())
+    print(mixer.stats_text())
+    mixer.stop()
+    source.release()
+    sink.close()
     print("Dziekuje za gre w trybie Wlasna Melodia! 🎵")
-    print(f"Sekwencja zapisana w {CSV_FILE}")
+    if csv_file is not None:
+        print(f"Sekwencja zapisana w {csv_file}")
 
 if __name__ == "__main__":
     run_playground(CONTROL_MOUSE)
@@ -0,0 +1,178 @@
+import hashlib
+import time
+
+import cv2
+
+from buffers import frame_pool
+
+# Kod zwracany przez cv2.waitKey (& 0xFF), gdy nie wciśnieto klawisza
+NO_KEY = 255
+
+SINK_WINDOW = "window"
+SINK_NULL = "null"
+SINK_HASH = "hash"
+SINK_VIDEO = "video"
+
+# Domyślne ustawienia wyjścia obrazu
+RENDER_SETTINGS = {
+    "sink": SINK_WINDOW,  # "window", "null", "hash" lub "video"
+    "output": None,       # Plik z hashami klatek (hash) lub plik wideo (video)
+    "fps": 30,            # Liczba klatek na sekunde zapisywanego wideo
+}
+
+
+class RenderSink:
+    """Wspolna czesc wyjśc obrazu - liczy klatki i czas od pierwszej klatki"""
+
+    window_name = None
+    interactive = False  # Czy jest okno, w ktorym mozna klikac i pisac
+
+    def __init__(self):
+        self.frames = 0
+        self.start_time = None
+
+    def show(self, frame, idle=0.0):
+        """Przekazuje gotowa klatke i zwraca wciśniety klawisz (NO_KEY jeśli zaden).
+
+        idle to czas (w sekundach) do nastepnej klatki, ktory wyjście moze
+        przespac - okno czeka w tym czasie na klawisze.
+        """
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        self.frames += 1
+        self.consume(frame)
+        return self.wait(idle)
+
+    def consume(self, frame):
+        pass
+
+    def wait(self, idle):
+        if idle > 0:
+            time.sleep(idle)
+        return NO_KEY
+
+    def is_open(self):
+        return True
+
+    def window_size(self):
+        """Rozmiar obszaru obrazu okna (szerokośc, wysokośc) lub None bez okna"""
+        return None
+
+    def fps(self):
+        if self.start_time is None or self.frames < 2:
+            return 0.0
+        elapsed = time.perf_counter() - self.start_time
+        return (self.frames - 1) / elapsed if elapsed > 0 else 0.0
+
+    def stats_text(self):
+        return f"Wyjście obrazu: {self.frames} klatek, {self.fps():.1f} FPS"
+
+    def close(self):
+        pass
+
+
+class WindowSink(RenderSink):
+    """Wyświetla klatki w oknie OpenCV (cv2.imshow + cv2.waitKey)"""
+
+    interactive = True
+
+    def __init__(self, window_name):
+        super().__init__()
+        self.window_name = window_name
+        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+
+    def consume(self, frame):
+        cv2.imshow(self.window_name, frame)
+
+    def wait(self, idle):
+        # cv2.waitKey obsluguje zdarzenia okna i jednocześnie usypia petle
+        return cv2.waitKey(max(1, int(idle * 1000))) & 0xFF
+
+    def is_open(self):
+        return cv2.getWindowProperty(self.window_name, cv2.WND_PROP_VISIBLE) >= 1
+
+    def window_size(self):
+        _, _, width, height = cv2.getWindowImageRect(self.window_name)
+        if width <= 0 or height <= 0:
+            return None
+        return width, height
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class NullSink(RenderSink):
+    """Odrzuca klatki - do pomiaru czystej wydajności rysowania bez ekranu"""
+
+
+class HashSink(RenderSink):
+    """Liczy SHA-1 kazdej klatki, np. do porownania z wzorcowym nagraniem"""
+
+    def __init__(self, output=None):
+        super().__init__()
+        self.output = output
+        self.digests = []
+        self._combined = hashlib.sha1()
+
+    def consume(self, frame):
+        digest = hashlib.sha1(frame.tobytes()).hexdigest()
+        self.digests.append(digest)
+        self._combined.update(digest.encode("ascii"))
+
+    def combined_digest(self):
+        """Jeden hash calej sesji - wygodny do szybkiego porownania"""
+        return self._combined.hexdigest()
+
+    def stats_text(self):
+        return super().stats_text() + f" | hash sesji: {self.combined_digest()}"
+
+    def close(self):
+        if self.output:
+            with open(self.output, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.digests) + "\n")
+
+
+class VideoWriterSink(RenderSink):
+    """Zapisuje klatki do pliku wideo"""
+
+    def __init__(self, output, fps=30):
+        super().__init__()
+        if not output:
+            raise ValueError("Wyjście wideo wymaga podania pliku (output)")
+        self.output = output
+        self.video_fps = fps
+        self.writer = None
+        self.size = None
+
+    def consume(self, frame):
+        h, w = frame.shape[:2]
+        if self.writer is None:
+            self.size = (w, h)
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            self.writer = cv2.VideoWriter(self.output, fourcc, self.video_fps, self.size)
+        elif (w, h) != self.size:
+            # Rozmiar klatki moze sie zmienic (skala rysowania) - plik ma stały rozmiar
+            frame = cv2.resize(frame, self.size, dst=frame_pool().get("video_out", (self.size[1], self.size[0], 3)))
+        self.writer.write(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+
+
+def open_render_sink(window_name, render_settings=None):
+    """Tworzy wyjście obrazu na podstawie ustawien"""
+    options = dict(RENDER_SETTINGS)
+    if render_settings:
+        options.update(render_settings)
+
+    sink = options["sink"]
+    if sink == SINK_WINDOW:
+        return WindowSink(window_name)
+    if sink == SINK_NULL:
+        return NullSink()
+    if sink == SINK_HASH:
+        return HashSink(options["output"])
+    if sink == SINK_VIDEO:
+        return VideoWriterSink(options["output"], options["fps"])
+    raise ValueError(f"Nieznane wyjście obrazu: {sink}")
@@ -0,0 +1,131 @@
+import cv2
+import numpy as np
+
+from text_cache import put_text
+
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_SCALE = 0.5
+
+
+class StaticScene:
+    """Statyczna warstwa planszy: tlo, instrumenty w spoczynku i ich podpisy.
+
+    Warstwa jest rysowana raz dla danego rozmiaru okna (i ramki obszaru gry),
+    a w kazdej klatce kopiowana do bufora jednym np.copyto. Na nia rysuje sie
+    juz tylko elementy zmienne: podświetlenie, pierścien hover, kursor i HUD.
+    Pozycje i promienie pochodza z ukladu (Layout) przeliczonego do rozmiaru
+    klatki, wiec zmiana ukladu jest wykrywana po jego wersji.
+    """
+
+    def __init__(self, instruments, layout, background=(20, 20, 20)):
+        self.instruments = instruments
+        self.layout = layout
+        self.background = background
+        self.layer = None
+        self.buffer = None
+        self.key = None
+        self.labels = []
+        self.renders = 0
+
+    def _measure_labels(self, transform):
+        """Pozycje podpisow liczymy raz na uklad - cv2.getTextSize nie musi działac co klatke"""
+        self.labels = []
+        for i, instrument in enumerate(self.instruments):
+            pos = transform.center(i)
+            text_size = cv2.getTextSize(instrument["name"], LABEL_FONT, LABEL_SCALE, 1)[0]
+            text_x = pos[0] - text_size[0] // 2
+            text_y = pos[1] + transform.radius(i) + 20
+            box = ((text_x - 5, text_y - 15), (text_x + text_size[0] + 5, text_y + 5))
+            self.labels.append(((text_x, text_y), box))
+
+    def invalidate(self):
+        self.layer = None
+        self.key = None
+
+    def draw_label(self, frame, index):
+        """Podpis instrumentu z czarnym tlem (np. ponownie, nad podświetleniem)"""
+        text_pos, box = self.labels[index]
+        cv2.rectangle(frame, box[0], box[1], (0, 0, 0), -1)
+        put_text(frame, self.instruments[index]["name"], text_pos, LABEL_FONT, LABEL_SCALE, (255, 255, 255), 1)
+
+    def _render(self, width, height, game_area_margin):
+        transform = self.layout.transform(width, height)
+        self._measure_labels(transform)
+        layer = np.empty((height, width, 3), dtype=np.uint8)
+        layer[:] = self.background
+        for i, instrument in enumerate(self.instruments):
+            pos = transform.center(i)
+            radius = transform.radius(i)
+            cv2.circle(layer, pos, radius, instrument["color"], -1)
+            cv2.circle(layer, pos, radius, (255, 255, 255), 2)
+            self.draw_label(layer, i)
+        # Granice obszaru gry (tryb myszy)
+        if game_area_margin is not None:
+            m = game_area_margin
+            cv2.rectangle(layer, (m, m), (width - m, height - m), (100, 100, 100), 2)
+        self.layer = layer
+        self.renders += 1
+
+    def draw(self, frame, game_area_margin=None):
+        """Kopiuje warstwe statyczna do klatki (przebudowa tylko po zmianie rozmiaru lub ukladu)"""
+        height, width = frame.shape[:2]
+        key = (width, height, game_area_margin, self.layout.version)
+        if key != self.key:
+            self._render(width, height, game_area_margin)
+            self.key = key
+        np.copyto(frame, self.layer)
+        return frame
+
+    def frame(self, width, height, game_area_margin=None):
+        """Jak draw(), ale do wlasnego bufora sceny o podanym rozmiarze
+        (klatka kamery nie jest wyświetlana, wiec nie musi miec jej rozmiaru)"""
+        if self.buffer is None or self.buffer.shape[:2] != (height, width):
+            self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        return self.draw(self.buffer, game_area_margin)
+
+
+class BackgroundCache:
+    """Tlo trybu playground przygotowane raz dla danego rozmiaru okna.
+
+    Obraz tla jest skalowany (z zachowaniem proporcji) albo, gdy go brak,
+    generowany jest gradient - tylko przy pierwszym uzyciu i po zmianie
+    rozmiaru okna. W kazdej klatce tlo trafia jedna kopia do tego samego,
+    wcześniej zaalokowanego bufora.
+    """
+
+    def __init__(self, image=None, default_size=(800, 600)):
+        self.image = image
+        self.default_size = default_size
+        self.size = None
+        self.layer = None
+        self.buffer = None
+        self.rebuilds = 0
+
+    def frame_size(self, window_size=None):
+        """Rozmiar klatki (szerokośc, wysokośc) dla okna o podanym rozmiarze"""
+        max_w, max_h = window_size or self.default_size
+        if self.image is None:
+            return max_w, max_h
+        bg_h, bg_w = self.image.shape[:2]
+        scale = min(max_w / bg_w, max_h / bg_h)
+        return max(1, int(bg_w * scale)), max(1, int(bg_h * scale))
+
+    def _rebuild(self, width, height):
+        if self.image is not None:
+            self.layer = cv2.resize(self.image, (width, height))
+        else:
+            # Domyślne ciemne tlo z gradientem (jaśniejsze ku dolowi, kanaly B : G : R = 1 : 0.8 : 0.6)
+            gradient = np.linspace(40, 80, height).astype(np.uint8)
+            colors = np.stack([gradient, gradient * 0.8, gradient * 0.6], axis=1).astype(np.uint8)
+            self.layer = np.ascontiguousarray(np.broadcast_to(colors[:, None, :], (height, width, 3)))
+        self.buffer = np.empty_like(self.layer)
+        self.size = (width, height)
+        self.rebuilds += 1
+
+    def get(self, window_size=None):
+        """Zwraca bufor klatki wypelniony tlem (ten sam obiekt w kolejnych klatkach)"""
+        size = self.frame_size(window_size)
+        if size != self.size:
+            self._rebuild(*size)
+        np.copyto(self.buffer, self.layer)
+        return self.buffer
@@ -0,0 +1,44 @@
+import heapq
+
+import clock
+
+
+class PlaybackScheduler:
+    """Zdarzenia zaplanowane na konkretny czas gry (dzwiek, podświetlenie, zmiana stanu).
+
+    Nic tu nie czeka: update() wywolywany z kroku logiki wykonuje tylko te
+    zdarzenia, ktorych czas juz minal, w kolejności czasu (a przy rownym
+    czasie - dodania). Petla gry, kamera i rysowanie dzialaja wiec bez
+    przerwy, niezaleznie od dlugości odtwarzanej sekwencji. Czas pochodzi
+    z clock, wiec przy zegarze wirtualnym odtwarzanie jest powtarzalne.
+    """
+
+    def __init__(self):
+        self.events = []  # Kopiec (czas, numer, funkcja, argumenty)
+        self.counter = 0
+
+    def schedule(self, at, callback, *args):
+        """Planuje callback(*args) na czas gry at"""
+        heapq.heappush(self.events, (at, self.counter, callback, args))
+        self.counter += 1
+
+    def schedule_in(self, delay, callback, *args):
+        """Planuje callback(*args) za delay sekund od teraz"""
+        self.schedule(clock.now() + delay, callback, *args)
+
+    def update(self, now=None):
+        """Wykonuje wszystkie zaległe zdarzenia; zwraca ich liczbe"""
+        if now is None:
+            now = clock.now()
+        done = 0
+        while self.events and self.events[0][0] <= now:
+            _, _, callback, args = heapq.heappop(self.events)
+            callback(*args)
+            done += 1
+        return done
+
+    def clear(self):
+        self.events.clear()
+
+    def pending(self):
+        return len(self.events)
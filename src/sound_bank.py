@@ -0,0 +1,96 @@
+import hashlib
+import os
+
+import pygame
+
+SOUND_DIR = "sound"
+# Zdekodowane probki PCM (nie trafiaja do repozytorium - patrz .gitignore)
+CACHE_DIR = ".sound_cache"
+
+
+class SoundBank:
+    """Probki dzwiekow wspolne dla wszystkich trybow gry, ladowane przy pierwszym uzyciu.
+
+    Kazdy plik jest dekodowany najwyzej raz na proces, a obiekty
+    pygame.mixer.Sound sa wspoldzielone przez tryby. Zdekodowane PCM trafia
+    do CACHE_DIR pod kluczem (hash pliku, format miksera), wiec kolejne
+    uruchomienia w ogole nie dekoduja MP3 - zmiana pliku albo formatu
+    miksera daje po prostu nowy klucz.
+    """
+
+    def __init__(self, sound_dir=SOUND_DIR, cache_dir=CACHE_DIR):
+        self.sound_dir = sound_dir
+        self.cache_dir = cache_dir
+        self.sounds = {}  # Nazwa -> Sound lub None (brak pliku / blad, zgloszony raz)
+        self.decoded = 0
+        self.cache_hits = 0
+
+    def _ensure_mixer(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        return pygame.mixer.get_init()
+
+    def path(self, name):
+        return os.path.join(self.sound_dir, f"{name.lower()}.mp3")
+
+    def _cache_path(self, path, mixer_format):
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        frequency, size, channels = mixer_format
+        return os.path.join(self.cache_dir, f"{digest}_{frequency}_{size}_{channels}.pcm")
+
+    def _load(self, path):
+        cache_path = self._cache_path(path, self._ensure_mixer())
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                sound = pygame.mixer.Sound(buffer=f.read())
+            self.cache_hits += 1
+            return sound
+
+        sound = pygame.mixer.Sound(path)
+        self.decoded += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Zapis przez plik tymczasowy - przerwany zapis nie zostawi uszkodzonej probki
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(sound.get_raw())
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Nie mozna zapisac dzwieku w pamieci podrecznej {cache_path}: {e}")
+        return sound
+
+    def get(self, name):
+        """Sound dla instrumentu o podanej nazwie albo None, gdy nie da sie go zaladowac"""
+        if name in self.sounds:
+            return self.sounds[name]
+        path = self.path(name)
+        try:
+            sound = self._load(path)
+        except (OSError, pygame.error) as e:
+            print(f"Nie mozna zaladowac dzwieku dla {name.lower()}: {e}")
+            sound = None
+        self.sounds[name] = sound
+        return sound
+
+    def play(self, name, volume=None):
+        """Odtwarza probke (jeśli jest); zwraca kanal pygame albo None"""
+        sound = self.get(name)
+        if sound is None:
+            return None
+        if volume is not None:
+            sound.set_volume(volume)
+        return sound.play()
+
+    def length(self, name):
+        """Dlugośc probki w sekundach (0.0, gdy jej brak)"""
+        sound = self.get(name)
+        return sound.get_length() if sound is not None else 0.0
+
+    def stats_text(self):
+        return (f"Dzwieki: {len(self.sounds)} zaladowanych, {self.decoded} zdekodowanych, "
+                f"{self.cache_hits} z pamieci podrecznej")
+
+
+# Jeden bank na proces - tryby gry dziela zaladowane probki
+SOUND_BANK = SoundBank()
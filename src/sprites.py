@@ -0,0 +1,69 @@
+import cv2
+import numpy as np
+
+
+def brighten(bgr):
+    """Rozjaśnienie obrazu dla podświetlonego instrumentu"""
+    return cv2.addWeighted(bgr, 1.2, bgr, 0, 30)
+
+
+class Sprite:
+    """Obraz przygotowany do nakladania: BGR pomnozone przez alfe i odwrotna maska alfa.
+
+    Nalozenie to wtedy tylko roi * (255 - alfa) / 255 + bgr_pomnozone, dwie
+    operacje na uint8 bez konwersji do float i bez petli po kanalach.
+    """
+
+    def __init__(self, image, highlighted=False):
+        bgr = image[:, :, :3]
+        if highlighted:
+            bgr = brighten(bgr)
+        self.height, self.width = image.shape[:2]
+        if image.shape[2] == 4:
+            alpha = cv2.merge([image[:, :, 3]] * 3)
+            self.premultiplied = cv2.multiply(bgr, alpha, scale=1.0 / 255)
+            self.inverse_alpha = cv2.bitwise_not(alpha)
+        else:
+            self.premultiplied = np.ascontiguousarray(bgr)
+            self.inverse_alpha = None  # Obraz bez przezroczystości - zwykla kopia
+
+    def blend(self, frame, x1, y1):
+        """Naklada sprite w miejscu na klatke, lewy gorny rog w (x1, y1)"""
+        roi = frame[y1:y1 + self.height, x1:x1 + self.width]
+        if self.inverse_alpha is None:
+            np.copyto(roi, self.premultiplied)
+            return
+        cv2.multiply(roi, self.inverse_alpha, dst=roi, scale=1.0 / 255)
+        cv2.add(roi, self.premultiplied, dst=roi)
+
+
+class SpriteCache:
+    """Sprite'y instrumentow wg (indeks, rozmiar, podświetlenie), przygotowywane raz.
+
+    Obraz jest skalowany do 2 * size, gdy ma inny rozmiar - np. przy
+    zmniejszonej skali rysowania z QualityGovernor.
+    """
+
+    def __init__(self):
+        self.sprites = {}
+        self.builds = 0
+
+    def get(self, index, image, size, highlighted=False):
+        key = (index, size, highlighted)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            side = 2 * size
+            if image.shape[0] != side or image.shape[1] != side:
+                image = cv2.resize(image, (side, side), interpolation=cv2.INTER_AREA)
+            sprite = Sprite(image, highlighted)
+            self.sprites[key] = sprite
+            self.builds += 1
+        return sprite
+
+    def invalidate(self, index=None):
+        """Usuwa sprite'y instrumentu (np. po zmianie rozmiaru) lub wszystkie"""
+        if index is None:
+            self.sprites.clear()
+            return
+        for key in [key for key in self.sprites if key[0] == index]:
+            del self.sprites[key]
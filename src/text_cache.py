@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class TextCache:
+    """Napisy renderowane raz do malej bitmapy z maska i potem tylko stemplowane.
+
+    Kluczem jest (tekst, czcionka, skala, grubośc, kolor). Bitmapa powstaje
+    przez cv2.putText (bez wygladzania), wiec wynik jest taki sam jak przy
+    rysowaniu wprost na klatce. Najdawniej uzywane wpisy sa usuwane po
+    przekroczeniu max_entries.
+    """
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def measure_text(self, text, font_face, font_scale, thickness=1):
+        """Jak cv2.getTextSize, ale mierzy kazdy napis tylko raz"""
+        key = (text, font_face, font_scale, thickness)
+        size = self.sizes.get(key)
+        if size is None:
+            if len(self.sizes) >= self.max_entries:
+                self.sizes.clear()
+            size = cv2.getTextSize(text, font_face, font_scale, thickness)
+            self.sizes[key] = size
+        return size
+
+    def _render(self, text, font_face, font_scale, color, thickness):
+        (text_w, text_h), baseline = self.measure_text(text, font_face, font_scale, thickness)
+        pad = thickness + 1
+        mask = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad), dtype=np.uint8)
+        origin = (pad, text_h + pad)
+        cv2.putText(mask, text, origin, font_face, font_scale, 255, thickness)
+        bitmap = np.empty(mask.shape + (3,), dtype=np.uint8)
+        bitmap[:] = color
+        # Przesuniecie lewego gornego rogu bitmapy wzgledem punktu bazowego tekstu
+        return bitmap, mask > 0, (-origin[0], -origin[1])
+
+    def put_text(self, frame, text, org, font_face, font_scale, color, thickness=1):
+        """Jak cv2.putText - org to lewy koniec linii bazowej napisu"""
+        key = (text, font_face, font_scale, thickness, tuple(color))
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._render(text, font_face, font_scale, color, thickness)
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        bitmap, mask, (dx, dy) = entry
+        x, y = org[0] + dx, org[1] + dy
+        frame_h, frame_w = frame.shape[:2]
+        h, w = mask.shape
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(frame_w, x + w), min(frame_h, y + h)
+        if x2 <= x1 or y2 <= y1:
+            return frame
+        roi = frame[y1:y2, x1:x2]
+        sub = (slice(y1 - y, y2 - y), slice(x1 - x, x2 - x))
+        np.copyto(roi, bitmap[sub], where=mask[sub][:, :, None])
+        return frame
+
+    def stats_text(self):
+        total = self.hits + self.misses
+        rate = 100.0 * self.hits / total if total else 0.0
+        return f"Napisy: {len(self.entries)} w pamieci, trafienia {rate:.1f}%"
+
+
+# Wspolna pamiec napisow dla wszystkich trybow gry
+TEXT_CACHE = TextCache()
+
+
+def put_text(frame, text, org, font_face, font_scale, color, thickness=1):
+    return TEXT_CACHE.put_text(frame, text, org, font_face, font_scale, color, thickness)
+
+
+def measure_text(text, font_face, font_scale, thickness=1):
+    return TEXT_CACHE.measure_text(text, font_face, font_scale, thickness)